@@ -12,6 +12,8 @@ KEY FEATURES:
 - Object-Oriented Design (Classes for Card and Game Logic).
 - Robust Input Validation.
 - Crash prevention on macOS using os._exit.
+- Session autosave: bankroll, shoe and the round in play survive a restart.
+- Live session statistics panel with rolling rates.
 """
 
 # =============================================================================
@@ -19,9 +21,24 @@ KEY FEATURES:
 # =============================================================================
 import tkinter as tk
 from tkinter import messagebox
-import random
 import os 
-from typing import List, Tuple
+import time
+
+from blackjack_engine import (
+    BlackjackEngine, GameRuleError,
+    PHASE_DEALER, PHASE_OVER, PHASE_PLAYER, STARTING_BANKROLL, apply_action, calculate_hand_score,
+)
+from blackjack_history import HistoryError, HistoryWriter, history_path
+from blackjack_perf import DEFAULT_EXPORT_PATH, PERF_ENV_VAR, PerfMonitor
+from blackjack_render import TableRenderer
+from blackjack_rules import DEFAULT_RULES, Rules
+from blackjack_shoe import DEFAULT_PENETRATION, Shoe
+from blackjack_snapshot import (
+    SnapshotError, load_snapshot, restore_engine, save_snapshot, session_path, unseen_cards,
+)
+from blackjack_solver import DealerOutlook, advise
+from blackjack_stats import SessionStats
+from blackjack_strategy import get_chart
 
 # --- Constants -----------------------------------------------------
 COLOR_BG = "#2c3e50"            
@@ -30,79 +47,105 @@ COLOR_TABLE_OUTLINE = "#2ecc71"
 COLOR_ACCENT = "#f1c40f"        
 COLOR_BTN_ACTION = "#3498db"    
 COLOR_BTN_SPLIT = "#9b59b6"     
+COLOR_BTN_DOUBLE = "#e67e22"
+COLOR_BTN_SURRENDER = "#95a5a6"
 COLOR_BTN_DEAL = "#2ecc71"      
 COLOR_BTN_QUIT = "#e74c3c"      
 COLOR_GAME_OVER = "#c0392b"     
 
-# Mapping codes to visual symbols for better readability 
-SUITS = {'C': '♥', 'D': '♦', 'H': '♣', 'S': '♠'}
-VALUES = {
-    2: '2', 3: '3', 4: '4', 5: '5', 6: '6', 7: '7', 8: '8', 
-    9: '9', 10: '10', 11: 'J', 12: 'Q', 13: 'K', 14: 'A'
-}
+DEALER_CARD_DELAY_MS = 600      # Pause before each dealer card (0 = turbo, no animation)
 
-# =============================================================================
-# BLOCK 2: DATA MODELS
-# =============================================================================
+# --- Turbo Autoplay ------------------------------------------------
+AUTOPLAY_DEFAULT_ROUNDS = 100
+AUTOPLAY_MAX_ROUNDS = 100000
+AUTOPLAY_FRAME_MS = 16              # One canvas redraw per frame (~60 fps)
+AUTOPLAY_FRAME_BUDGET = 0.012       # Seconds of play per frame, leaving time for Tk to draw
 
-class Card:
-    """
-    Represents a single playing card.
-    Encapsulates value logic to keep the main code clean.
-    """
-    def __init__(self, value: int, suit: str):
-        self.value = value
-        self.suit = suit
+# --- Session Autosave ----------------------------------------------
+AUTOSAVE_INTERVAL_MS = 1000         # Snapshot at most this often while the game state changes
 
-    def get_blackjack_value(self) -> int:
-        """
-        Returns the card's value according to Blackjack rules.
-        Face cards (J, Q, K) are 10. Ace is 11 by default.
-        """
-        if 10 <= self.value < 14: return 10
-        if self.value == 14: return 11
-        return self.value
-
-    def get_face_value(self) -> int:
-        """Returns the raw face value, useful for checking pairs."""
-        if 10 <= self.value < 14: return 10
-        return self.value
+# --- Performance Overlay -------------------------------------------
+PERF_OVERLAY_KEY = "<F3>"           # Toggles latency recording and the on-table overlay
+PERF_OVERLAY_REFRESH_MS = 500
 
-    def is_red(self) -> bool:
-        """Helper to determine if the card suit should be painted red."""
-        return self.suit in ['D', 'H']
+# Latency histograms of the hot paths; recording is off unless BLACKJACK_PERF is set
+PERF = PerfMonitor(enabled=bool(os.environ.get(PERF_ENV_VAR)))
 
 # =============================================================================
-# BLOCK 3: GAME CONTROLLER
+# BLOCK 2: GAME CONTROLLER
 # =============================================================================
 
 class BlackJackUltimate:
     """
-    Main controller class handling Game Logic, UI Rendering, and State Management.
-    Follows separation of concerns by isolating logic from drawing methods.
+    Main controller class handling UI Rendering and user interaction.
+    All game rules are delegated to a headless BlackjackEngine.
     """
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, engine=None, rules: Rules = DEFAULT_RULES, resume: bool = True):
+        """
+        Args:
+            root: The Tk root window.
+            engine: Rules engine to drive. Defaults to a local BlackjackEngine with
+                its own shoe; pass a blackjack_server.RemoteEngine to play on a server table.
+            rules: Table rules of the local engine (a remote table plays the server's rules).
+            resume: Continue the local session autosaved under these rules, if there is one.
+        """
         self.root = root
-        self.root.title("BlackJack Ultimate - HSG Project")
         self.root.geometry("1100x850")
         self.root.configure(bg=COLOR_BG)
 
-        # -- Game State Variables --
-        self.deck: List[Card] = []
-        self.player_hands: List[List[Card]] = [] 
-        self.player_bets: List[int] = []
-        self.hand_statuses: List[str] = []       
-        self.current_hand_index = 0
-        self.dealer_hand: List[Card] = []
-        
-        self.bankroll = 1000  
-        self.base_bet = 0
-        self.is_game_active = False
+        # -- Game State (owned by the rules engine) --
+        # -- Session Autosave (local tables only; a server table keeps its own state) --
+        self.session_path = session_path(rules) if engine is None else None
+        self._autosave_job = None
+        restored = False
+        if engine is None:
+            engine = self._restore_session(rules) if resume else None
+            restored = engine is not None
+            if engine is None:
+                # A background thread keeps shuffled shoes ready so reshuffles never stall the UI
+                engine = BlackjackEngine(bankroll=STARTING_BANKROLL, rules=rules,
+                                         shoe=Shoe(rules.num_decks, DEFAULT_PENETRATION, prefetch=2))
+            self.shoe = engine.shoe
+        else:
+            self.shoe = None
+        self.engine = engine
+        self.rules = engine.rules
+        self.root.title(f"BlackJack Ultimate - HSG Project ({self.rules.describe()})")
+        self.dealer_outlook = DealerOutlook(rules=self.rules)
+        if restored:
+            self.dealer_outlook.reset(unseen_cards(engine))
+        self.engine.observers.append(self.dealer_outlook)
+        # Loads the exact strategy chart from the disk cache (or rebuilds it in the background)
+        get_chart(self.rules)
+
+        # -- Hand History (binary audit log of every resolved round, one file per rule set) --
+        try:
+            self.history = HistoryWriter(history_path(self.rules), rules=self.rules)
+        except (OSError, HistoryError) as error:
+            print(f"Hand history disabled: {error}")
+            self.history = None
+
+        # -- Dealer Animation (driven by the Tk event loop) --
+        self.dealer_delay_ms = DEALER_CARD_DELAY_MS
+        self._dealer_job = None
+
+        # -- Session Statistics (O(1) per round, drawn in the table corner) --
+        self.session_stats = SessionStats()
+        self._advised_action = None     # PRO ADVICE currently shown, to score the next decision
+
+        # -- Turbo Autoplay (follows PRO ADVICE, one redraw per frame) --
+        self._autoplay_job = None
+        self._autoplay_left = 0
+        self._autoplay_bet = 0
+        self._autoplay_stats = {}
 
         # Initialize UI Components
         self._setup_ui_structure()
-        self._update_controls("betting")
+        if restored:
+            self._resume_session()
+        else:
+            self._update_controls("betting")
 
         # -- MacOS Stability Fix --
         # Overrides the default close behavior to ensure the process terminates completely.
@@ -123,7 +166,7 @@ class BlackJackUltimate:
         )
         self.lbl_bankroll.pack()
 
-        # Bottom Section: Dynamic Buttons
+        # Bottom Section: Button Panels
         self.bottom_container = tk.Frame(self.root, bg=COLOR_BG, pady=20)
         self.bottom_container.pack(side="bottom", fill="x")
 
@@ -143,11 +186,34 @@ class BlackJackUltimate:
         self.bg_advice = self.canvas.create_rectangle(0, 0, 0, 0, fill=COLOR_BG, outline=COLOR_ACCENT, width=2, state='hidden')
         self.txt_advice = self.canvas.create_text(0, 0, text="", font=("Arial", 16, "bold"), fill=COLOR_ACCENT)
 
+        # Retained-mode renderer for cards, hand scores and the active hand indicator
+        self.renderer = TableRenderer(self.canvas, indicator_color=COLOR_ACCENT)
+
+        # Performance overlay (hidden until toggled)
+        self.txt_perf = self.canvas.create_text(
+            10, 10, text="", anchor="nw", font=("Courier", 11), fill="white", state='hidden'
+        )
+        self._perf_job = None
+        self.root.bind(PERF_OVERLAY_KEY, self.toggle_perf_overlay)
+
+        # Session statistics panel (top right, rewritten once per resolved round)
+        self.txt_stats = self.canvas.create_text(
+            0, 10, text="\n".join(self.session_stats.format_lines()), anchor="ne", justify="right",
+            font=("Courier", 11), fill="white"
+        )
+
+        # Button panels for every game state, built once
+        self._build_control_panels()
+
     def _draw_table_background(self, event=None):
         """
         Redraws the table outline and repositions text when window is resized.
         Ensures the UI remains centered and responsive.
         """
+        # A pending dealer animation is finished at once instead of replaying it mid-resize
+        if self._dealer_job is not None:
+            self.finish_dealer_turn()
+
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
         self.canvas.delete("table_line")
@@ -160,66 +226,99 @@ class BlackJackUltimate:
         cx, cy = w // 2, h // 2
         self.canvas.coords(self.txt_dealer_lbl, cx, 60)
         self.canvas.coords(self.txt_result, cx, cy)
+        self.canvas.coords(self.txt_stats, w - 10, 10)
         
         # Position Advice Box at the bottom
         self.canvas.coords(self.bg_advice, cx - 250, h - 70, cx + 250, h - 20)
         self.canvas.coords(self.txt_advice, cx, h - 45)
 
+    def _build_control_panels(self) -> None:
+        """
+        Builds the button panel of every game state once.
+        `_update_controls` only swaps which panel is packed.
+        """
+        self.control_panels = {mode: tk.Frame(self.bottom_container, bg=COLOR_BG)
+                               for mode in ("betting", "playing", "end", "game_over", "autoplay")}
+        self.control_mode = ""
+        self.autoplay_rounds = tk.StringVar(value=str(AUTOPLAY_DEFAULT_ROUNDS))
+
+        panel = self.control_panels["betting"]
+        tk.Label(panel, text="Bet Amount:", fg="white", bg=COLOR_BG, font=("Arial", 14)).pack(side="left", padx=10)
+        self.entry_bet = tk.Entry(panel, font=("Arial", 14), width=10, justify='center')
+        self.entry_bet.insert(0, "50")
+        self.entry_bet.pack(side="left", padx=10)
+        tk.Button(panel, text="DEAL", bg=COLOR_BTN_DEAL, font=("Arial", 14, "bold"), 
+                  command=self.validate_bet, width=15).pack(side="left", padx=20)
+        self._build_autoplay_controls(panel)
+
+        panel = self.control_panels["playing"]
+        tk.Button(panel, text="HIT", font=("Arial", 14, "bold"), width=12, 
+                  command=self.hit).pack(side="left", padx=15)
+        tk.Button(panel, text="STAND", font=("Arial", 14, "bold"), width=12, 
+                  command=self.stand).pack(side="left", padx=15)
+        self.btn_split = tk.Button(panel, text="SPLIT", bg=COLOR_BTN_SPLIT, 
+                                   font=("Arial", 14, "bold"), width=12, command=self.split_pair)
+        self.btn_split.pack(side="left", padx=15)
+        self.btn_double = tk.Button(panel, text="DOUBLE", bg=COLOR_BTN_DOUBLE, 
+                                    font=("Arial", 14, "bold"), width=12, command=self.double_down)
+        self.btn_double.pack(side="left", padx=15)
+        self.btn_surrender = tk.Button(panel, text="SURRENDER", bg=COLOR_BTN_SURRENDER, 
+                                       font=("Arial", 14, "bold"), width=12, command=self.surrender)
+        if self.rules.surrender:
+            self.btn_surrender.pack(side="left", padx=15)
+
+        panel = self.control_panels["end"]
+        tk.Button(panel, text="REPLAY", bg=COLOR_BTN_ACTION, font=("Arial", 14, "bold"), 
+                  command=self.replay_same_bet, width=12).pack(side="left", padx=10)
+        tk.Button(panel, text="CHANGE BET", font=("Arial", 14), 
+                  command=lambda: self._update_controls("betting"), width=15).pack(side="left", padx=10)
+        self._build_autoplay_controls(panel)
+        tk.Button(panel, text="QUIT", bg=COLOR_BTN_QUIT, font=("Arial", 14, "bold"), 
+                  command=self.force_kill_app, width=10).pack(side="left", padx=20)
+
+        panel = self.control_panels["game_over"]
+        tk.Label(panel, text="YOU RAN OUT OF MONEY!", fg=COLOR_GAME_OVER, bg=COLOR_BG, font=("Arial", 14, "bold")).pack(side="left", padx=20)
+        tk.Button(panel, text="ADD $1000", bg=COLOR_BTN_DEAL, font=("Arial", 14, "bold"), 
+                  command=self.refill_bankroll, width=15).pack(side="left", padx=10)
+        tk.Button(panel, text="QUIT", bg=COLOR_BTN_QUIT, font=("Arial", 14, "bold"), 
+                  command=self.force_kill_app, width=10).pack(side="left", padx=20)
+
+        panel = self.control_panels["autoplay"]
+        self.lbl_autoplay = tk.Label(panel, text="", fg="white", bg=COLOR_BG, font=("Courier", 13, "bold"))
+        self.lbl_autoplay.pack(side="left", padx=10)
+        tk.Button(panel, text="STOP", bg=COLOR_BTN_QUIT, font=("Arial", 14, "bold"), 
+                  command=self.stop_autoplay, width=10).pack(side="left", padx=20)
+
+    def _build_autoplay_controls(self, panel: tk.Frame) -> None:
+        """Adds the round counter and AUTO button; all counters share one variable."""
+        tk.Spinbox(panel, from_=1, to=AUTOPLAY_MAX_ROUNDS, textvariable=self.autoplay_rounds, 
+                   font=("Arial", 14), width=6, justify='center').pack(side="left", padx=5)
+        tk.Button(panel, text="AUTO", bg=COLOR_BTN_ACTION, font=("Arial", 14, "bold"), 
+                  command=self.start_autoplay, width=8).pack(side="left", padx=10)
+
+    @PERF.timed("_update_controls")
     def _update_controls(self, mode: str) -> None:
         """
-        Dynamically rebuilds the button panel based on the current game state.
+        Shows the button panel for the current game state.
+        The bet entry keeps its value between rounds.
         
         Args:
-            mode (str): Current game state ('betting', 'playing', 'end', 'game_over').
+            mode (str): Current game state ('betting', 'playing', 'end', 'game_over', 'autoplay').
         """
-        # Clear existing buttons
-        for widget in self.bottom_container.winfo_children():
-            widget.destroy()
+        if mode != self.control_mode:
+            if self.control_mode:
+                self.control_panels[self.control_mode].pack_forget()
+            self.control_panels[mode].pack(side="left")
+            self.control_mode = mode
 
         if mode == "betting":
-            tk.Label(self.bottom_container, text="Bet Amount:", fg="white", bg=COLOR_BG, font=("Arial", 14)).pack(side="left", padx=10)
-            self.entry_bet = tk.Entry(self.bottom_container, font=("Arial", 14), width=10, justify='center')
-            self.entry_bet.insert(0, "50")
-            self.entry_bet.pack(side="left", padx=10)
-            tk.Button(self.bottom_container, text="DEAL", bg=COLOR_BTN_DEAL, font=("Arial", 14, "bold"), 
-                      command=self.validate_bet, width=15).pack(side="left", padx=20)
-            
             # Reset Visuals for new round
             self.canvas.itemconfigure(self.txt_result, text="PLACE YOUR BET", fill="white")
-            self.canvas.delete("cards")
-            self.canvas.delete("scores")
-            self.canvas.delete("indicator")
+            self.renderer.clear()
             self.canvas.itemconfigure(self.txt_dealer_score, text="")
             self.canvas.itemconfigure(self.bg_advice, state='hidden')
             self.canvas.itemconfigure(self.txt_advice, text="")
 
-        elif mode == "playing":
-            tk.Button(self.bottom_container, text="HIT", font=("Arial", 14, "bold"), width=12, 
-                      command=self.hit).pack(side="left", padx=15)
-            tk.Button(self.bottom_container, text="STAND", font=("Arial", 14, "bold"), width=12, 
-                      command=self.stand).pack(side="left", padx=15)
-            self.btn_split = tk.Button(self.bottom_container, text="SPLIT", bg=COLOR_BTN_SPLIT, 
-                                     font=("Arial", 14, "bold"), width=12, command=self.split_pair)
-            self.btn_split.pack(side="left", padx=15)
-
-        elif mode == "end":
-            tk.Button(self.bottom_container, text="REPLAY", bg=COLOR_BTN_ACTION, font=("Arial", 14, "bold"), 
-                      command=self.replay_same_bet, width=12).pack(side="left", padx=10)
-            tk.Button(self.bottom_container, text="CHANGE BET", font=("Arial", 14), 
-                      command=lambda: self._update_controls("betting"), width=15).pack(side="left", padx=10)
-            tk.Button(self.bottom_container, text="QUIT", bg=COLOR_BTN_QUIT, font=("Arial", 14, "bold"), 
-                      command=self.force_kill_app, width=10).pack(side="left", padx=20)
-
-        elif mode == "game_over":
-            tk.Label(self.bottom_container, text="YOU RAN OUT OF MONEY!", fg=COLOR_GAME_OVER, bg=COLOR_BG, font=("Arial", 14, "bold")).pack(side="left", padx=20)
-            tk.Button(self.bottom_container, text="ADD $1000", bg=COLOR_BTN_DEAL, font=("Arial", 14, "bold"), 
-                      command=self.refill_bankroll, width=15).pack(side="left", padx=10)
-            tk.Button(self.bottom_container, text="QUIT", bg=COLOR_BTN_QUIT, font=("Arial", 14, "bold"), 
-                      command=self.force_kill_app, width=10).pack(side="left", padx=20)
-
-        # Force UI update to prevent rendering glitches on some OS versions
-        self.bottom_container.update()
-
     # -------------------------------------------------------------------------
     # CORE GAME LOGIC
     # -------------------------------------------------------------------------
@@ -228,174 +327,189 @@ class BlackJackUltimate:
         Validates the user input for the bet.
         Ensures the input is a positive number and within bankroll limits[cite: 91].
         """
+        amount = self._read_bet()
+        if amount is not None:
+            self.start_round(amount)
+
+    def _read_bet(self):
+        """Parses the bet entry; shows an error and returns None if it is not a valid bet."""
         try:
             amount = int(self.entry_bet.get())
             if amount <= 0:
                 raise ValueError("Bet must be positive.")
-            if amount > self.bankroll:
+            if amount > self.engine.bankroll:
                 messagebox.showerror("Error", "Insufficient funds!")
-                return
+                return None
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number.")
-            return
+            return None
+        return amount
 
-        self.base_bet = amount
-        self.start_round()
+    def start_round(self, bet: int) -> None:
+        """Lets the engine shuffle and deal, then shows the first two cards."""
+        self.engine.start_round(bet)
+        self._refresh_bankroll()
 
-    def start_round(self) -> None:
-        """Initializes the deck, hands, and deals the first two cards."""
-        self.bankroll -= self.base_bet
-        self.lbl_bankroll.config(text=f"BANKROLL: ${self.bankroll}")
-        
-        # Create and shuffle deck
-        self.deck = [Card(v, s) for v in range(2, 15) for s in SUITS.keys()]
-        random.shuffle(self.deck)
-        
-        # Deal initial cards
-        initial_hand = [self.deck.pop(), self.deck.pop()]
-        self.player_hands = [initial_hand]
-        self.player_bets = [self.base_bet]
-        self.hand_statuses = ["Active"]
-        self.current_hand_index = 0
-        self.dealer_hand = [self.deck.pop(), self.deck.pop()]
-        
-        self.is_game_active = True
         self.canvas.itemconfigure(self.txt_result, text="")
         self._update_controls("playing")
-        self.update_display(hide_dealer=True)
-
-        # Check for immediate Blackjack (Natural 21)
-        score, _ = self.calculate_hand_score(initial_hand)
-        if score == 21:
-            self.hand_statuses[0] = "Blackjack"
-            self.stand()
+        self._after_player_action()
 
+    @PERF.timed("hit")
     def hit(self) -> None:
         """Player action: Take another card."""
-        current_hand = self.player_hands[self.current_hand_index]
-        current_hand.append(self.deck.pop())
-        self.update_display(hide_dealer=True)
-        
-        score, _ = self.calculate_hand_score(current_hand)
-        if score > 21:
-            self.hand_statuses[self.current_hand_index] = "Bust"
-            self.process_next_hand()
-        elif score == 21:
-            # Auto-stand on 21 to speed up gameplay
-            self.process_next_hand()
+        if self.engine.phase != PHASE_PLAYER:
+            return # Ignore clicks while the Dealer is playing
+        self.engine.hit()
+        self._note_decision("HIT")
+        self._after_player_action()
 
+    @PERF.timed("stand")
     def stand(self) -> None:
         """Player action: End turn for current hand."""
-        self.hand_statuses[self.current_hand_index] = "Stand"
-        self.process_next_hand()
+        if self.engine.phase != PHASE_PLAYER:
+            return
+        self.engine.stand()
+        self._note_decision("STAND")
+        self._after_player_action()
 
+    @PERF.timed("split_pair")
     def split_pair(self) -> None:
         """
         Splits a pair into two separate hands.
         Doubles the total wager and deals a new card to each split hand.
         """
-        current_hand = self.player_hands[self.current_hand_index]
-        
-        # Validate Split constraints
-        if len(self.player_bets) >= 3: 
-             messagebox.showinfo("Info", "Maximum 3 hands allowed.")
-             return
-        if self.bankroll < self.base_bet:
-            messagebox.showwarning("Error", "Insufficient funds to split.")
+        if self.engine.phase != PHASE_PLAYER:
             return
-
-        # Deduct bet for the new hand
-        self.bankroll -= self.base_bet
-        self.lbl_bankroll.config(text=f"BANKROLL: ${self.bankroll}")
-        
-        # Perform the split
-        card_to_move = current_hand.pop()
-        new_hand = [card_to_move]
-        
-        # Insert new hand into game state
-        self.player_hands.insert(self.current_hand_index + 1, new_hand)
-        self.player_bets.insert(self.current_hand_index + 1, self.base_bet)
-        self.hand_statuses.insert(self.current_hand_index + 1, "Active")
-        
-        # Deal second card to the first split hand
-        current_hand.append(self.deck.pop())
+        try:
+            self.engine.split_pair()
+        except GameRuleError as error:
+            messagebox.showwarning("Error", str(error))
+            return
+        self._note_decision("SPLIT")
+        self._refresh_bankroll()
         self.update_display(hide_dealer=True)
+        self._request_autosave()
 
-    def process_next_hand(self) -> None:
-        """Moves focus to the next hand (if split) or proceeds to Dealer's turn."""
-        if self.current_hand_index < len(self.player_hands) - 1:
-            self.current_hand_index += 1
-            # If the next hand has only 1 card (from a split), deal the second card
-            if len(self.player_hands[self.current_hand_index]) == 1:
-                 self.player_hands[self.current_hand_index].append(self.deck.pop())
-            self.update_display(hide_dealer=True)
-            
-            # Check for Blackjack on the new hand
-            score, _ = self.calculate_hand_score(self.player_hands[self.current_hand_index])
-            if score == 21:
-                 self.hand_statuses[self.current_hand_index] = "Blackjack"
-                 self.process_next_hand()
-        else:
+    @PERF.timed("double_down")
+    def double_down(self) -> None:
+        """Doubles the bet on the current hand, which takes exactly one more card."""
+        if self.engine.phase != PHASE_PLAYER:
+            return
+        try:
+            self.engine.double_down()
+        except GameRuleError as error:
+            messagebox.showwarning("Error", str(error))
+            return
+        self._note_decision("DOUBLE")
+        self._refresh_bankroll()
+        self._after_player_action()
+
+    @PERF.timed("surrender")
+    def surrender(self) -> None:
+        """Gives up the hand; half the bet comes back unless the Dealer has Blackjack."""
+        if self.engine.phase != PHASE_PLAYER:
+            return
+        try:
+            self.engine.surrender()
+        except GameRuleError as error:
+            messagebox.showwarning("Error", str(error))
+            return
+        self._note_decision("SURRENDER")
+        self._after_player_action()
+
+    def _note_decision(self, action: str) -> None:
+        """Scores a player decision against the PRO ADVICE that was on screen when it was made."""
+        if self._advised_action is not None:
+            self.session_stats.note_decision(action == self._advised_action)
+
+    def _after_player_action(self) -> None:
+        """Redraws the table and starts the Dealer's turn once all hands are done."""
+        self.update_display(hide_dealer=True)
+        self._request_autosave()
+        if self.engine.phase == PHASE_DEALER:
             self.play_dealer_turn()
 
+    @PERF.timed("play_dealer_turn")
     def play_dealer_turn(self) -> None:
         """
-        Executes Dealer logic based on strict Casino rules.
-        Dealer MUST draw to 16 and STAND on 17.
+        Starts the Dealer's turn. Dealer MUST draw to 16 and STAND on 17.
+        Each draw is scheduled on the Tk event loop, so the window stays responsive.
         """
-        # If all player hands busted, Dealer doesn't need to play
-        if all(status == "Bust" for status in self.hand_statuses):
+        # If all player hands busted or surrendered, Dealer doesn't need to play
+        if self.engine.all_hands_settled():
             self.resolve_game()
             return
 
         self.update_display(hide_dealer=False)
-        self.root.update()
-        
-        while True:
-            dealer_score, _ = self.calculate_hand_score(self.dealer_hand)
-            if dealer_score < 17:
-                self.root.after(600) # Small delay for animation
-                self.dealer_hand.append(self.deck.pop())
-                self.update_display(hide_dealer=False)
-                self.root.update()
-            else:
-                break
+        if self.dealer_delay_ms <= 0:
+            self.finish_dealer_turn()
+        else:
+            self._schedule_dealer_step()
+
+    def _schedule_dealer_step(self) -> None:
+        """Queues the Dealer's next card, or settles the round once the Dealer stands."""
+        if self.engine.dealer_should_draw():
+            self._dealer_job = self.root.after(self.dealer_delay_ms, self._dealer_step)
+        else:
+            self._dealer_job = None
+            self.resolve_game()
+
+    @PERF.timed("dealer_step")
+    def _dealer_step(self) -> None:
+        """Event-loop callback: deals one Dealer card and schedules the next step."""
+        self._dealer_job = None
+        self.engine.dealer_draw()
+        self.update_display(hide_dealer=False)
+        self._schedule_dealer_step()
+
+    def cancel_dealer_animation(self) -> None:
+        """Drops the pending Dealer step, if any, without dealing further cards."""
+        if self._dealer_job is not None:
+            self.root.after_cancel(self._dealer_job)
+            self._dealer_job = None
+
+    def finish_dealer_turn(self) -> None:
+        """Cancels the animation and plays out the rest of the Dealer's turn at once."""
+        self.cancel_dealer_animation()
+        while self.engine.dealer_should_draw():
+            self.engine.dealer_draw()
+        self.update_display(hide_dealer=False)
         self.resolve_game()
 
+    @PERF.timed("resolve_game")
     def resolve_game(self) -> None:
-        """Compares scores and resolves bets (Win, Loss, Push)."""
-        dealer_score, _ = self.calculate_hand_score(self.dealer_hand)
-        total_payout = 0
-
-        for i, hand in enumerate(self.player_hands):
-            status = self.hand_statuses[i]
-            bet = self.player_bets[i]
-            player_score, _ = self.calculate_hand_score(hand)
-            
-            if status == "Bust":
-                pass # Player loses bet
-            elif status == "Blackjack":
-                if dealer_score == 21 and len(self.dealer_hand) == 2:
-                    total_payout += bet # Push (Tie)
-                else:
-                    total_payout += bet * 2.5 # Blackjack Payout 3:2
-            else:
-                if dealer_score > 21:
-                    total_payout += bet * 2 # Dealer Busts
-                elif player_score > dealer_score:
-                    total_payout += bet * 2 # Player Wins
-                elif player_score == dealer_score:
-                    total_payout += bet # Push
-        
-        self.bankroll += int(total_payout)
-        self.lbl_bankroll.config(text=f"BANKROLL: ${self.bankroll}")
+        """Lets the engine settle the bets and shows the result (Win, Loss, Push)."""
+        result = self._settle_round()
+        self._refresh_bankroll()
+        self._show_result(result)
+        self._refresh_session_stats()
         
+        # Check for Bankruptcy
+        if self.engine.bankroll <= 0:
+            self.canvas.itemconfigure(self.txt_result, text="GAME OVER", fill=COLOR_GAME_OVER)
+            self._update_controls("game_over")
+        else:
+            self._update_controls("end")
+
+    def _settle_round(self, autoplay: bool = False):
+        """Resolves the bets in the engine and appends the round to the hand history."""
+        result = self.engine.resolve_game()
+        self.session_stats.record(self.engine, result, by_player=not autoplay)
+        if self.history is not None:
+            try:
+                self.history.append(self.engine, result)
+            except HistoryError as error:
+                print(f"Round not logged: {error}")
+        self._request_autosave()
+        return result
+
+    def _show_result(self, result) -> None:
+        """Shows the round's result message on the table."""
         # Display Result Message
-        total_wagered = sum(self.player_bets)
-        if total_payout > total_wagered:
-            msg = f"WIN (+${int(total_payout - total_wagered)})"
+        if result.total_payout > result.total_wagered:
+            msg = f"WIN (+${int(result.total_payout - result.total_wagered)})"
             col = COLOR_TABLE_OUTLINE
-        elif total_payout < total_wagered:
+        elif result.total_payout < result.total_wagered:
             msg = "LOSS"
             col = COLOR_BTN_QUIT
         else:
@@ -404,174 +518,282 @@ class BlackJackUltimate:
             
         self.canvas.itemconfigure(self.txt_result, text=msg, fill=col)
         self.canvas.tag_raise(self.txt_result)
-        
-        # Check for Bankruptcy
-        if self.bankroll <= 0:
-            self.canvas.itemconfigure(self.txt_result, text="GAME OVER", fill=COLOR_GAME_OVER)
-            self._update_controls("game_over")
-        else:
-            self._update_controls("end")
+
+    def _refresh_session_stats(self) -> None:
+        """Rewrites the statistics panel from the running totals (no history is rescanned)."""
+        self.canvas.itemconfigure(self.txt_stats, text="\n".join(self.session_stats.format_lines()))
+        self.canvas.tag_raise(self.txt_stats)
 
     # -------------------------------------------------------------------------
-    # UTILITIES & AI
+    # TURBO AUTOPLAY
     # -------------------------------------------------------------------------
-    def calculate_hand_score(self, hand: List[Card]) -> Tuple[int, bool]:
-        """
-        Calculates hand score handling Aces dynamically.
-        
-        Args:
-            hand: List of Card objects.
-        Returns:
-            Tuple(total_score, is_soft_hand)
-        """
-        total = 0
-        ace_count = 0
-        for card in hand:
-            val = card.get_blackjack_value()
-            total += val
-            if val == 11:
-                ace_count += 1
-        
-        is_soft = (ace_count > 0 and total <= 21)
-        
-        # Adjust Aces from 11 to 1 if total exceeds 21
-        while total > 21 and ace_count > 0:
-            total -= 10
-            ace_count -= 1
-            if ace_count == 0:
-                is_soft = False
-        return total, is_soft
-
-    def generate_basic_strategy(self) -> str:
+    def start_autoplay(self) -> None:
         """
-        AI Advisor: Recommends the mathematically optimal move.
-        Based on Basic Strategy charts.
+        Plays the number of rounds in the AUTO counter, following PRO ADVICE and
+        replaying the same bet. There are no dealer pauses, and the table is
+        redrawn once per frame instead of once per card.
         """
-        current_hand = self.player_hands[self.current_hand_index]
-        score, is_soft = self.calculate_hand_score(current_hand)
-        dealer_val = self.dealer_hand[1].get_blackjack_value()
-        
-        # Hard Totals
-        if score >= 17 and not is_soft: return "STAND"
-        if score <= 11 and not is_soft: return "HIT"
-        
-        # Soft Totals (Hand with an Ace counted as 11)
-        if is_soft:
-            if score >= 19: return "STAND"
-            if score == 18:
-                return "STAND" if 2 <= dealer_val <= 8 else "HIT"
-            return "HIT"
+        try:
+            rounds = int(self.autoplay_rounds.get())
+            if not 0 < rounds <= AUTOPLAY_MAX_ROUNDS:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", f"Rounds must be between 1 and {AUTOPLAY_MAX_ROUNDS}.")
+            return
+
+        if self.control_mode == "betting":
+            bet = self._read_bet()
+            if bet is None:
+                return
+        else:
+            bet = self.engine.base_bet
+            if self.engine.bankroll < bet:
+                messagebox.showwarning("Error", "Insufficient funds.")
+                return
+
+        self._autoplay_left = rounds
+        self._autoplay_bet = bet
+        self._autoplay_stats = {"rounds": 0, "net": 0, "wins": 0, "losses": 0, "pushes": 0,
+                                "started": time.perf_counter()}
+        self.canvas.itemconfigure(self.bg_advice, state='hidden')
+        self.canvas.itemconfigure(self.txt_advice, text="")
+        self._update_controls("autoplay")
+        self._autoplay_job = self.root.after(0, self._autoplay_frame)
+
+    def stop_autoplay(self) -> None:
+        """Stops autoplay after the current round and returns to the round-end controls."""
+        if self._autoplay_job is not None:
+            self.root.after_cancel(self._autoplay_job)
+            self._autoplay_job = None
+        self._autoplay_left = 0
+        if self.control_mode == "autoplay":
+            self._update_controls("game_over" if self.engine.bankroll <= 0 else "end")
+
+    @PERF.timed("autoplay_frame")
+    def _autoplay_frame(self) -> None:
+        """Event-loop callback: plays rounds for one frame budget, then redraws once."""
+        self._autoplay_job = None
+        deadline = time.perf_counter() + AUTOPLAY_FRAME_BUDGET
+        result = None
+        while self._autoplay_left > 0 and time.perf_counter() < deadline:
+            if self.engine.bankroll < self._autoplay_bet:
+                self._autoplay_left = 0
+                break
+            result = self._autoplay_round()
+            self._autoplay_left -= 1
+
+        # One redraw for every round played in this frame
+        if result is not None:
+            self.update_display(hide_dealer=False)
+            self._show_result(result)
+            self._refresh_session_stats()
+        self._refresh_bankroll()
+        self._refresh_autoplay_stats()
+
+        if self._autoplay_left > 0:
+            self._autoplay_job = self.root.after(AUTOPLAY_FRAME_MS, self._autoplay_frame)
+        else:
+            self.stop_autoplay()
+
+    def _autoplay_round(self):
+        """Plays one complete round on the engine without touching the canvas."""
+        engine = self.engine
+        engine.start_round(self._autoplay_bet)
+        while engine.phase == PHASE_PLAYER:
+            apply_action(engine, advise(engine, self.dealer_outlook.composition).action)
+        while engine.dealer_should_draw():
+            engine.dealer_draw()
+        result = self._settle_round(autoplay=True)
+
+        stats = self._autoplay_stats
+        stats["rounds"] += 1
+        stats["net"] += result.net
+        if result.net > 0:
+            stats["wins"] += 1
+        elif result.net < 0:
+            stats["losses"] += 1
         else:
-            # Intermediate Hard Totals
-            if score == 12:
-                return "STAND" if 4 <= dealer_val <= 6 else "HIT"
-            if 13 <= score <= 16:
-                return "STAND" if 2 <= dealer_val <= 6 else "HIT"
-        return ""
+            stats["pushes"] += 1
+        return result
+
+    def _refresh_autoplay_stats(self) -> None:
+        """Shows progress, net result, W/L/P and speed in the autoplay panel."""
+        stats = self._autoplay_stats
+        played = stats["rounds"]
+        elapsed = time.perf_counter() - stats["started"]
+        rate = played / elapsed if elapsed > 0 else 0.0
+        self.lbl_autoplay.config(text=(
+            f"Round {played}/{played + self._autoplay_left}  |  Net {stats['net']:+d}  |  "
+            f"W {stats['wins']} L {stats['losses']} P {stats['pushes']}  |  {rate:,.0f} rounds/s"
+        ))
+
+    # -------------------------------------------------------------------------
+    # UTILITIES & AI
+    # -------------------------------------------------------------------------
+    def _refresh_bankroll(self) -> None:
+        """Mirrors the engine's bankroll in the header label."""
+        self.lbl_bankroll.config(text=f"BANKROLL: ${self.engine.bankroll}")
 
+    @PERF.timed("update_display")
     def update_display(self, hide_dealer: bool = True) -> None:
         """Refreshes the Canvas with current cards and scores."""
-        self.canvas.delete("cards")
-        self.canvas.delete("scores")
-        self.canvas.delete("indicator")
-        
+        engine = self.engine
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
         cx = w // 2
         
-        # Draw Dealer Hand
-        start_x_d = cx - (len(self.dealer_hand) * 45)
-        for i, card in enumerate(self.dealer_hand):
-            is_hidden = (i == 0 and hide_dealer)
-            self.draw_card(start_x_d + i * 50, 90, card, hidden=is_hidden)
+        # Cards, hand scores and the active hand indicator are kept on the canvas
+        # by the renderer, which only touches the items that changed
+        self.renderer.render(
+            engine.dealer_hand, engine.player_hands, engine.current_hand_index,
+            show_indicator=engine.is_game_active, hide_dealer=hide_dealer, width=w, height=h,
+        )
             
         if not hide_dealer:
-            score, _ = self.calculate_hand_score(self.dealer_hand)
+            score, _ = calculate_hand_score(engine.dealer_hand)
             self.canvas.itemconfigure(self.txt_dealer_score, text=f"Score: {score}")
             self.canvas.coords(self.txt_dealer_score, cx, 240)
             self.canvas.tag_raise(self.txt_dealer_score)
         else:
-            self.canvas.itemconfigure(self.txt_dealer_score, text="Score: ?")
+            bust = self.dealer_outlook.bust_probability(engine.dealer_upcard.blackjack_value)
+            self.canvas.itemconfigure(self.txt_dealer_score, text=f"Score: ?  |  Bust: {bust:.0%}")
             self.canvas.coords(self.txt_dealer_score, cx, 240)
             self.canvas.tag_raise(self.txt_dealer_score)
 
-        # Draw Player Hand(s)
-        num_hands = len(self.player_hands)
-        width_per_hand = 300
-        total_width = num_hands * width_per_hand
-        start_x_base = cx - (total_width / 2) + (width_per_hand / 2)
-
-        for idx, hand in enumerate(self.player_hands):
-            center_x = start_x_base + (idx * width_per_hand)
-            total_card_width = (len(hand) - 1) * 30 + 80
-            start_card_x = center_x - (total_card_width / 2)
-            player_y = h - 260 
-            
-            for i, card in enumerate(hand):
-                self.draw_card(start_card_x + i * 30, player_y, card, hidden=False)
-            
-            score, _ = self.calculate_hand_score(hand)
-            self.canvas.create_text(
-                center_x, player_y + 140, text=f"Score: {score}", fill="white", 
-                font=("Arial", 14, "bold"), tags="scores"
-            )
-            
-            # Active hand indicator (Yellow Triangle)
-            if idx == self.current_hand_index and self.is_game_active:
-                self.canvas.create_polygon(
-                    center_x, player_y - 10, center_x-15, player_y - 30, center_x+15, player_y - 30, 
-                    fill=COLOR_ACCENT, tags="indicator"
-                )
-
-        # Update Split Button availability
-        if self.is_game_active and hasattr(self, 'btn_split'):
-            current_hand = self.player_hands[self.current_hand_index]
-            can_split = (len(current_hand) == 2 and 
-                         current_hand[0].get_face_value() == current_hand[1].get_face_value() and 
-                         self.bankroll >= self.base_bet)
-            if can_split:
-                 self.btn_split.config(state="normal", bg=COLOR_BTN_SPLIT)
-            else:
-                 self.btn_split.config(state="disabled", bg="gray")
+        # Update Split / Double / Surrender Button availability
+        if engine.is_game_active:
+            for button, allowed, color in ((self.btn_split, engine.can_split(), COLOR_BTN_SPLIT),
+                                           (self.btn_double, engine.can_double(), COLOR_BTN_DOUBLE),
+                                           (self.btn_surrender, engine.can_surrender(), COLOR_BTN_SURRENDER)):
+                if allowed:
+                     button.config(state="normal", bg=color)
+                else:
+                     button.config(state="disabled", bg="gray")
 
         # Update AI Advice
-        if self.is_game_active and hide_dealer:
-            advice = self.generate_basic_strategy()
+        if engine.phase == PHASE_PLAYER and hide_dealer:
+            advice = advise(engine, self.dealer_outlook.composition)
+            self._advised_action = advice.action
+            text = f"PRO ADVICE: {advice.action} (EV {advice.ev:+.2f})"
+            # Flag plays where the cards seen so far overrule the full-shoe chart
+            chart = get_chart(self.rules)
+            if chart is not None and chart.action(engine.current_hand, engine.dealer_upcard, engine.can_split(),
+                                                  engine.can_double(), engine.can_surrender()) != advice.action:
+                text += " ★ vs chart"
             self.canvas.itemconfigure(self.bg_advice, state='normal')
-            self.canvas.itemconfigure(self.txt_advice, text=f"PRO ADVICE: {advice}")
+            self.canvas.itemconfigure(self.txt_advice, text=text)
             self.canvas.tag_raise(self.bg_advice)
             self.canvas.tag_raise(self.txt_advice)
         else:
+            self._advised_action = None
             self.canvas.itemconfigure(self.txt_advice, text="")
             self.canvas.itemconfigure(self.bg_advice, state='hidden')
 
-    def draw_card(self, x: float, y: float, card: Card, hidden: bool) -> None:
-        """
-        Renders a card on the canvas using vector shapes.
-        Avoids external image dependencies for portability.
-        """
-        # Shadow effect
-        self.canvas.create_rectangle(x+5, y+5, x+85, y+125, fill="black", stipple="gray50", tags="cards")
-        
-        if hidden:
-            # Card Back (Red pattern)
-            self.canvas.create_rectangle(x, y, x+80, y+120, fill="#c0392b", outline="white", width=2, tags="cards")
-            self.canvas.create_line(x, y, x+80, y+120, fill="#e74c3c", width=3, tags="cards")
-            self.canvas.create_line(x+80, y, x, y+120, fill="#e74c3c", width=3, tags="cards")
+    # -------------------------------------------------------------------------
+    # PERFORMANCE OVERLAY
+    # -------------------------------------------------------------------------
+    def toggle_perf_overlay(self, event=None) -> None:
+        """Shows or hides the latency overlay; recording runs while it is shown."""
+        if self._perf_job is not None:
+            self.root.after_cancel(self._perf_job)
+            self._perf_job = None
+            self.canvas.itemconfigure(self.txt_perf, state='hidden')
+            PERF.enabled = bool(os.environ.get(PERF_ENV_VAR))
+        else:
+            PERF.enabled = True
+            self.canvas.itemconfigure(self.txt_perf, state='normal')
+            self._refresh_perf_overlay()
+
+    def _refresh_perf_overlay(self) -> None:
+        """Event-loop callback: redraws the p50/p99 table and the canvas item count."""
+        lines = PERF.format_lines() or ["(no actions recorded yet)"]
+        lines.append(f"canvas items: {len(self.canvas.find_all())}")
+        self.canvas.itemconfigure(self.txt_perf, text="\n".join(lines))
+        self.canvas.tag_raise(self.txt_perf)
+        self._perf_job = self.root.after(PERF_OVERLAY_REFRESH_MS, self._refresh_perf_overlay)
+
+    # -------------------------------------------------------------------------
+    # SESSION AUTOSAVE
+    # -------------------------------------------------------------------------
+    def _restore_session(self, rules: Rules):
+        """Engine of the session autosaved under `rules`, or None if there is nothing to resume."""
+        if not os.path.exists(self.session_path):
+            return None
+        try:
+            snapshot = load_snapshot(self.session_path)
+            if snapshot.rules != rules:
+                print(f"Saved session ignored: it was played under {snapshot.rules.describe()}.")
+                return None
+            return restore_engine(snapshot, prefetch=2)
+        except (OSError, SnapshotError) as error:
+            # A broken snapshot is dropped so the next start does not trip over it again
+            print(f"Saved session discarded, starting a new one: {error}")
+            try:
+                os.remove(self.session_path)
+            except OSError:
+                pass
+            return None
+
+    def _resume_session(self) -> None:
+        """Puts a restored round back on the table and carries on exactly where it stopped."""
+        engine = self.engine
+        # Cards are laid out from the canvas size, so let Tk size the window first
+        self.root.update_idletasks()
+        self._refresh_bankroll()
+        if engine.base_bet:
+            self.entry_bet.delete(0, tk.END)
+            self.entry_bet.insert(0, str(engine.base_bet))
+
+        if engine.phase in (PHASE_PLAYER, PHASE_DEALER):
+            self.canvas.itemconfigure(self.txt_result, text="")
+            self._update_controls("playing")
+            self._after_player_action()
+        elif engine.phase == PHASE_OVER:
+            self._update_controls("game_over" if engine.bankroll <= 0 else "end")
+            self.update_display(hide_dealer=False)
+            self.canvas.itemconfigure(self.txt_result, text="SESSION RESUMED", fill="white")
         else:
-            # Card Front
-            self.canvas.create_rectangle(x, y, x+80, y+120, fill="white", outline="black", width=2, tags="cards")
-            color = "red" if card.is_red() else "black"
-            self.canvas.create_text(x+15, y+20, text=VALUES[card.value], fill=color, font=("Arial", 14, "bold"), tags="cards")
-            self.canvas.create_text(x+15, y+40, text=SUITS[card.suit], fill=color, font=("Arial", 14, "bold"), tags="cards")
-            self.canvas.create_text(x+40, y+60, text=SUITS[card.suit], fill=color, font=("Arial", 36), tags="cards")
+            self._update_controls("betting")
+
+    def _request_autosave(self) -> None:
+        """Schedules a snapshot of the session; changes within AUTOSAVE_INTERVAL_MS share one write."""
+        if self.session_path is not None and self._autosave_job is None:
+            self._autosave_job = self.root.after(AUTOSAVE_INTERVAL_MS, self.save_session)
+
+    def save_session(self) -> None:
+        """Writes the session snapshot now (atomically, so a crash keeps the previous one)."""
+        if self._autosave_job is not None:
+            self.root.after_cancel(self._autosave_job)
+            self._autosave_job = None
+        if self.session_path is None:
+            return
+        try:
+            save_snapshot(self.engine, self.session_path)
+        except (OSError, SnapshotError) as error:
+            print(f"Session not saved: {error}")
 
     def force_kill_app(self):
         """
         Forcefully terminates the application.
         This is a workaround for Tkinter on macOS, where the window sometimes hangs on close.
+        The session snapshot and recorded latencies (DEFAULT_EXPORT_PATH) are written first.
         """
         print("Closing application...")
+        self.cancel_dealer_animation()
+        self.stop_autoplay()
+        self.save_session()
+        if self.history is not None:
+            self.history.close()
+        if PERF.has_samples():
+            try:
+                PERF.export(DEFAULT_EXPORT_PATH)
+                print(f"Latency statistics written to {DEFAULT_EXPORT_PATH}")
+            except OSError as error:
+                print(f"Could not write latency statistics: {error}")
+        if self.shoe is not None:
+            self.shoe.close()
+        else:
+            self.engine.close()
         try:
             self.root.destroy()
         except:
@@ -579,21 +801,39 @@ class BlackJackUltimate:
         os._exit(0)
 
     def refill_bankroll(self) -> None:
-        self.bankroll = 1000
-        self.lbl_bankroll.config(text=f"BANKROLL: ${self.bankroll}")
+        self.engine.bankroll = STARTING_BANKROLL
+        self._refresh_bankroll()
         self._update_controls("betting")
+        self._request_autosave()
 
     def replay_same_bet(self) -> None:
-        if self.bankroll < self.base_bet:
+        if self.engine.bankroll < self.engine.base_bet:
             messagebox.showwarning("Error", "Insufficient funds.")
             self._update_controls("betting")
         else:
-            self.start_round()
+            self.start_round(self.engine.base_bet)
 
 # =============================================================================
-# BLOCK 5: ENTRY POINT
+# BLOCK 3: ENTRY POINT
 # =============================================================================
 if __name__ == "__main__":
+    import argparse
+    from blackjack_rules import add_rule_arguments, rules_from_args
+
+    parser = argparse.ArgumentParser(description="Blackjack Ultimate")
+    parser.add_argument("--connect", metavar="HOST:PORT",
+                        help="Play on a table of a running blackjack_server instead of locally.")
+    parser.add_argument("--new-session", action="store_true",
+                        help="Start with a fresh bankroll and shoe instead of resuming the saved session.")
+    add_rule_arguments(parser)
+    args = parser.parse_args()
+
+    remote = None
+    if args.connect:
+        from blackjack_server import RemoteEngine
+        host, _, port = args.connect.rpartition(":")
+        remote = RemoteEngine(host or "127.0.0.1", int(port))
+
     root = tk.Tk()
-    app = BlackJackUltimate(root)
+    app = BlackJackUltimate(root, engine=remote, rules=rules_from_args(args), resume=not args.new_session)
     root.mainloop()
@@ -0,0 +1,437 @@
+"""
+Benchmark suite for Blackjack Ultimate.
+
+Measures the hot paths of the game without a display:
+    * micro-benchmarks of hand scoring, the basic strategy lookup and shoe shuffling
+    * full-round throughput of the engine (basic strategy plus splitting Aces and Eights)
+    * rendering cost per player/dealer action, counted as canvas items created and
+      canvas calls made against a recording stand-in canvas
+
+Results are written as JSON so a run can be compared against a stored baseline:
+
+    python blackjack_bench.py --output bench.json
+    python blackjack_bench.py --baseline bench.json --tolerance 0.15
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from blackjack_engine import (
+    FULL_DECK, MAX_HANDS, PHASE_DEALER, PHASE_PLAYER, BlackjackEngine, Hand,
+    basic_strategy_policy, calculate_hand_score, generate_basic_strategy,
+)
+from blackjack_render import TableRenderer
+from blackjack_shoe import DEFAULT_DECKS, DEFAULT_PENETRATION, Shoe
+
+BENCH_FORMAT_VERSION = 1
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_TOLERANCE = 0.25        # Relative slowdown tolerated before a metric counts as a regression
+DEFAULT_REPEATS = 7
+MIN_RUN_SECONDS = 0.3           # Each timed run repeats its batch until it lasts this long
+DEFAULT_SEED = 2024
+BENCH_BET = 10
+RENDER_WIDTH = 1060             # Canvas size of the GUI's default window
+RENDER_HEIGHT = 600
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class Metric(NamedTuple):
+    """One benchmark figure."""
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+    gated: bool = True          # False for workload figures that say nothing about speed
+
+
+class RecordingCanvas:
+    """
+    Stand-in for tk.Canvas that records calls instead of drawing.
+
+    Implements the subset of the Canvas interface TableRenderer uses. Every
+    `create_*` call returns a fresh item id and bumps `created`; every call is
+    counted per method in `calls`.
+    """
+
+    def __init__(self) -> None:
+        self.items: Dict[int, set] = {}
+        self.created = 0
+        self.calls: Dict[str, int] = {}
+        self._next_id = 0
+
+    def _count(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    def _create(self, kind: str, *coords: Any, **options: Any) -> int:
+        self._count("create_" + kind)
+        self._next_id += 1
+        self.created += 1
+        tags = options.get("tags", ())
+        self.items[self._next_id] = {tags} if isinstance(tags, str) else set(tags)
+        return self._next_id
+
+    def create_rectangle(self, *coords: Any, **options: Any) -> int:
+        return self._create("rectangle", *coords, **options)
+
+    def create_text(self, *coords: Any, **options: Any) -> int:
+        return self._create("text", *coords, **options)
+
+    def create_line(self, *coords: Any, **options: Any) -> int:
+        return self._create("line", *coords, **options)
+
+    def create_polygon(self, *coords: Any, **options: Any) -> int:
+        return self._create("polygon", *coords, **options)
+
+    def delete(self, *tags_or_ids: Any) -> None:
+        self._count("delete")
+        for target in tags_or_ids:
+            if isinstance(target, int):
+                self.items.pop(target, None)
+            elif target == "all":
+                self.items.clear()
+            else:
+                for item in [i for i, tags in self.items.items() if target in tags]:
+                    del self.items[item]
+
+    def move(self, *args: Any) -> None:
+        self._count("move")
+
+    def coords(self, *args: Any) -> None:
+        self._count("coords")
+
+    def itemconfigure(self, *args: Any, **options: Any) -> None:
+        self._count("itemconfigure")
+
+    def tag_raise(self, *args: Any) -> None:
+        self._count("tag_raise")
+
+    @property
+    def total_calls(self) -> int:
+        """Number of canvas calls recorded so far."""
+        return sum(self.calls.values())
+
+# =============================================================================
+# BLOCK 3: MEASUREMENT HELPERS
+# =============================================================================
+
+def median_rate(func: Callable[[], int], repeats: int = DEFAULT_REPEATS) -> float:
+    """
+    Runs `func` `repeats` times and returns the median operations per second.
+
+    A single batch of the micro-benchmarks takes well under a millisecond, which
+    is too short to time steadily. So every timed run calls `func` again until it
+    has lasted at least MIN_RUN_SECONDS. An untimed warm-up call comes first. The
+    median ignores the odd run slowed or sped up by the rest of the machine.
+
+    Args:
+        func: Callable that performs a batch of work and returns the number of operations.
+        repeats: Number of timed runs.
+    """
+    func()
+    rates = []
+    for _ in range(repeats):
+        ops = 0
+        start = time.perf_counter()
+        while True:
+            ops += func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_RUN_SECONDS:
+                break
+        rates.append(ops / elapsed)
+    return statistics.median(rates)
+
+
+def sample_hands(n: int, seed: int = DEFAULT_SEED) -> List[Hand]:
+    """Random 2- to 5-card hands, drawn from a seeded deck."""
+    rng = random.Random(seed)
+    hands = []
+    for _ in range(n):
+        hands.append(Hand(rng.sample(FULL_DECK, rng.randint(2, 5))))
+    return hands
+
+
+def split_pairs_policy(engine: BlackjackEngine) -> str:
+    """Basic strategy that also splits Aces and Eights, so split paths are exercised."""
+    hand = engine.current_hand
+    if len(hand) == 2 and hand[0].get_blackjack_value() in (8, 11) and engine.can_split():
+        return "SPLIT"
+    return basic_strategy_policy(engine)
+
+# =============================================================================
+# BLOCK 4: BENCHMARKS
+# =============================================================================
+
+# ---- MICRO-BENCHMARKS ----
+def bench_scoring(scale: int, repeats: int) -> List[Metric]:
+    """calculate_hand_score on incrementally scored Hands and on plain card lists."""
+    hands = sample_hands(1000 * scale)
+    plain = [list(hand) for hand in hands]
+
+    def score(batch: List[Any]) -> Callable[[], int]:
+        def run() -> int:
+            for hand in batch:
+                calculate_hand_score(hand)
+            return len(batch)
+        return run
+
+    return [
+        Metric("score.hand", median_rate(score(hands), repeats), "ops/s", True),
+        Metric("score.list", median_rate(score(plain), repeats), "ops/s", True),
+    ]
+
+
+def bench_strategy(scale: int, repeats: int) -> List[Metric]:
+    """generate_basic_strategy over random hands and upcards."""
+    rng = random.Random(DEFAULT_SEED)
+    cases = [(hand, rng.choice(FULL_DECK)) for hand in sample_hands(1000 * scale)]
+
+    def run() -> int:
+        for hand, upcard in cases:
+            generate_basic_strategy(hand, upcard)
+        return len(cases)
+
+    return [Metric("strategy.lookup", median_rate(run, repeats), "ops/s", True)]
+
+
+def bench_shoe(scale: int, repeats: int) -> List[Metric]:
+    """Building a shoe, reshuffling it, and dealing the cards of a round."""
+    rng = random.Random(DEFAULT_SEED)
+    shoes = 20 * scale
+
+    def build() -> int:
+        for _ in range(shoes):
+            Shoe(DEFAULT_DECKS, DEFAULT_PENETRATION, rng=rng)
+        return shoes
+
+    shoe = Shoe(DEFAULT_DECKS, DEFAULT_PENETRATION, rng=rng)
+
+    def reshuffle() -> int:
+        for _ in range(shoes):
+            shoe.shuffle()
+        return shoes
+
+    engine = BlackjackEngine(bankroll=BENCH_BET, rng=rng, shoe=Shoe(DEFAULT_DECKS, DEFAULT_PENETRATION, rng=rng))
+    deals = 1000 * scale
+
+    def deal() -> int:
+        for _ in range(deals):
+            engine.bankroll = BENCH_BET
+            engine.start_round(BENCH_BET)
+        return deals
+
+    return [
+        Metric("shoe.build", median_rate(build, repeats), "shoes/s", True),
+        Metric("shoe.shuffle", median_rate(reshuffle, repeats), "shoes/s", True),
+        Metric("engine.start_round", median_rate(deal, repeats), "ops/s", True),
+    ]
+
+
+# ---- ROUND THROUGHPUT ----
+def bench_rounds(scale: int, repeats: int) -> List[Metric]:
+    """Complete rounds played headlessly, splitting Aces and Eights."""
+    rng = random.Random(DEFAULT_SEED)
+    engine = BlackjackEngine(bankroll=BENCH_BET * MAX_HANDS, rng=rng,
+                             shoe=Shoe(DEFAULT_DECKS, DEFAULT_PENETRATION, rng=rng))
+    rounds = 2000 * scale
+    counters = {"hands": 0, "splits": 0, "rounds": 0}
+
+    def run() -> int:
+        hands = 0
+        for _ in range(rounds):
+            engine.bankroll = BENCH_BET * MAX_HANDS
+            engine.play_round(BENCH_BET, split_pairs_policy)
+            hands += len(engine.player_hands)
+            counters["splits"] += len(engine.player_hands) - 1
+        counters["hands"] += hands
+        counters["rounds"] += rounds
+        return hands
+
+    hands_rate = median_rate(run, repeats)
+    return [
+        Metric("rounds.hands_per_sec", hands_rate, "hands/s", True),
+        Metric("rounds.rounds_per_sec",
+               hands_rate * counters["rounds"] / max(counters["hands"], 1), "rounds/s", True),
+        Metric("rounds.split_rate", counters["splits"] / max(counters["rounds"], 1), "splits/round",
+               True, gated=False),
+    ]
+
+
+# ---- RENDERING COST ----
+def bench_render(scale: int, repeats: int) -> List[Metric]:
+    """
+    Replays seeded rounds through TableRenderer the way update_display drives it:
+    one render per deal, player action and dealer card, and a clear between rounds.
+    """
+    rounds = 200 * scale
+
+    def play(canvas: RecordingCanvas) -> int:
+        rng = random.Random(DEFAULT_SEED)
+        engine = BlackjackEngine(bankroll=BENCH_BET * MAX_HANDS, rng=rng,
+                                 shoe=Shoe(DEFAULT_DECKS, DEFAULT_PENETRATION, rng=rng))
+        renderer = TableRenderer(canvas, indicator_color="#f1c40f")
+        actions = 0
+
+        def render() -> None:
+            renderer.render(engine.dealer_hand, engine.player_hands, engine.current_hand_index,
+                            show_indicator=engine.is_game_active,
+                            hide_dealer=engine.phase == PHASE_PLAYER,
+                            width=RENDER_WIDTH, height=RENDER_HEIGHT)
+
+        for _ in range(rounds):
+            renderer.clear()
+            engine.bankroll = BENCH_BET * MAX_HANDS
+            engine.start_round(BENCH_BET)
+            render()
+            actions += 1
+            while engine.phase == PHASE_PLAYER:
+                action = split_pairs_policy(engine)
+                if action == "SPLIT":
+                    engine.split_pair()
+                elif action == "HIT":
+                    engine.hit()
+                else:
+                    engine.stand()
+                render()
+                actions += 1
+            while engine.phase == PHASE_DEALER and engine.dealer_should_draw():
+                engine.dealer_draw()
+                render()
+                actions += 1
+            if engine.phase == PHASE_DEALER:
+                engine.play_dealer_turn()
+                render()
+                actions += 1
+        return actions
+
+    canvas = RecordingCanvas()
+    actions = play(canvas)
+    actions_rate = median_rate(lambda: play(RecordingCanvas()), repeats)
+    return [
+        Metric("render.items_per_action", canvas.created / actions, "items/action", False),
+        Metric("render.calls_per_action", canvas.total_calls / actions, "calls/action", False),
+        Metric("render.actions_per_sec", actions_rate, "actions/s", True),
+    ]
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], List[Metric]]] = {
+    "scoring": bench_scoring,
+    "strategy": bench_strategy,
+    "shoe": bench_shoe,
+    "rounds": bench_rounds,
+    "render": bench_render,
+}
+
+# =============================================================================
+# BLOCK 5: RESULTS & BASELINE COMPARISON
+# =============================================================================
+
+def run_suite(names: Optional[List[str]] = None, scale: int = 1,
+              repeats: int = DEFAULT_REPEATS) -> Dict[str, Any]:
+    """
+    Runs the selected benchmarks and returns a JSON-serializable report.
+
+    Args:
+        names: Benchmark groups to run (defaults to all of BENCHMARKS).
+        scale: Work multiplier; larger values give steadier timings.
+        repeats: Timed runs per benchmark; the best one is kept.
+    """
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for name in names or list(BENCHMARKS):
+        for metric in BENCHMARKS[name](scale, repeats):
+            metrics[metric.name] = {
+                "value": metric.value,
+                "unit": metric.unit,
+                "higher_is_better": metric.higher_is_better,
+                "gated": metric.gated,
+            }
+    return {
+        "version": BENCH_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "metrics": metrics,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Lists the metrics of `report` that are worse than `baseline` by more than `tolerance`.
+
+    Metrics marked as not gated describe the workload rather than its speed and
+    are never reported.
+
+    Returns:
+        One human-readable line per regression (empty if none).
+    """
+    regressions = []
+    for name, current in report["metrics"].items():
+        if not current.get("gated", True):
+            continue
+        reference = baseline.get("metrics", {}).get(name)
+        if reference is None or reference["value"] == 0:
+            continue
+        change = (current["value"] - reference["value"]) / reference["value"]
+        if not current["higher_is_better"]:
+            change = -change
+        if change < -tolerance:
+            regressions.append(f"{name}: {reference['value']:.4g} -> {current['value']:.4g} "
+                               f"{current['unit']} ({change:+.1%})")
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Renders a report as an aligned text table."""
+    lines = []
+    for name, metric in report["metrics"].items():
+        lines.append(f"{name:<28} {metric['value']:>14,.2f}  {metric['unit']}")
+    return "\n".join(lines)
+
+# =============================================================================
+# BLOCK 6: COMMAND LINE
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Blackjack Ultimate benchmark suite.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file to write the results to.")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown tolerated before failing (default: %(default)s).")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmark groups to run.")
+    parser.add_argument("--scale", type=int, default=1, help="Work multiplier (default: %(default)s).")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="Timed runs per benchmark (default: %(default)s).")
+    args = parser.parse_args(argv)
+
+    # Read the baseline first: --output may point at the same file
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = run_suite(args.only, args.scale, args.repeats)
+    print(format_report(report))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
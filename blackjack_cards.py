@@ -0,0 +1,167 @@
+"""
+Card model and hand scoring for Blackjack Ultimate.
+
+Cards are shared, immutable flyweights identified by a compact integer code, and
+Hands keep their score state up to date as cards are added.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+from typing import Iterable, List, Tuple
+
+# Mapping codes to visual symbols for better readability
+SUITS = {'C': '♥', 'D': '♦', 'H': '♣', 'S': '♠'}
+VALUES = {
+    2: '2', 3: '3', 4: '4', 5: '5', 6: '6', 7: '7', 8: '8',
+    9: '9', 10: '10', 11: 'J', 12: 'Q', 13: 'K', 14: 'A'
+}
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+SUIT_CODES = tuple(SUITS.keys())        # Suit index used by the compact card code
+MAX_SCORED_HARD_TOTAL = 40              # Bounds of the precomputed score table
+MAX_SCORED_ACES = 24
+
+
+class Card:
+    """
+    Represents a single playing card.
+    Encoded as a small integer `code` (0-51); every derived value is precomputed
+    once and stored in __slots__, so cards carry no per-instance dict.
+    """
+    __slots__ = ("code", "value", "suit", "blackjack_value", "face_value")
+
+    def __init__(self, value: int, suit: str):
+        self.code = (value - 2) * 4 + SUIT_CODES.index(suit)
+        self.value = value
+        self.suit = suit
+        self.blackjack_value = 10 if 10 <= value < 14 else (11 if value == 14 else value)
+        self.face_value = 10 if 10 <= value < 14 else value
+
+    @staticmethod
+    def from_code(code: int) -> "Card":
+        """Returns the shared Card instance for a compact code."""
+        return FULL_DECK[code]
+
+    def get_blackjack_value(self) -> int:
+        """
+        Returns the card's value according to Blackjack rules.
+        Face cards (J, Q, K) are 10. Ace is 11 by default.
+        """
+        return self.blackjack_value
+
+    def get_face_value(self) -> int:
+        """Returns the raw face value, useful for checking pairs."""
+        return self.face_value
+
+    def is_red(self) -> bool:
+        """Helper to determine if the card suit should be painted red."""
+        return self.suit in ['D', 'H']
+
+    def symbols(self) -> Tuple[str, str]:
+        """Display symbols (rank, suit) resolved through VALUES and SUITS."""
+        return VALUES[self.value], SUITS[self.suit]
+
+    def __repr__(self) -> str:
+        return f"Card({self.value}, {self.suit!r})"
+
+
+# Cards are never mutated, so one instance per code is shared by every deck.
+# The list is ordered by code, so FULL_DECK[card.code] is card.
+FULL_DECK: List[Card] = [Card(v, s) for v in range(2, 15) for s in SUIT_CODES]
+
+
+def _score_from_counts(hard_total: int, ace_count: int) -> Tuple[int, bool]:
+    """(total, is_soft) exactly as calculate_hand_score, from Aces-as-1 total and Ace count."""
+    total = hard_total + 10 * ace_count
+    is_soft = (ace_count > 0 and total <= 21)
+    while total > 21 and ace_count > 0:
+        total -= 10
+        ace_count -= 1
+    return total, is_soft
+
+
+# SCORE_TABLE[hard_total][ace_count] -> (total, is_soft)
+SCORE_TABLE: Tuple[Tuple[Tuple[int, bool], ...], ...] = tuple(
+    tuple(_score_from_counts(hard, aces) for aces in range(MAX_SCORED_ACES + 1))
+    for hard in range(MAX_SCORED_HARD_TOTAL + 1)
+)
+
+
+class Hand(list):
+    """
+    A list of Cards that keeps its score state up to date as cards are added.
+    Tracks the total with Aces counted as 1 and the Ace count, so `score` is a
+    single table lookup. Only append, extend, pop and clear keep it in sync.
+    """
+    __slots__ = ("hard_total", "ace_count")
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        super().__init__()
+        self.hard_total = 0
+        self.ace_count = 0
+        self.extend(cards)
+
+    def append(self, card: Card) -> None:
+        super().append(card)
+        if card.blackjack_value == 11:
+            self.hard_total += 1
+            self.ace_count += 1
+        else:
+            self.hard_total += card.blackjack_value
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        for card in cards:
+            self.append(card)
+
+    def pop(self, index: int = -1) -> Card:
+        card = super().pop(index)
+        if card.blackjack_value == 11:
+            self.hard_total -= 1
+            self.ace_count -= 1
+        else:
+            self.hard_total -= card.blackjack_value
+        return card
+
+    def clear(self) -> None:
+        super().clear()
+        self.hard_total = 0
+        self.ace_count = 0
+
+    @property
+    def score(self) -> Tuple[int, bool]:
+        """(total_score, is_soft_hand), identical to calculate_hand_score."""
+        if self.hard_total <= MAX_SCORED_HARD_TOTAL and self.ace_count <= MAX_SCORED_ACES:
+            return SCORE_TABLE[self.hard_total][self.ace_count]
+        return _score_from_counts(self.hard_total, self.ace_count)
+
+# =============================================================================
+# BLOCK 3: SCORING
+# =============================================================================
+
+def calculate_hand_score(hand: List[Card]) -> Tuple[int, bool]:
+    """
+    Calculates hand score handling Aces dynamically.
+    Hand objects answer from their tracked state in O(1).
+
+    Args:
+        hand: List of Card objects.
+    Returns:
+        Tuple(total_score, is_soft_hand)
+    """
+    if isinstance(hand, Hand):
+        return hand.score
+    hard_total = 0
+    ace_count = 0
+    for card in hand:
+        if card.blackjack_value == 11:
+            hard_total += 1
+            ace_count += 1
+        else:
+            hard_total += card.blackjack_value
+    if hard_total <= MAX_SCORED_HARD_TOTAL and ace_count <= MAX_SCORED_ACES:
+        return SCORE_TABLE[hard_total][ace_count]
+    return _score_from_counts(hard_total, ace_count)
@@ -0,0 +1,358 @@
+"""
+Command-line entry point for Blackjack Ultimate.
+
+    python blackjack_cli.py simulate --rounds 100000 --workers 4
+    python blackjack_cli.py simulate --rounds 5000000 --vectorized
+    python blackjack_cli.py strategy [--solver] [--format csv] [--h17 --surrender]
+    python blackjack_cli.py edge --decks 2 --h17 --payout 6:5 [--sweep]
+    python blackjack_cli.py replay blackjack_history.bjh --verify
+    python blackjack_cli.py risk --bankroll 1000 --bet 50 --sessions 100000
+    python blackjack_cli.py tournament basic exact never-bust my_chart.csv
+    python blackjack_cli.py play [--connect 127.0.0.1:8765]
+    python blackjack_cli.py startup
+
+Only the standard library is imported at module level. Every command imports
+what it needs when it runs, so the headless commands never load tkinter (and
+never need a display), and NumPy is only loaded for `simulate --vectorized`.
+Every command that plays or solves rounds takes the table-rule options of
+`blackjack_rules.add_rule_arguments`.
+The `startup` command measures the cold start of the STARTUP_COMMANDS in fresh
+interpreters (the chart printer and a short simulation that loads the engine,
+rules and simulator). It fails if one exceeds COLD_START_BUDGET_MS or leaves a
+HEAVY_MODULES entry loaded.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+COLD_START_BUDGET_MS = 250          # Fresh interpreter to finished headless command
+COLD_START_SAMPLES = 5
+HEAVY_MODULES = ("tkinter", "numpy")    # Must stay out of headless commands
+# Headless commands timed by `startup`; the simulation imports the engine, rules and simulator
+STARTUP_COMMANDS = (
+    ("strategy", "--format", "csv"),
+    ("simulate", "--rounds", "200", "--workers", "1", "--seed", "1"),
+)
+
+UPCARD_LABELS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")
+HARD_TOTALS = tuple(range(5, 22))
+SOFT_TOTALS = tuple(range(13, 22))
+PAIR_LABELS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")
+
+# =============================================================================
+# BLOCK 2: STRATEGY CHART
+# =============================================================================
+
+def build_chart(decide: Callable[[list, object], str]) -> List[Tuple[str, List[str]]]:
+    """
+    Rows of (label, actions per upcard 2..A) for hard totals, soft totals and pairs.
+
+    Args:
+        decide: Called with (hand, dealer upcard) and returns the chart letter
+            (H, S, P, D/X = double else hit/stand, R/Q = surrender else hit/stand).
+    """
+    from blackjack_engine import Card
+    from blackjack_strategy import sample_hand
+
+    upcards = [Card(value, "C") for value in range(2, 10)] + [Card(10, "C"), Card(14, "C")]
+    hands = [(f"Hard {total}", sample_hand(total, False)) for total in HARD_TOTALS]
+    hands += [(f"Soft {total}", sample_hand(total, True)) for total in SOFT_TOTALS]
+    hands += [(f"Pair {label}", [Card(value, "S"), Card(value, "H")])
+              for label, value in zip(PAIR_LABELS, (*range(2, 11), 14))]
+    return [(label, [decide(hand, upcard) for upcard in upcards])
+            for label, hand in hands]
+
+
+def format_chart(rows: List[Tuple[str, List[str]]], fmt: str) -> str:
+    """Renders chart rows as an aligned text table, CSV or JSON."""
+    if fmt == "json":
+        import json
+        return json.dumps({label: dict(zip(UPCARD_LABELS, actions)) for label, actions in rows}, indent=2)
+    if fmt == "csv":
+        lines = ["hand," + ",".join(UPCARD_LABELS)]
+        lines += [label + "," + ",".join(actions) for label, actions in rows]
+        return "\n".join(lines)
+    lines = [f"{'':<8}" + "".join(f"{label:>4}" for label in UPCARD_LABELS)]
+    lines += [f"{label:<8}" + "".join(f"{action:>4}" for action in actions) for label, actions in rows]
+    return "\n".join(lines)
+
+# =============================================================================
+# BLOCK 3: COMMANDS
+# =============================================================================
+
+def cmd_simulate(args: argparse.Namespace) -> int:
+    """Monte Carlo estimate of the house edge under basic strategy."""
+    from blackjack_rules import rules_from_args
+
+    rules = rules_from_args(args)
+    start = time.perf_counter()
+    if args.vectorized:
+        try:
+            from blackjack_vectorized import simulate_basic_strategy
+        except ImportError as error:
+            print(f"Vectorized simulation unavailable: {error}", file=sys.stderr)
+            return 2
+        result = simulate_basic_strategy(args.rounds, bet=args.bet, seed=args.seed, rules=rules)
+        rounds, net = result.rounds, result.net
+        wins, losses, pushes = result.wins, result.losses, result.pushes
+    else:
+        from blackjack_parallel import simulate_parallel
+        from blackjack_shoe import DEFAULT_PENETRATION
+        stats = simulate_parallel(args.rounds, master_seed=args.seed, workers=args.workers, bet=args.bet,
+                                  rules=rules,
+                                  penetration=DEFAULT_PENETRATION if args.penetration is None else args.penetration)
+        rounds, net = stats.rounds, stats.net
+        wins, losses, pushes = stats.wins, stats.losses, stats.pushes
+    elapsed = time.perf_counter() - start
+
+    print(f"rules:       {rules.describe()}")
+    print(f"rounds:      {rounds:,}")
+    print(f"net:         {net:+,} (bet {args.bet})")
+    print(f"house edge:  {-net / (rounds * args.bet):+.4%}")
+    print(f"W / L / P:   {wins:,} / {losses:,} / {pushes:,}")
+    print(f"throughput:  {rounds / elapsed:,.0f} rounds/s")
+    return 0
+
+
+def cmd_strategy(args: argparse.Namespace) -> int:
+    """Prints the strategy chart, either the basic chart or the cached exact-EV chart."""
+    if args.solver:
+        from blackjack_cards import Hand
+        from blackjack_rules import rules_from_args
+        from blackjack_strategy import get_chart
+
+        # Served from the on-disk chart cache; a missing or stale cache is solved once here
+        chart = get_chart(rules_from_args(args), block=True)
+        rows = build_chart(lambda hand, upcard: chart.letter(
+            Hand(hand), upcard, can_split=len(hand) == 2 and hand[0].blackjack_value == hand[1].blackjack_value))
+    else:
+        from blackjack_engine import generate_basic_strategy
+        from blackjack_strategy import ACTION_LETTERS
+        rows = build_chart(lambda hand, upcard: ACTION_LETTERS[generate_basic_strategy(hand, upcard)])
+    print(format_chart(rows, args.format))
+    return 0
+
+
+def cmd_edge(args: argparse.Namespace) -> int:
+    """Exact house edge of a rule set, or of every variant around it with --sweep."""
+    from itertools import product
+
+    from blackjack_rules import rules_from_args
+    from blackjack_solver import house_edge
+
+    rules = rules_from_args(args)
+    variants = [rules]
+    if args.sweep:
+        variants = [rules._replace(num_decks=decks, dealer_hits_soft_17=h17, blackjack_payout=payout,
+                                   double_after_split=das, surrender=surrender)
+                    for decks, h17, payout, das, surrender
+                    in product((1, 2, 6, 8), (False, True), (2.5, 2.2), (True, False), (False, True))]
+    for variant in variants:
+        start = time.perf_counter()
+        edge = house_edge(variant)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{variant.describe():<28} house edge {edge:+.3%}  ({elapsed:.0f} ms)")
+    return 0
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    """Summarizes a hand-history log and optionally replays every hand."""
+    from blackjack_history import DEFAULT_HISTORY_PATH, main as history_main
+    return history_main([args.path or DEFAULT_HISTORY_PATH] + (["--verify"] if args.verify else []))
+
+
+def cmd_session(args: argparse.Namespace) -> int:
+    """Shows an autosaved session and optionally values each action on forked continuations."""
+    from blackjack_snapshot import DEFAULT_SESSION_PATH, main as snapshot_main
+
+    argv = [args.path or DEFAULT_SESSION_PATH, "--forks", str(args.forks), "--policy", args.policy]
+    if args.seed is not None:
+        argv += ["--seed", str(args.seed)]
+    return snapshot_main(argv)
+
+
+def cmd_risk(args: argparse.Namespace) -> int:
+    """Risk of ruin, session lengths and bankroll percentiles of flat-betting sessions."""
+    try:
+        from blackjack_risk import main as risk_main
+    except ImportError as error:
+        print(f"Risk analysis unavailable: {error}", file=sys.stderr)
+        return 2
+    from blackjack_rules import rule_argv, rules_from_args
+
+    argv = ["--sessions", str(args.sessions), "--bankroll", str(args.bankroll), "--bet", str(args.bet)]
+    for flag, value in (("--target", args.target), ("--max-rounds", args.max_rounds), ("--seed", args.seed)):
+        if value is not None:
+            argv += [flag, str(value)]
+    return risk_main(argv + rule_argv(rules_from_args(args)))
+
+
+def cmd_tournament(args: argparse.Namespace) -> int:
+    """EV of several policies on identical deals, with a per-cell divergence breakdown."""
+    from blackjack_rules import rule_argv, rules_from_args
+    from blackjack_tournament import main as tournament_main
+
+    argv = list(args.policies) + ["--rounds", str(args.rounds), "--bet", str(args.bet)]
+    for flag, value in (("--seed", args.seed), ("--workers", args.workers)):
+        if value is not None:
+            argv += [flag, str(value)]
+    return tournament_main(argv + rule_argv(rules_from_args(args)))
+
+
+def cmd_job(args: argparse.Namespace) -> int:
+    """Runs, resumes or merges a checkpointed, sharded simulation job."""
+    from blackjack_jobs import main as jobs_main
+    return jobs_main(args.job_args)
+
+
+def cmd_play(args: argparse.Namespace) -> int:
+    """Opens the GUI (the only command that loads tkinter)."""
+    try:
+        import tkinter as tk
+    except ImportError as error:
+        print(f"The GUI needs tkinter: {error}", file=sys.stderr)
+        return 2
+    from BlackJack_final import BlackJackUltimate
+    from blackjack_rules import rules_from_args
+
+    engine = None
+    if args.connect:
+        from blackjack_server import RemoteEngine
+        host, _, port = args.connect.rpartition(":")
+        engine = RemoteEngine(host or "127.0.0.1", int(port))
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        print(f"Cannot open a window: {error}", file=sys.stderr)
+        return 2
+    BlackJackUltimate(root, engine=engine, rules=rules_from_args(args), resume=not args.new_session)
+    root.mainloop()
+    return 0
+
+
+def cmd_startup(args: argparse.Namespace) -> int:
+    """Measures the cold start of the headless STARTUP_COMMANDS against the budget."""
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    ok = True
+    for arguments in STARTUP_COMMANDS:
+        command = [sys.executable, os.path.abspath(__file__), *arguments]
+        # A second run reports which heavy modules the command left loaded
+        probe = [sys.executable, "-c",
+                 f"import sys, blackjack_cli; blackjack_cli.main({list(arguments)!r});"
+                 f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules), file=sys.stderr)"]
+
+        timings = []
+        for _ in range(args.samples):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - start) * 1000)
+        loaded = subprocess.run(probe, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                cwd=here, text=True).stderr.strip()
+
+        best, median = min(timings), sorted(timings)[len(timings) // 2]
+        print(f"cold start ({' '.join(arguments)}): best {best:.0f} ms, median {median:.0f} ms "
+              f"(budget {args.budget_ms} ms)")
+        print(f"heavy modules loaded: {loaded}")
+        ok = ok and median <= args.budget_ms and loaded == "[]"
+    return 0 if ok else 1
+
+# =============================================================================
+# BLOCK 4: ARGUMENT PARSING
+# =============================================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    from blackjack_rules import add_rule_arguments
+
+    parser = argparse.ArgumentParser(prog="blackjack", description="Blackjack Ultimate command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate = commands.add_parser("simulate", help="Estimate the house edge by simulation.")
+    simulate.add_argument("--rounds", type=int, default=100_000)
+    simulate.add_argument("--seed", type=int, help="Master seed for reproducible runs.")
+    simulate.add_argument("--workers", type=int, help="Processes (defaults to all cores).")
+    simulate.add_argument("--bet", type=int, default=10)
+    simulate.add_argument("--penetration", type=float, help="Share of the shoe dealt before reshuffling (default: 0.75).")
+    simulate.add_argument("--vectorized", action="store_true",
+                          help="Use the NumPy batch simulator (fresh shoe per round).")
+    add_rule_arguments(simulate)
+    simulate.set_defaults(func=cmd_simulate)
+
+    strategy = commands.add_parser("strategy", help="Print the strategy chart.")
+    strategy.add_argument("--solver", action="store_true",
+                          help="Exact-EV chart for a full shoe under the table rules (cached on disk).")
+    strategy.add_argument("--format", choices=("text", "csv", "json"), default="text")
+    add_rule_arguments(strategy)
+    strategy.set_defaults(func=cmd_strategy)
+
+    edge = commands.add_parser("edge", help="Exact house edge of the table rules.")
+    edge.add_argument("--sweep", action="store_true",
+                      help="Also vary decks, soft 17, payout, DAS and surrender around the given rules.")
+    add_rule_arguments(edge)
+    edge.set_defaults(func=cmd_edge)
+
+    replay = commands.add_parser("replay", help="Summarize or verify a hand-history log.")
+    replay.add_argument("path", nargs="?", help="History log (default: blackjack_history.bjh).")
+    replay.add_argument("--verify", action="store_true", help="Replay every hand through the engine.")
+    replay.set_defaults(func=cmd_replay)
+
+    session = commands.add_parser("session", help="Inspect the autosaved game and value its continuations.")
+    session.add_argument("path", nargs="?", help="Session snapshot (default: blackjack_session.bjs).")
+    session.add_argument("--forks", type=int, default=0,
+                         help="Play each legal action out on this many reshuffled forks.")
+    session.add_argument("--policy", default="basic", help="Policy for the rest of the round.")
+    session.add_argument("--seed", type=int, help="Master seed of the forks.")
+    session.set_defaults(func=cmd_session)
+
+    risk = commands.add_parser("risk", help="Estimate the risk of ruin over many sessions (needs NumPy).")
+    risk.add_argument("--sessions", type=int, default=100_000)
+    risk.add_argument("--bankroll", type=int, default=1000)
+    risk.add_argument("--bet", type=int, default=50)
+    risk.add_argument("--target", type=int, help="Stop a session at this bankroll (default: 2x bankroll).")
+    risk.add_argument("--max-rounds", type=int, help="Round limit per session (default: 100000).")
+    risk.add_argument("--seed", type=int, help="Seed for reproducible runs.")
+    add_rule_arguments(risk)
+    risk.set_defaults(func=cmd_risk)
+
+    tournament = commands.add_parser("tournament", help="Compare strategies on common random numbers.")
+    tournament.add_argument("policies", nargs="*",
+                            help="basic, exact, never-bust, mimic-dealer or chart CSV files; baseline first.")
+    tournament.add_argument("--rounds", type=int, default=200_000)
+    tournament.add_argument("--seed", type=int, help="Seed of the shared deals.")
+    tournament.add_argument("--workers", type=int, help="Processes (defaults to all cores).")
+    tournament.add_argument("--bet", type=int, default=10)
+    add_rule_arguments(tournament)
+    tournament.set_defaults(func=cmd_tournament)
+
+    job = commands.add_parser("job", help="Run, resume or merge a sharded simulation job.",
+                              description="Arguments are passed on to blackjack_jobs.py (run DIR ... / merge PATH ...).")
+    job.add_argument("job_args", nargs=argparse.REMAINDER, metavar="run|merge ...")
+    job.set_defaults(func=cmd_job)
+
+    play = commands.add_parser("play", help="Open the game window.")
+    play.add_argument("--connect", metavar="HOST:PORT", help="Play on a blackjack_server table.")
+    play.add_argument("--new-session", action="store_true", help="Ignore the autosaved session.")
+    add_rule_arguments(play)
+    play.set_defaults(func=cmd_play)
+
+    startup = commands.add_parser("startup", help="Measure headless cold start against the budget.")
+    startup.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS)
+    startup.add_argument("--samples", type=int, default=COLD_START_SAMPLES)
+    startup.set_defaults(func=cmd_startup)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
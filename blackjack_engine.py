@@ -0,0 +1,458 @@
+"""
+Headless rules engine for Blackjack Ultimate.
+
+All game rules (dealing, player actions, dealer turn and payouts) live here and
+never touch tkinter, so the same code drives the GUI and high-volume simulations.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import random
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+# Card model, re-exported so the GUI and simulators can import it from here
+from blackjack_cards import (
+    FULL_DECK, SUITS, VALUES, Card, Hand, calculate_hand_score,
+)
+# Table rules live in blackjack_rules and are re-exported for existing importers
+from blackjack_rules import BLACKJACK_PAYOUT, DEALER_STAND_TOTAL, DEFAULT_RULES, MAX_HANDS, Rules
+from blackjack_shoe import Shoe
+from blackjack_strategy import BASIC_CHART, hand_state
+
+# --- Table Rules ---------------------------------------------------
+STARTING_BANKROLL = 1000
+
+# --- Round Phases --------------------------------------------------
+PHASE_BETTING = "betting"
+PHASE_PLAYER = "player"
+PHASE_DEALER = "dealer"
+PHASE_OVER = "over"
+
+# Hand statuses after which the Dealer has nothing left to play against
+SETTLED_STATUSES = ("Bust", "Surrender")
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class CardObserver:
+    """
+    Base class for components that follow the cards as they leave the shoe.
+    The engine only reports cards the player can see; the dealer's hole card
+    is reported when it is turned over.
+    """
+
+    def reset(self, cards: Iterable[Card]) -> None:
+        """Called with the full contents of a freshly shuffled shoe."""
+
+    def card_seen(self, card: Card) -> None:
+        """Called once for every card that becomes visible."""
+
+
+class GameRuleError(Exception):
+    """Raised when an action is not allowed in the current game state."""
+
+
+class RoundResult(NamedTuple):
+    """Outcome of a resolved round, as computed by `resolve_game`."""
+    total_payout: float
+    total_wagered: int
+    dealer_score: int
+
+    @property
+    def net(self) -> int:
+        """Change in bankroll over the whole round (stakes included)."""
+        return int(self.total_payout) - self.total_wagered
+
+# =============================================================================
+# BLOCK 3: STRATEGY
+# =============================================================================
+
+def generate_basic_strategy(hand: List[Card], dealer_upcard: Card) -> str:
+    """
+    AI Advisor: Recommends the mathematically optimal move.
+    Based on Basic Strategy charts (a table lookup in BASIC_CHART).
+
+    Args:
+        hand: The player's hand currently in play.
+        dealer_upcard: The dealer's visible card.
+    Returns:
+        "HIT" or "STAND" (the basic chart never splits).
+    """
+    score, is_soft = calculate_hand_score(hand)
+    return BASIC_CHART.lookup(score, is_soft, dealer_upcard.blackjack_value)
+
+# =============================================================================
+# BLOCK 4: RULES ENGINE
+# =============================================================================
+
+class BlackjackEngine:
+    """
+    Pure game-state machine for one seat at the table.
+    The GUI and the simulators drive it through the same action methods;
+    illegal actions raise GameRuleError instead of showing dialogs.
+    Table rules (dealer soft 17, payout, split limit, doubling, surrender)
+    come from `rules`.
+    """
+
+    def __init__(self, bankroll: int = STARTING_BANKROLL, rng: Optional[random.Random] = None,
+                 shoe: Optional[Shoe] = None, rules: Rules = DEFAULT_RULES):
+        self.rules = rules
+        # Private generator so runs can be seeded and reproduced independently
+        self.rng = rng if rng is not None else random.Random()
+        # The shoe persists across rounds and is only reshuffled at the cut card
+        self.shoe = shoe if shoe is not None else Shoe(num_decks=rules.num_decks, rng=self.rng)
+        self._reported_shuffle = -1
+
+        # -- Game State Variables --
+        self.player_hands: List[Hand] = []
+        self.player_bets: List[int] = []
+        self.hand_statuses: List[str] = []
+        self.current_hand_index = 0
+        self.dealer_hand = Hand()
+
+        self.bankroll = bankroll
+        self.base_bet = 0
+        self.is_game_active = False
+        self.phase = PHASE_BETTING
+
+        # Components notified as cards are dealt (see CardObserver)
+        self.observers: List[CardObserver] = []
+
+        # Audit trail of the current round: every card in dealing order and
+        # every player action ("HIT", "STAND", "SPLIT", "DOUBLE", "SURRENDER")
+        # in the order taken
+        self.dealt_cards: List[Card] = []
+        self.actions: List[str] = []
+
+    # -------------------------------------------------------------------------
+    # STATE QUERIES
+    # -------------------------------------------------------------------------
+    @property
+    def current_hand(self) -> Hand:
+        """The hand the player is currently acting on."""
+        return self.player_hands[self.current_hand_index]
+
+    @property
+    def dealer_upcard(self) -> Card:
+        """The dealer's visible card (the first card stays face down)."""
+        return self.dealer_hand[1]
+
+    def can_split(self) -> bool:
+        """True if the current hand is a pair that the player can afford to split."""
+        if self.phase != PHASE_PLAYER:
+            return False
+        hand = self.current_hand
+        return (len(hand) == 2 and
+                hand[0].get_face_value() == hand[1].get_face_value() and
+                len(self.player_bets) < self.rules.max_hands and
+                self.bankroll >= self.base_bet)
+
+    def can_double(self) -> bool:
+        """True if the current two-card hand may be doubled (after a split only with DAS)."""
+        if self.phase != PHASE_PLAYER:
+            return False
+        return (len(self.current_hand) == 2 and
+                (len(self.player_hands) == 1 or self.rules.double_after_split) and
+                self.bankroll >= self.player_bets[self.current_hand_index])
+
+    def can_surrender(self) -> bool:
+        """True if the player may still give up half the bet (first decision of an unsplit hand)."""
+        return (self.phase == PHASE_PLAYER and self.rules.surrender and
+                len(self.player_hands) == 1 and len(self.current_hand) == 2 and not self.actions)
+
+    def all_hands_bust(self) -> bool:
+        """True if every player hand is bust."""
+        return all(status == "Bust" for status in self.hand_statuses)
+
+    def all_hands_settled(self) -> bool:
+        """True if every player hand is bust or surrendered, so the dealer does not need to play."""
+        return all(status in SETTLED_STATUSES for status in self.hand_statuses)
+
+    def dealer_should_draw(self) -> bool:
+        """True while the dealer must take another card (draw to 16, stand on 17 or hit soft 17)."""
+        if self.phase != PHASE_DEALER or self.all_hands_settled():
+            return False
+        dealer_score, _ = self.dealer_hand.score
+        if dealer_score == DEALER_STAND_TOTAL and self.rules.dealer_hits_soft_17:
+            return hand_state(self.dealer_hand)[1]
+        return dealer_score < DEALER_STAND_TOTAL
+
+    # -------------------------------------------------------------------------
+    # PLAYER ACTIONS
+    # -------------------------------------------------------------------------
+    def start_round(self, bet: int) -> None:
+        """
+        Takes the bet and deals the first two cards, reshuffling the shoe
+        first if the cut card has come out.
+
+        Raises:
+            GameRuleError: If the bet is not positive or exceeds the bankroll.
+        """
+        if bet <= 0:
+            raise GameRuleError("Bet must be positive.")
+        if bet > self.bankroll:
+            raise GameRuleError("Insufficient funds!")
+
+        self.base_bet = bet
+        self.bankroll -= bet
+
+        # Reshuffle at the cut card and let the observers start over
+        if self.shoe.needs_shuffle:
+            self.shoe.shuffle()
+        if self.shoe.shuffle_count != self._reported_shuffle:
+            self._reported_shuffle = self.shoe.shuffle_count
+            for observer in self.observers:
+                observer.reset(self.shoe.undealt())
+
+        # Deal initial cards (the dealer's first card stays face down)
+        self.dealt_cards = []
+        self.actions = []
+        initial_hand = Hand((self._deal(), self._deal()))
+        self.player_hands = [initial_hand]
+        self.player_bets = [bet]
+        self.hand_statuses = ["Active"]
+        self.current_hand_index = 0
+        self.dealer_hand = Hand((self._deal(visible=False), self._deal()))
+
+        self.is_game_active = True
+        self.phase = PHASE_PLAYER
+
+        # Check for immediate Blackjack (Natural 21)
+        score, _ = initial_hand.score
+        if score == 21:
+            self.hand_statuses[0] = "Blackjack"
+            self.process_next_hand()
+
+    def hit(self) -> None:
+        """Player action: Take another card."""
+        self._require_phase(PHASE_PLAYER)
+        self.actions.append("HIT")
+        current_hand = self.current_hand
+        current_hand.append(self._deal())
+
+        score, _ = current_hand.score
+        if score > 21:
+            self.hand_statuses[self.current_hand_index] = "Bust"
+            self.process_next_hand()
+        elif score == 21:
+            # Auto-stand on 21 to speed up gameplay
+            self.hand_statuses[self.current_hand_index] = "Stand"
+            self.process_next_hand()
+
+    def stand(self) -> None:
+        """Player action: End turn for current hand."""
+        self._require_phase(PHASE_PLAYER)
+        self.actions.append("STAND")
+        self.hand_statuses[self.current_hand_index] = "Stand"
+        self.process_next_hand()
+
+    def split_pair(self) -> None:
+        """
+        Splits a pair into two separate hands.
+        Doubles the total wager and deals a new card to each split hand.
+
+        Raises:
+            GameRuleError: If the hand limit is reached or funds are insufficient.
+        """
+        self._require_phase(PHASE_PLAYER)
+        current_hand = self.current_hand
+
+        # Validate Split constraints
+        if len(self.player_bets) >= self.rules.max_hands:
+            raise GameRuleError(f"Maximum {self.rules.max_hands} hands allowed.")
+        if self.bankroll < self.base_bet:
+            raise GameRuleError("Insufficient funds to split.")
+
+        # Deduct bet for the new hand
+        self.actions.append("SPLIT")
+        self.bankroll -= self.base_bet
+
+        # Perform the split
+        card_to_move = current_hand.pop()
+        new_hand = Hand((card_to_move,))
+
+        # Insert new hand into game state
+        self.player_hands.insert(self.current_hand_index + 1, new_hand)
+        self.player_bets.insert(self.current_hand_index + 1, self.base_bet)
+        self.hand_statuses.insert(self.current_hand_index + 1, "Active")
+
+        # Deal second card to the first split hand
+        current_hand.append(self._deal())
+
+    def double_down(self) -> None:
+        """
+        Doubles the bet on the current hand and deals exactly one more card.
+
+        Raises:
+            GameRuleError: If the hand cannot be doubled or funds are insufficient.
+        """
+        self._require_phase(PHASE_PLAYER)
+        if len(self.current_hand) != 2:
+            raise GameRuleError("Only a two-card hand can be doubled.")
+        if len(self.player_hands) > 1 and not self.rules.double_after_split:
+            raise GameRuleError("No doubling after a split at this table.")
+        bet = self.player_bets[self.current_hand_index]
+        if self.bankroll < bet:
+            raise GameRuleError("Insufficient funds to double.")
+
+        self.actions.append("DOUBLE")
+        self.bankroll -= bet
+        self.player_bets[self.current_hand_index] += bet
+        current_hand = self.current_hand
+        current_hand.append(self._deal())
+
+        score, _ = current_hand.score
+        self.hand_statuses[self.current_hand_index] = "Bust" if score > 21 else "Stand"
+        self.process_next_hand()
+
+    def surrender(self) -> None:
+        """
+        Gives up the hand for half of the bet (late surrender, settled at resolution).
+
+        Raises:
+            GameRuleError: If surrender is not offered or no longer allowed.
+        """
+        self._require_phase(PHASE_PLAYER)
+        if not self.can_surrender():
+            raise GameRuleError("Surrender is only allowed as the first decision." if self.rules.surrender
+                                else "Surrender is not offered at this table.")
+        self.actions.append("SURRENDER")
+        self.hand_statuses[self.current_hand_index] = "Surrender"
+        self.process_next_hand()
+
+    def process_next_hand(self) -> None:
+        """Moves focus to the next hand (if split) or hands over to the Dealer."""
+        if self.current_hand_index < len(self.player_hands) - 1:
+            self.current_hand_index += 1
+            # If the next hand has only 1 card (from a split), deal the second card
+            if len(self.current_hand) == 1:
+                self.current_hand.append(self._deal())
+
+            # Auto-stand on 21; after a split it counts as 21, not as Blackjack
+            score, _ = self.current_hand.score
+            if score == 21:
+                self.hand_statuses[self.current_hand_index] = "Stand"
+                self.process_next_hand()
+        else:
+            self.phase = PHASE_DEALER
+            # The hole card is only turned over if the Dealer has to play
+            if self.observers and not self.all_hands_settled():
+                for observer in self.observers:
+                    observer.card_seen(self.dealer_hand[0])
+
+    # -------------------------------------------------------------------------
+    # DEALER & RESOLUTION
+    # -------------------------------------------------------------------------
+    def dealer_draw(self) -> Card:
+        """Deals one card to the Dealer and returns it."""
+        self._require_phase(PHASE_DEALER)
+        card = self._deal()
+        self.dealer_hand.append(card)
+        return card
+
+    def play_dealer_turn(self) -> RoundResult:
+        """
+        Executes Dealer logic based on strict Casino rules, then resolves the round.
+        Dealer MUST draw to 16 and STAND on 17 (or hit soft 17 under H17 rules).
+        """
+        while self.dealer_should_draw():
+            self.dealer_draw()
+        return self.resolve_game()
+
+    def resolve_game(self) -> RoundResult:
+        """Compares scores and resolves bets (Win, Loss, Push)."""
+        self._require_phase(PHASE_DEALER)
+        dealer_score, _ = self.dealer_hand.score
+        dealer_blackjack = dealer_score == 21 and len(self.dealer_hand) == 2
+        total_payout = 0
+
+        for i, hand in enumerate(self.player_hands):
+            status = self.hand_statuses[i]
+            bet = self.player_bets[i]
+            player_score, _ = hand.score
+
+            if status == "Bust":
+                pass # Player loses bet
+            elif status == "Surrender":
+                if not dealer_blackjack:
+                    total_payout += bet / 2 # Late surrender: half back unless the Dealer has Blackjack
+            elif status == "Blackjack":
+                if dealer_blackjack:
+                    total_payout += bet # Push (Tie)
+                else:
+                    total_payout += bet * self.rules.blackjack_payout # Blackjack Payout (3:2 by default)
+            else:
+                if dealer_score > 21:
+                    total_payout += bet * 2 # Dealer Busts
+                elif player_score > dealer_score:
+                    total_payout += bet * 2 # Player Wins
+                elif player_score == dealer_score:
+                    total_payout += bet # Push
+
+        self.bankroll += int(total_payout)
+        self.is_game_active = False
+        self.phase = PHASE_OVER
+        return RoundResult(total_payout, sum(self.player_bets), dealer_score)
+
+    def play_round(self, bet: int, policy: Optional[Callable[["BlackjackEngine"], str]] = None) -> RoundResult:
+        """
+        Plays one complete round headlessly.
+
+        Args:
+            bet: Stake for the initial hand.
+            policy: Callable returning "HIT", "STAND", "SPLIT", "DOUBLE" or
+                "SURRENDER" for the current state. Defaults to the basic strategy advisor.
+        Returns:
+            The resolved RoundResult.
+        """
+        self.start_round(bet)
+        self.play_player_turn(policy)
+        return self.play_dealer_turn()
+
+    def play_player_turn(self, policy: Optional[Callable[["BlackjackEngine"], str]] = None) -> None:
+        """Applies `policy` to every player hand until the Dealer's turn begins."""
+        if policy is None:
+            policy = basic_strategy_policy
+        while self.phase == PHASE_PLAYER:
+            apply_action(self, policy(self))
+
+    def _deal(self, visible: bool = True) -> Card:
+        """Takes the next card from the shoe and reports it to the observers."""
+        card = self.shoe.draw()
+        self.dealt_cards.append(card)
+        if visible and self.observers:
+            for observer in self.observers:
+                observer.card_seen(card)
+        return card
+
+    def _require_phase(self, phase: str) -> None:
+        """Guards actions that are only valid in a given phase of the round."""
+        if self.phase != phase:
+            raise GameRuleError(f"Action not allowed during the '{self.phase}' phase.")
+
+
+def apply_action(engine: BlackjackEngine, action: str) -> None:
+    """
+    Plays a policy decision on the engine. An illegal SPLIT or SURRENDER stands
+    and an illegal DOUBLE hits, the usual fallbacks of a strategy chart.
+    """
+    if action == "HIT":
+        engine.hit()
+    elif action == "DOUBLE":
+        if engine.can_double():
+            engine.double_down()
+        else:
+            engine.hit()
+    elif action == "SPLIT" and engine.can_split():
+        engine.split_pair()
+    elif action == "SURRENDER" and engine.can_surrender():
+        engine.surrender()
+    else:
+        engine.stand()
+
+
+def basic_strategy_policy(engine: BlackjackEngine) -> str:
+    """Default `play_round` policy: follows `generate_basic_strategy`."""
+    return generate_basic_strategy(engine.current_hand, engine.dealer_upcard)
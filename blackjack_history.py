@@ -0,0 +1,432 @@
+"""
+Binary hand-history log for Blackjack Ultimate.
+
+Every resolved round is stored as one fixed-size record: the bankroll and bets,
+every card in dealing order, every player action, the final hand statuses and
+the payout. Records are appended through an in-memory buffer. The reader maps
+the file into memory, and column scans run through `struct.iter_unpack`, so
+filtering millions of hands takes a fraction of a second. `verify_log` replays
+each hand through BlackjackEngine and checks the recorded payout.
+
+File layout: a HEADER_SIZE-byte header (magic, format version, record size,
+packed table rules), followed by back-to-back records of RECORD_SIZE bytes.
+Logs written before the rules were stored hold zeros there and read as
+DEFAULT_RULES.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import mmap
+import os
+import struct
+import sys
+from itertools import compress, count, starmap
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from blackjack_cards import Card
+from blackjack_engine import PHASE_PLAYER, BlackjackEngine, GameRuleError, RoundResult
+from blackjack_rules import DEFAULT_RULES, PACKED_RULES_SIZE, Rules
+from blackjack_shoe import DEFAULT_DECKS, Shoe
+
+HISTORY_MAGIC = b"BJHIST"
+HISTORY_VERSION = 1
+DEFAULT_HISTORY_PATH = "blackjack_history.bjh"
+DEFAULT_BUFFER_RECORDS = 256            # Records held in memory before a write
+
+MAX_RECORD_HANDS = 3
+MAX_RECORD_CARDS = 40
+MAX_RECORD_ACTIONS = 24
+
+# Single-byte codes of the stored strings
+ACTION_CODES = {"HIT": b"H", "STAND": b"S", "SPLIT": b"P", "DOUBLE": b"D", "SURRENDER": b"R"}
+ACTION_NAMES = {code[0]: name for name, code in ACTION_CODES.items()}
+STATUS_NAMES = ("", "Active", "Stand", "Bust", "Blackjack", "Surrender")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+# Record fields in file order: (name, struct format). Little-endian, no padding.
+RECORD_FIELDS = (
+    ("round_id", "Q"),
+    ("bankroll", "q"),                  # Bankroll before the bet was taken
+    ("base_bet", "I"),
+    ("bets", f"{MAX_RECORD_HANDS}I"),
+    ("total_wagered", "I"),
+    ("total_payout", "d"),
+    ("dealer_score", "B"),
+    ("num_hands", "B"),
+    ("num_cards", "B"),
+    ("num_actions", "B"),
+    ("statuses", f"{MAX_RECORD_HANDS}B"),
+    ("cards", f"{MAX_RECORD_CARDS}s"),
+    ("actions", f"{MAX_RECORD_ACTIONS}s"),
+)
+HEADER_STRUCT = struct.Struct(f"<6sHH{PACKED_RULES_SIZE}s")
+HEADER_SIZE = HEADER_STRUCT.size
+RECORD_STRUCT = struct.Struct("<" + "".join(fmt for _, fmt in RECORD_FIELDS))
+RECORD_SIZE = RECORD_STRUCT.size
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class HistoryError(Exception):
+    """Raised for malformed logs and rounds that do not fit a record."""
+
+
+class HandRecord(NamedTuple):
+    """One logged round, decoded."""
+    round_id: int
+    bankroll: int
+    base_bet: int
+    bets: Tuple[int, ...]
+    statuses: Tuple[str, ...]
+    cards: Tuple[Card, ...]
+    actions: Tuple[str, ...]
+    total_payout: float
+    total_wagered: int
+    dealer_score: int
+
+    @property
+    def net(self) -> int:
+        """Change in bankroll over the round (stakes included)."""
+        return int(self.total_payout) - self.total_wagered
+
+    @property
+    def dealer_upcard(self) -> Card:
+        """The dealer's visible card (fourth card dealt)."""
+        return self.cards[3]
+
+
+def _field_layout() -> dict:
+    """Byte offset and struct format of every record field."""
+    layout, offset = {}, 0
+    for name, fmt in RECORD_FIELDS:
+        layout[name] = (offset, fmt)
+        offset += struct.calcsize("<" + fmt)
+    return layout
+
+
+FIELD_LAYOUT = _field_layout()
+
+# =============================================================================
+# BLOCK 3: ENCODING
+# =============================================================================
+
+def encode_round(round_id: int, engine: BlackjackEngine, result: RoundResult) -> bytes:
+    """
+    Packs the engine's just-resolved round into one record.
+
+    Raises:
+        HistoryError: If the round has more hands, cards or actions than a record holds.
+    """
+    hands = len(engine.player_bets)
+    cards = engine.dealt_cards
+    actions = engine.actions
+    if hands > MAX_RECORD_HANDS or len(cards) > MAX_RECORD_CARDS or len(actions) > MAX_RECORD_ACTIONS:
+        raise HistoryError("Round is too large for a history record.")
+
+    bets = list(engine.player_bets) + [0] * (MAX_RECORD_HANDS - hands)
+    statuses = [STATUS_CODES[status] for status in engine.hand_statuses] + [0] * (MAX_RECORD_HANDS - hands)
+    # The bankroll already holds this round's payout; undo it to get the opening bankroll
+    bankroll = engine.bankroll - int(result.total_payout) + result.total_wagered
+    return RECORD_STRUCT.pack(
+        round_id, bankroll, engine.base_bet, *bets, result.total_wagered, result.total_payout,
+        result.dealer_score, hands, len(cards), len(actions), *statuses,
+        bytes(card.code for card in cards), b"".join(ACTION_CODES[action] for action in actions),
+    )
+
+
+def decode_record(data: Any, offset: int = 0) -> HandRecord:
+    """Unpacks the record starting at `offset` in a bytes-like object."""
+    fields = RECORD_STRUCT.unpack_from(data, offset)
+    h = MAX_RECORD_HANDS
+    round_id, bankroll, base_bet = fields[0:3]
+    bets = fields[3:3 + h]
+    total_wagered, total_payout, dealer_score, hands, num_cards, num_actions = fields[3 + h:9 + h]
+    statuses = fields[9 + h:9 + 2 * h]
+    cards, actions = fields[9 + 2 * h:]
+    return HandRecord(
+        round_id, bankroll, base_bet, tuple(bets[:hands]),
+        tuple(STATUS_NAMES[code] for code in statuses[:hands]),
+        tuple(Card.from_code(code) for code in cards[:num_cards]),
+        tuple(ACTION_NAMES[code] for code in actions[:num_actions]),
+        total_payout, total_wagered, dealer_score,
+    )
+
+# =============================================================================
+# BLOCK 4: WRITER & READER
+# =============================================================================
+
+class HistoryWriter:
+    """
+    Appends rounds to a history log through an in-memory buffer.
+    Records still in the buffer are lost if the process dies before `flush`.
+    A log holds the rounds of one rule set, stored in its header.
+
+    Raises:
+        HistoryError: If the rules allow more hands than a record holds, or an
+            existing log was written under other rules.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH, buffer_records: int = DEFAULT_BUFFER_RECORDS,
+                 rules: Rules = DEFAULT_RULES):
+        if rules.max_hands > MAX_RECORD_HANDS:
+            raise HistoryError(f"History records hold at most {MAX_RECORD_HANDS} hands.")
+        self.path = path
+        self.buffer_records = buffer_records
+        self.rules = rules
+        self._buffer = bytearray()
+        self._pending = 0
+        self._file: BinaryIO = open(path, "ab")
+        size = self._file.tell()
+        if size == 0:
+            self._file.write(HEADER_STRUCT.pack(HISTORY_MAGIC, HISTORY_VERSION, RECORD_SIZE, rules.pack()))
+            size = HEADER_SIZE
+        else:
+            with open(path, "rb") as f:
+                logged = _check_header(f.read(HEADER_SIZE))
+            if logged != rules:
+                self._file.close()
+                raise HistoryError(f"{path} was logged under other rules ({logged.describe()}).")
+            # Drop a partial record left by an interrupted write, so appends stay aligned
+            aligned = size - (size - HEADER_SIZE) % RECORD_SIZE
+            if aligned != size:
+                self._file.truncate(aligned)
+                size = aligned
+        # Round ids continue from the records already in the file
+        self.next_round_id = (size - HEADER_SIZE) // RECORD_SIZE
+
+    def append(self, engine: BlackjackEngine, result: RoundResult) -> None:
+        """Logs the round the engine has just resolved."""
+        self._buffer += encode_round(self.next_round_id, engine, result)
+        self.next_round_id += 1
+        self._pending += 1
+        if self._pending >= self.buffer_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered records to disk."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+            self._pending = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flushes and closes the log."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "HistoryWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def history_path(rules: Rules = DEFAULT_RULES) -> str:
+    """Log of the rounds played under `rules`: DEFAULT_HISTORY_PATH for the default table."""
+    if rules == DEFAULT_RULES:
+        return DEFAULT_HISTORY_PATH
+    stem, extension = os.path.splitext(DEFAULT_HISTORY_PATH)
+    return f"{stem}-{rules.fingerprint.hex()[:8]}{extension}"
+
+
+def _check_header(header: bytes) -> Rules:
+    """Validates the file header of a history log and returns the rules it was logged under."""
+    if len(header) < HEADER_SIZE:
+        raise HistoryError("Truncated history header.")
+    magic, version, record_size, rules = HEADER_STRUCT.unpack(header)
+    if magic != HISTORY_MAGIC:
+        raise HistoryError("Not a hand-history log.")
+    if version != HISTORY_VERSION or record_size != RECORD_SIZE:
+        raise HistoryError(f"Unsupported history format (version {version}, record size {record_size}).")
+    return Rules.unpack(rules)
+
+
+class HistoryReader:
+    """
+    Memory-mapped, random-access view of a history log.
+    A partially written trailing record (e.g. after a crash) is ignored.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise HistoryError("Truncated history header.")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.rules = _check_header(self._map[:HEADER_SIZE])
+        self._count = (size - HEADER_SIZE) // RECORD_SIZE
+        self._body = memoryview(self._map)[HEADER_SIZE:HEADER_SIZE + self._count * RECORD_SIZE]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> HandRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("history record index out of range")
+        return decode_record(self._body, index * RECORD_SIZE)
+
+    def __iter__(self) -> Iterator[HandRecord]:
+        for index in range(self._count):
+            yield decode_record(self._body, index * RECORD_SIZE)
+
+    def scan(self, *fields: str) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yields the given fields of every record without decoding the rest.
+
+        Args:
+            fields: Names from RECORD_FIELDS. Multi-value fields such as "bets"
+                contribute one value per slot.
+        """
+        ordered = sorted(fields, key=lambda name: FIELD_LAYOUT[name][0])
+        parts, position, slices, start = ["<"], 0, {}, 0
+        for name in ordered:
+            offset, fmt = FIELD_LAYOUT[name]
+            width = len(struct.unpack("<" + fmt, bytes(struct.calcsize("<" + fmt))))
+            parts.append(f"{offset - position}x{fmt}")
+            position = offset + struct.calcsize("<" + fmt)
+            slices[name] = slice(start, start + width)
+            start += width
+        parts.append(f"{RECORD_SIZE - position}x")
+        rows = struct.Struct("".join(parts)).iter_unpack(self._body)
+        if list(fields) == ordered:
+            return rows
+        # Restore the caller's field order
+        order = [slices[name] for name in fields]
+        return (sum((row[part] for part in order), ()) for row in rows)
+
+    def where(self, predicate: Callable[..., bool], *fields: str) -> List[int]:
+        """Indices of the records for which `predicate(*field_values)` is true."""
+        return list(compress(count(), starmap(predicate, self.scan(*fields))))
+
+    def records(self, indices: Iterable[int]) -> Iterator[HandRecord]:
+        """Decodes the records at the given indices."""
+        for index in indices:
+            yield self[index]
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._body.release()
+        self._map.close()
+
+    def __enter__(self) -> "HistoryReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+# =============================================================================
+# BLOCK 5: REPLAY VERIFICATION
+# =============================================================================
+
+class ReplayShoe(Shoe):
+    """A shoe that deals a logged card sequence; used to re-run one round."""
+
+    def __init__(self, cards: Iterable[Card], num_decks: int = DEFAULT_DECKS):
+        self._script = list(cards)
+        # Penetration 0 makes start_round reshuffle, which loads the script
+        super().__init__(num_decks, 0.0)
+
+    def shuffle(self) -> None:
+        self._order = list(self._script)
+        self.position = 0
+        self.counts = list(self._full_counts)
+        self.shuffle_count += 1
+
+    def draw(self) -> Card:
+        if self.position >= len(self._order):
+            raise HistoryError("The logged round ran out of cards.")
+        return super().draw()
+
+
+def replay_record(record: HandRecord, rules: Rules = DEFAULT_RULES) -> List[str]:
+    """
+    Re-plays a logged round through the rules engine.
+
+    Args:
+        record: The logged round.
+        rules: Rules the log was written under (`HistoryReader.rules`).
+    Returns:
+        A description of every field that differs from the log (empty if the round matches).
+    """
+    shoe = ReplayShoe(record.cards, rules.num_decks)
+    engine = BlackjackEngine(bankroll=record.bankroll, shoe=shoe, rules=rules)
+    actions = {"HIT": engine.hit, "STAND": engine.stand, "SPLIT": engine.split_pair,
+               "DOUBLE": engine.double_down, "SURRENDER": engine.surrender}
+    try:
+        engine.start_round(record.base_bet)
+        for action in record.actions:
+            actions[action]()
+        if engine.phase == PHASE_PLAYER:
+            return ["player turn unfinished after the logged actions"]
+        result = engine.play_dealer_turn()
+    except (GameRuleError, HistoryError) as error:
+        return [str(error)]
+
+    problems = []
+    expected = (
+        ("total_payout", result.total_payout), ("total_wagered", result.total_wagered),
+        ("dealer_score", result.dealer_score), ("bets", tuple(engine.player_bets)),
+        ("statuses", tuple(engine.hand_statuses)), ("cards", len(engine.dealt_cards)),
+    )
+    for name, value in expected:
+        logged = getattr(record, name)
+        if name == "cards":
+            logged = len(logged)
+        if logged != value:
+            problems.append(f"{name}: logged {logged!r}, replayed {value!r}")
+    return problems
+
+
+class VerifyReport(NamedTuple):
+    """Result of `verify_log`."""
+    checked: int
+    mismatches: List[Tuple[int, List[str]]]     # (round_id, problems)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def verify_log(path: str = DEFAULT_HISTORY_PATH) -> VerifyReport:
+    """Replays every round in a log and collects the ones that do not match."""
+    mismatches = []
+    with HistoryReader(path) as reader:
+        for record in reader:
+            problems = replay_record(record, reader.rules)
+            if problems:
+                mismatches.append((record.round_id, problems))
+        return VerifyReport(len(reader), mismatches)
+
+# =============================================================================
+# BLOCK 6: COMMAND LINE
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and verify a Blackjack hand-history log.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_HISTORY_PATH, help="History log to read.")
+    parser.add_argument("--verify", action="store_true", help="Replay every hand and check its payout.")
+    args = parser.parse_args(argv)
+
+    with HistoryReader(args.path) as reader:
+        nets = [int(payout) - wagered for payout, wagered in reader.scan("total_payout", "total_wagered")]
+        print(f"{len(reader)} hands ({reader.rules.describe()}), net {sum(nets):+d}, "
+              f"{sum(n > 0 for n in nets)} won / {sum(n < 0 for n in nets)} lost / {sum(n == 0 for n in nets)} pushed")
+    if args.verify:
+        report = verify_log(args.path)
+        for round_id, problems in report.mismatches:
+            print(f"round {round_id}: " + "; ".join(problems), file=sys.stderr)
+        print(f"verified {report.checked} hands, {len(report.mismatches)} mismatches")
+        return 0 if report.ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""
+Checkpointed, sharded simulation jobs for Blackjack Ultimate.
+
+A job plays a fixed number of shards of SHARD_ROUNDS rounds each. Shard i is
+played on its own engine seeded with `derive_seed(master_seed, i)`, exactly like
+a worker of `simulate_parallel`, so the result of every shard is fixed by the
+job and no matter which machine or process plays it.
+
+Every shard lives in one results file in the job directory. While it runs, the
+file is rewritten atomically every CHECKPOINT_ROUNDS rounds. It holds the
+aggregate statistics so far: counts, sums and sums of squares of the payouts,
+overall and per starting hand state, plus hand-status counts. It also holds a
+snapshot of the engine (blackjack_snapshot), shuffler included. A killed job
+therefore resumes each shard from its last checkpoint and finishes it with the
+same cards it would have dealt uninterrupted. Finished shards are skipped.
+
+Shard files only hold integer counts and sums, so shards played on different
+machines (`--part K/M` splits the shards) merge exactly with
+`python blackjack_jobs.py merge DIR ...`.
+
+Shard file layout: SHARD_STRUCT (magic, version, job settings, shard identity,
+progress), TOTALS_STRUCT, one count per STATUS_NAMES entry, a state count and
+one STATE_STRUCT per starting hand state, then the engine snapshot (empty once
+the shard is finished).
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import glob
+import hashlib
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from blackjack_parallel import (
+    DEFAULT_BET, Policy, SimulationStats, derive_seed, play_rounds, seat_engine,
+)
+from blackjack_rules import DEFAULT_RULES, PACKED_RULES_SIZE, Rules, add_rule_arguments, rules_from_args
+from blackjack_shoe import DEFAULT_PENETRATION
+from blackjack_snapshot import SnapshotError, capture, decode_snapshot, encode_snapshot, restore_engine
+
+SHARD_MAGIC = b"BJSHRD"
+SHARD_VERSION = 2
+SHARD_EXTENSION = ".bjr"
+
+SHARD_ROUNDS = 1_000_000        # Rounds per shard (about 20 s on one core)
+CHECKPOINT_ROUNDS = 100_000     # Rounds between two checkpoints of a running shard
+CONFIDENCE_Z = 1.96             # 95% confidence intervals
+POLICY_ID_SIZE = 32
+
+# Hand statuses counted per shard, in file order
+STATUS_NAMES = ("Stand", "Bust", "Blackjack", "Surrender")
+
+# magic, version, rules, policy id, bet, penetration, master seed, shard index,
+# shard rounds, rounds done, snapshot size
+SHARD_STRUCT = struct.Struct(f"<6sH{PACKED_RULES_SIZE}s{POLICY_ID_SIZE}sIdQIQQI")
+TOTALS_STRUCT = struct.Struct("<qQQQQ")                 # net, net squared, wins, losses, pushes
+STATUS_STRUCT = struct.Struct(f"<{len(STATUS_NAMES)}Q")
+STATE_COUNT_STRUCT = struct.Struct("<H")
+STATE_STRUCT = struct.Struct("<BBBQqQ")                 # total, soft, upcard, rounds, net, net squared
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class JobError(Exception):
+    """Raised for malformed shard files and shards that do not belong together."""
+
+
+class JobSettings(NamedTuple):
+    """Everything that has to match for shards to be merged."""
+    rules: Rules = DEFAULT_RULES
+    policy: str = "basic"               # Policy name, or "chart:<digest>" for a chart CSV
+    bet: int = DEFAULT_BET
+    penetration: float = DEFAULT_PENETRATION
+    shard_rounds: int = SHARD_ROUNDS
+
+
+class Shard(NamedTuple):
+    """One decoded shard file."""
+    settings: JobSettings
+    master_seed: int
+    index: int
+    stats: SimulationStats
+    snapshot: bytes                     # Engine to continue from; empty once finished
+
+    @property
+    def finished(self) -> bool:
+        """True once all of the shard's rounds are played."""
+        return self.stats.rounds >= self.settings.shard_rounds
+
+
+def policy_id(spec: str) -> str:
+    """Identity of a policy spec that is the same on every machine (charts by content)."""
+    if os.path.isfile(spec):
+        with open(spec, "rb") as f:
+            return "chart:" + hashlib.sha256(f.read()).hexdigest()[:16]
+    return spec
+
+
+def shard_path(directory: str, master_seed: int, index: int) -> str:
+    """Results file of one shard of a job."""
+    return os.path.join(directory, f"shard-{master_seed:016x}-{index:06d}{SHARD_EXTENSION}")
+
+# =============================================================================
+# BLOCK 3: SHARD FILES
+# =============================================================================
+
+def encode_shard(shard: Shard) -> bytes:
+    """Packs a shard into its file form."""
+    settings, stats = shard.settings, shard.stats
+    policy = settings.policy.encode("ascii")
+    if len(policy) > POLICY_ID_SIZE:
+        raise JobError(f"Policy name {settings.policy!r} is longer than {POLICY_ID_SIZE} characters.")
+    parts = [
+        SHARD_STRUCT.pack(SHARD_MAGIC, SHARD_VERSION, settings.rules.pack(), policy, settings.bet,
+                          settings.penetration, shard.master_seed, shard.index, settings.shard_rounds,
+                          stats.rounds, len(shard.snapshot)),
+        TOTALS_STRUCT.pack(stats.net, stats.net_sq, stats.wins, stats.losses, stats.pushes),
+        STATUS_STRUCT.pack(*(stats.hand_statuses.get(status, 0) for status in STATUS_NAMES)),
+        STATE_COUNT_STRUCT.pack(len(stats.hand_states)),
+    ]
+    parts += [STATE_STRUCT.pack(total, soft, upcard, *cell)
+              for (total, soft, upcard), cell in sorted(stats.hand_states.items())]
+    parts.append(shard.snapshot)
+    return b"".join(parts)
+
+
+def decode_shard(data: bytes) -> Shard:
+    """
+    Unpacks a shard file.
+
+    Raises:
+        JobError: If the data is not a complete shard file of this format.
+    """
+    try:
+        (magic, version, rules, policy, bet, penetration, master_seed, index, shard_rounds,
+         rounds, snapshot_size) = SHARD_STRUCT.unpack_from(data, 0)
+        if magic != SHARD_MAGIC:
+            raise JobError("Not a simulation shard.")
+        if version != SHARD_VERSION:
+            raise JobError(f"Unsupported shard version {version}.")
+        offset = SHARD_STRUCT.size
+
+        stats = SimulationStats()
+        stats.rounds = rounds
+        stats.net, stats.net_sq, stats.wins, stats.losses, stats.pushes = TOTALS_STRUCT.unpack_from(data, offset)
+        offset += TOTALS_STRUCT.size
+        stats.hand_statuses = {status: count for status, count
+                               in zip(STATUS_NAMES, STATUS_STRUCT.unpack_from(data, offset)) if count}
+        offset += STATUS_STRUCT.size
+        (num_states,) = STATE_COUNT_STRUCT.unpack_from(data, offset)
+        offset += STATE_COUNT_STRUCT.size
+        for total, soft, upcard, *cell in STATE_STRUCT.iter_unpack(
+                data[offset:offset + num_states * STATE_STRUCT.size]):
+            stats.hand_states[(total, bool(soft), upcard)] = cell
+        offset += num_states * STATE_STRUCT.size
+        if len(stats.hand_states) != num_states or len(data) != offset + snapshot_size:
+            raise JobError("Truncated shard file.")
+    except struct.error as error:
+        raise JobError(f"Malformed shard file: {error}") from None
+
+    settings = JobSettings(Rules.unpack(rules), policy.rstrip(b"\0").decode("ascii"), bet, penetration, shard_rounds)
+    return Shard(settings, master_seed, index, stats, bytes(data[offset:]))
+
+
+def write_shard(path: str, shard: Shard) -> None:
+    """Writes a shard file atomically (temporary file, then rename), so a kill never leaves half a checkpoint."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".shard-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(encode_shard(shard))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_shard(path: str) -> Shard:
+    """
+    Reads one shard file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        JobError: If it is not a valid shard file.
+    """
+    with open(path, "rb") as f:
+        return decode_shard(f.read())
+
+# =============================================================================
+# BLOCK 4: RUNNING SHARDS
+# =============================================================================
+
+def run_shard(path: str, settings: JobSettings, master_seed: int, index: int, policy: Policy,
+              checkpoint_rounds: int = CHECKPOINT_ROUNDS) -> int:
+    """
+    Plays one shard to the end, checkpointing it to `path` as it goes.
+    Continues from the checkpoint in `path` if there is one. Runs inside a
+    worker process; `policy` must be picklable.
+
+    Returns:
+        Rounds played by this call.
+    """
+    stats, engine = SimulationStats(), None
+    if os.path.exists(path):
+        shard = read_shard(path)
+        if shard.finished:
+            return 0
+        stats = shard.stats
+        try:
+            engine = restore_engine(decode_snapshot(shard.snapshot))
+        except SnapshotError as error:
+            raise JobError(f"{path}: unusable checkpoint ({error})") from None
+    if engine is None:
+        engine = seat_engine(derive_seed(master_seed, index), settings.rules, settings.penetration)
+
+    played = 0
+    while stats.rounds < settings.shard_rounds:
+        chunk = min(checkpoint_rounds, settings.shard_rounds - stats.rounds)
+        play_rounds(engine, chunk, stats, settings.bet, policy)
+        played += chunk
+        snapshot = encode_snapshot(capture(engine)) if stats.rounds < settings.shard_rounds else b""
+        write_shard(path, Shard(settings, master_seed, index, stats, snapshot))
+    return played
+
+
+def run_job(directory: str, settings: JobSettings, shards: int, policy: Policy,
+            master_seed: Optional[int] = None, workers: Optional[int] = None,
+            part: Tuple[int, int] = (0, 1), checkpoint_rounds: int = CHECKPOINT_ROUNDS,
+            verbose: bool = True) -> int:
+    """
+    Plays the unfinished shards of a job, resuming the checkpointed ones.
+
+    Args:
+        directory: Job directory holding one results file per shard.
+        settings: Job settings; they must match the shards already in `directory`.
+        shards: Number of shards in the whole job.
+        policy: Decision function for every round (picklable).
+        master_seed: Seed the shard streams derive from. Defaults to the seed of the
+            shards already in `directory`, or a random one for a new job.
+        workers: Processes (defaults to all cores).
+        part: (k, m) plays only the shards with index % m == k, to split a job over machines.
+        checkpoint_rounds: Rounds between checkpoints of a running shard.
+        verbose: Print one line per finished shard.
+    Returns:
+        The master seed of the job.
+
+    Raises:
+        JobError: If `directory` holds shards of different settings or another seed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    existing = [read_shard(path) for path in list_shards([directory])]
+    for shard in existing:
+        if shard.settings != settings:
+            raise JobError(f"{directory} holds a job with other settings ({describe_settings(shard.settings)}).")
+    seeds = {shard.master_seed for shard in existing}
+    if master_seed is None:
+        if len(seeds) > 1:
+            raise JobError(f"{directory} holds shards of several master seeds; pass the seed to resume.")
+        master_seed = seeds.pop() if seeds else random.SystemRandom().getrandbits(63)
+    elif seeds - {master_seed}:
+        raise JobError(f"{directory} holds shards of another master seed.")
+
+    done = {shard.index for shard in existing if shard.finished and shard.master_seed == master_seed}
+    pending = [i for i in range(part[0], shards, part[1]) if i not in done]
+    if verbose:
+        print(f"job {describe_settings(settings)}, seed {master_seed}: {len(pending)} of "
+              f"{len(range(part[0], shards, part[1]))} shards to play")
+    if not pending:
+        return master_seed
+
+    start, played, finished = time.perf_counter(), 0, 0
+
+    def report(index: int, rounds: int) -> None:
+        nonlocal played, finished
+        played += rounds
+        finished += 1
+        if verbose:
+            rate = played / max(time.perf_counter() - start, 1e-9)
+            print(f"shard {index} done ({finished}/{len(pending)}, {rate:,.0f} rounds/s)")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for index in pending:
+            report(index, run_shard(shard_path(directory, master_seed, index), settings, master_seed, index,
+                                    policy, checkpoint_rounds))
+        return master_seed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_shard, shard_path(directory, master_seed, index), settings, master_seed,
+                               index, policy, checkpoint_rounds): index for index in pending}
+        try:
+            while futures:
+                finished_now, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished_now:
+                    report(futures.pop(future), future.result())
+        except BaseException:
+            # Shards in flight keep their last checkpoint; the rest never started
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return master_seed
+
+# =============================================================================
+# BLOCK 5: MERGING
+# =============================================================================
+
+def list_shards(paths: Iterable[str]) -> List[str]:
+    """Shard files named directly or found in the given directories."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, "*" + SHARD_EXTENSION)))
+        else:
+            files.append(path)
+    return files
+
+
+def merge_shards(paths: Iterable[str]) -> Tuple[JobSettings, SimulationStats, int, int]:
+    """
+    Merges shard files, possibly produced on different machines.
+
+    Returns:
+        (settings, merged statistics, finished shards, unfinished shards).
+    Raises:
+        JobError: If the shards have different settings, a shard appears twice or there are none.
+    """
+    settings, total = None, SimulationStats()
+    seen: Dict[Tuple[int, int], str] = {}
+    finished = unfinished = 0
+    for path in list_shards(paths):
+        try:
+            shard = read_shard(path)
+        except OSError as error:
+            raise JobError(f"{path}: {error}") from None
+        if settings is None:
+            settings = shard.settings
+        elif shard.settings != settings:
+            raise JobError(f"{path} was played with other settings ({describe_settings(shard.settings)}).")
+        key = (shard.master_seed, shard.index)
+        if key in seen:
+            raise JobError(f"{path} repeats shard {shard.index} of {seen[key]}.")
+        seen[key] = path
+        total.merge(shard.stats)
+        if shard.finished:
+            finished += 1
+        else:
+            unfinished += 1
+    if settings is None:
+        raise JobError("No shard files found.")
+    return settings, total, finished, unfinished
+
+# =============================================================================
+# BLOCK 6: REPORT
+# =============================================================================
+
+def describe_settings(settings: JobSettings) -> str:
+    """One-line summary of a job's settings."""
+    return (f"{settings.rules.describe()}, policy {settings.policy}, bet {settings.bet}, "
+            f"penetration {settings.penetration:.0%}, {settings.shard_rounds:,} rounds/shard")
+
+
+def ev_interval(rounds: int, net: int, net_sq: int, bet: int) -> Tuple[float, float]:
+    """Mean net per round in bets and the half-width of its 95% confidence interval."""
+    if rounds == 0:
+        return 0.0, 0.0
+    mean = net / rounds
+    variance = max(net_sq / rounds - mean * mean, 0.0)
+    return mean / bet, CONFIDENCE_Z * math.sqrt(variance / rounds) / bet
+
+
+def state_label(state: Tuple[int, bool, int]) -> str:
+    """A starting hand state such as "soft 18 vs 10" or "hard 16 vs A"."""
+    total, soft, upcard = state
+    return f"{'soft' if soft else 'hard'} {total} vs {'A' if upcard == 11 else upcard}"
+
+
+def format_report(settings: JobSettings, stats: SimulationStats, finished: int, unfinished: int,
+                  show_states: bool = False) -> List[str]:
+    """The merged results of a job as text lines."""
+    ev, ci = ev_interval(stats.rounds, stats.net, stats.net_sq, settings.bet)
+    n = max(stats.rounds, 1)
+    lines = [f"job:         {describe_settings(settings)}",
+             f"shards:      {finished} finished, {unfinished} in progress",
+             f"rounds:      {stats.rounds:,}",
+             f"house edge:  {-ev:+.4%} ± {ci:.4%}",
+             f"W / L / P:   {stats.wins / n:.2%} / {stats.losses / n:.2%} / {stats.pushes / n:.2%}",
+             "hands:       " + ", ".join(f"{status} {stats.hand_statuses.get(status, 0):,}"
+                                         for status in STATUS_NAMES if stats.hand_statuses.get(status))]
+    if show_states:
+        lines.append(f"{'starting state':<16}{'rounds':>14}{'EV per bet':>12}{'± 95%':>9}")
+        for state, (rounds, net, net_sq) in sorted(stats.hand_states.items()):
+            state_ev, state_ci = ev_interval(rounds, net, net_sq, settings.bet)
+            lines.append(f"{state_label(state):<16}{rounds:>14,}{state_ev:>+12.4f}{state_ci:>9.4f}")
+    return lines
+
+# =============================================================================
+# BLOCK 7: COMMAND LINE
+# =============================================================================
+
+def parse_part(text: str) -> Tuple[int, int]:
+    """"K/M" -> (K, M): the K-th of M machines sharing a job (0 <= K < M)."""
+    k, _, m = text.partition("/")
+    try:
+        part = int(k), int(m)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Part must look like 0/4, not {text!r}.") from None
+    if not 0 <= part[0] < part[1]:
+        raise argparse.ArgumentTypeError(f"Part {text!r} is out of range.")
+    return part
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Checkpointed, sharded Blackjack simulation jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Play (or resume) the shards of a job.")
+    run.add_argument("directory", help="Job directory; rerun the same command to resume.")
+    run.add_argument("--rounds", type=int, required=True, help="Rounds in the whole job (rounded up to shards).")
+    run.add_argument("--shard-rounds", type=int, default=SHARD_ROUNDS)
+    run.add_argument("--seed", type=int, help="Master seed (default: the job's, or a random one).")
+    run.add_argument("--workers", type=int, help="Processes (defaults to all cores).")
+    run.add_argument("--part", type=parse_part, default=(0, 1),
+                     help="K/M: play only every M-th shard starting at K, to share a job between machines.")
+    run.add_argument("--policy", default="basic", help="basic, exact, never-bust, mimic-dealer or a chart CSV.")
+    run.add_argument("--bet", type=int, default=DEFAULT_BET)
+    run.add_argument("--penetration", type=float, default=DEFAULT_PENETRATION)
+    add_rule_arguments(run)
+
+    merge = commands.add_parser("merge", help="Combine shard files or job directories into one report.")
+    merge.add_argument("paths", nargs="+", help="Shard files or job directories.")
+    merge.add_argument("--states", action="store_true", help="Also list the EV of every starting hand state.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "run":
+            from blackjack_tournament import resolve_policy
+            rules = rules_from_args(args)
+            policy = resolve_policy(args.policy, rules)
+            settings = JobSettings(rules, policy_id(args.policy), args.bet, args.penetration, args.shard_rounds)
+            shards = -(-args.rounds // args.shard_rounds)
+            try:
+                run_job(args.directory, settings, shards, policy, args.seed, args.workers, args.part)
+            except KeyboardInterrupt:
+                print("interrupted: finished shards and checkpoints are kept, rerun to resume", file=sys.stderr)
+                return 130
+            args.paths, args.states = [args.directory], False
+        for line in format_report(*merge_shards(args.paths), show_states=args.states):
+            print(line)
+    except (ValueError, JobError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Multi-core simulation for Blackjack Ultimate.
+
+Splits a job of N rounds across a process pool. Every worker drives its own
+BlackjackEngine with an independent, seeded random.Random stream derived from a
+master seed, so a run is bit-identical for the same master seed and worker count.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import hashlib
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from blackjack_engine import (
+    BlackjackEngine, RoundResult, basic_strategy_policy, calculate_hand_score,
+)
+from blackjack_rules import DEFAULT_RULES, Rules
+from blackjack_shoe import DEFAULT_PENETRATION, Shoe
+
+DEFAULT_BET = 10
+
+# Key of a starting hand: (player total, is_soft, dealer upcard value)
+HandState = Tuple[int, bool, int]
+Policy = Callable[[BlackjackEngine], str]
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class SimulationStats:
+    """
+    Mergeable aggregate of simulated rounds.
+    Only holds integer counts, sums and sums of squares, so merging is exact and
+    order-independent, and variances follow from the merged sums.
+    """
+
+    def __init__(self) -> None:
+        self.rounds = 0
+        self.net = 0                # Sum of bankroll changes over all rounds
+        self.net_sq = 0             # Sum of their squares
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        self.hand_statuses: Dict[str, int] = {}
+        # Per starting state: [rounds, net, net squared]
+        self.hand_states: Dict[HandState, List[int]] = {}
+
+    def record(self, state: HandState, statuses: List[str], result: RoundResult) -> None:
+        """Adds one resolved round that started in `state`."""
+        net = result.net
+        self.rounds += 1
+        self.net += net
+        self.net_sq += net * net
+        if net > 0:
+            self.wins += 1
+        elif net < 0:
+            self.losses += 1
+        else:
+            self.pushes += 1
+        for status in statuses:
+            self.hand_statuses[status] = self.hand_statuses.get(status, 0) + 1
+        cell = self.hand_states.get(state)
+        if cell is None:
+            self.hand_states[state] = [1, net, net * net]
+        else:
+            cell[0] += 1
+            cell[1] += net
+            cell[2] += net * net
+
+    def merge(self, other: "SimulationStats") -> "SimulationStats":
+        """Adds the counts of another worker's statistics into this one."""
+        self.rounds += other.rounds
+        self.net += other.net
+        self.net_sq += other.net_sq
+        self.wins += other.wins
+        self.losses += other.losses
+        self.pushes += other.pushes
+        for status, count in other.hand_statuses.items():
+            self.hand_statuses[status] = self.hand_statuses.get(status, 0) + count
+        for state, (rounds, net, net_sq) in other.hand_states.items():
+            cell = self.hand_states.setdefault(state, [0, 0, 0])
+            cell[0] += rounds
+            cell[1] += net
+            cell[2] += net_sq
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SimulationStats) and vars(self) == vars(other)
+
+# =============================================================================
+# BLOCK 3: WORKERS
+# =============================================================================
+
+def derive_seed(master_seed: int, worker_index: int) -> int:
+    """Derives an independent 64-bit seed for one worker from the master seed."""
+    digest = hashlib.sha256(f"{master_seed}:{worker_index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def split_rounds(n_rounds: int, workers: int) -> List[int]:
+    """Splits `n_rounds` into `workers` near-equal, deterministic chunks."""
+    base, extra = divmod(n_rounds, workers)
+    return [base + (1 if i < extra else 0) for i in range(workers)]
+
+
+def seat_engine(seed: int, rules: Rules = DEFAULT_RULES,
+                penetration: float = DEFAULT_PENETRATION) -> BlackjackEngine:
+    """A worker's engine, dealing from its own shoe seeded with `seed`."""
+    rng = random.Random(seed)
+    shoe = Shoe(rules.num_decks, penetration, rng=rng)
+    return BlackjackEngine(rng=rng, shoe=shoe, rules=rules)
+
+
+def play_rounds(engine: BlackjackEngine, n_rounds: int, stats: SimulationStats, bet: int = DEFAULT_BET,
+                policy: Policy = basic_strategy_policy) -> SimulationStats:
+    """Plays `n_rounds` flat-bet rounds on `engine` and records them into `stats`."""
+    # Enough money for every round to be split to the hand limit and every hand doubled
+    stake = bet * 2 * engine.rules.max_hands
+    for _ in range(n_rounds):
+        engine.bankroll = stake
+        engine.start_round(bet)
+        score, is_soft = calculate_hand_score(engine.current_hand)
+        state = (score, is_soft, engine.dealer_upcard.get_blackjack_value())
+        engine.play_player_turn(policy)
+        result = engine.play_dealer_turn()
+        stats.record(state, engine.hand_statuses, result)
+    return stats
+
+
+def run_rounds(n_rounds: int, seed: int, bet: int = DEFAULT_BET,
+               policy: Policy = basic_strategy_policy, rules: Rules = DEFAULT_RULES,
+               penetration: float = DEFAULT_PENETRATION) -> SimulationStats:
+    """
+    Plays `n_rounds` on one engine seeded with `seed`.
+    Runs inside a worker process; `policy` must be a picklable top-level function.
+    """
+    return play_rounds(seat_engine(seed, rules, penetration), n_rounds, SimulationStats(), bet, policy)
+
+
+def simulate_parallel(n_rounds: int, master_seed: Optional[int] = None, workers: Optional[int] = None,
+                      bet: int = DEFAULT_BET, policy: Policy = basic_strategy_policy,
+                      rules: Rules = DEFAULT_RULES,
+                      penetration: float = DEFAULT_PENETRATION) -> SimulationStats:
+    """
+    Simulates `n_rounds` across a process pool and merges the workers' statistics.
+
+    Args:
+        n_rounds: Total number of rounds to play.
+        master_seed: Seed all worker streams derive from; None picks a random one.
+        workers: Number of processes (defaults to all cores).
+        bet: Stake of every round.
+        policy: Decision function, "HIT", "STAND", "SPLIT", "DOUBLE" or
+            "SURRENDER" per engine state.
+        rules: Table rules, including the decks per worker shoe.
+        penetration: Fraction of each shoe dealt before the cut card.
+    Returns:
+        The merged SimulationStats, identical for the same seed and worker count.
+    """
+    if master_seed is None:
+        master_seed = random.SystemRandom().getrandbits(64)
+    workers = workers or os.cpu_count() or 1
+    chunks = split_rounds(n_rounds, workers)
+    seeds = [derive_seed(master_seed, i) for i in range(workers)]
+
+    if workers == 1:
+        return run_rounds(chunks[0], seeds[0], bet, policy, rules, penetration)
+
+    total = SimulationStats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, so the merge order is fixed too
+        for stats in pool.map(run_rounds, chunks, seeds, [bet] * workers, [policy] * workers,
+                              [rules] * workers, [penetration] * workers):
+            total.merge(stats)
+    return total
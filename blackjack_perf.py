@@ -0,0 +1,169 @@
+"""
+Latency instrumentation for Blackjack Ultimate.
+
+`PerfMonitor.timed(name)` wraps a method so that, while the monitor is enabled,
+each call's wall-clock latency is recorded into a fixed-size histogram. With the
+monitor disabled the wrapper costs one attribute check per call and records
+nothing. Histograms use logarithmic buckets, so recording is O(1), memory is
+bounded no matter how long the session runs, and percentiles are read in one
+pass over the buckets.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import functools
+import json
+import math
+import time
+from typing import Any, Callable, Dict, List, TypeVar
+
+HISTOGRAM_BUCKETS = 64
+HISTOGRAM_MIN_SECONDS = 1e-6        # Upper edge of the first bucket (1 µs)
+HISTOGRAM_GROWTH = 1.25             # Each bucket is 25% wider than the previous one (last edge ≈ 1.3 s)
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+PERF_ENV_VAR = "BLACKJACK_PERF"     # Set to 1 to record latencies from startup
+DEFAULT_EXPORT_PATH = "blackjack_perf.json"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# =============================================================================
+# BLOCK 2: HISTOGRAM
+# =============================================================================
+
+def bucket_upper_bound(index: int) -> float:
+    """Upper edge of a histogram bucket, in seconds."""
+    return HISTOGRAM_MIN_SECONDS * HISTOGRAM_GROWTH ** index
+
+
+class LatencyHistogram:
+    """Fixed-size, log-bucketed histogram of call latencies."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Adds one sample (in seconds)."""
+        if seconds <= HISTOGRAM_MIN_SECONDS:
+            index = 0
+        else:
+            index = min(math.ceil(math.log(seconds / HISTOGRAM_MIN_SECONDS) / _LOG_GROWTH),
+                        HISTOGRAM_BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Latency below which a fraction `q` of the samples fall, in seconds.
+        Reported as the upper edge of the matching bucket (at most the observed max).
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Average latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def clear(self) -> None:
+        """Drops every sample."""
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+# =============================================================================
+# BLOCK 3: MONITOR
+# =============================================================================
+
+class PerfMonitor:
+    """
+    Named latency histograms plus the decorator that feeds them.
+    Toggle recording at runtime through `enabled`.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """The histogram for `name`, created on first use."""
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        return hist
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """
+        Decorator recording the latency of every call under `name`.
+
+        Args:
+            name: Histogram the calls are recorded into (e.g. "hit").
+        """
+        hist = self.histogram(name)
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    hist.record(time.perf_counter() - start)
+            return wrapper  # type: ignore[return-value]
+        return decorator
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Call count and latency figures (in milliseconds) of every histogram with samples."""
+        return {
+            name: {
+                "count": hist.count,
+                "p50_ms": hist.percentile(0.50) * 1000,
+                "p99_ms": hist.percentile(0.99) * 1000,
+                "mean_ms": hist.mean * 1000,
+                "max_ms": hist.max * 1000,
+            }
+            for name, hist in self.histograms.items() if hist.count
+        }
+
+    def format_lines(self) -> List[str]:
+        """One aligned text line per recorded action, for on-screen display."""
+        return [f"{name:<16} p50 {stats['p50_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms  n={stats['count']}"
+                for name, stats in self.summary().items()]
+
+    def has_samples(self) -> bool:
+        """True once at least one call has been recorded."""
+        return any(hist.count for hist in self.histograms.values())
+
+    def export(self, path: str = DEFAULT_EXPORT_PATH) -> None:
+        """Writes the summary and the raw bucket counts as JSON."""
+        report = {
+            "bucket_min_seconds": HISTOGRAM_MIN_SECONDS,
+            "bucket_growth": HISTOGRAM_GROWTH,
+            "summary": self.summary(),
+            "buckets": {name: hist.counts for name, hist in self.histograms.items() if hist.count},
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    def reset(self) -> None:
+        """Clears every histogram."""
+        for hist in self.histograms.values():
+            hist.clear()
@@ -0,0 +1,238 @@
+"""
+Retained-mode table renderer for Blackjack Ultimate.
+
+Keeps one group of canvas items per dealt card and reconciles it with the game
+state on every update: new cards get new items, cards whose slot moved are
+shifted with `canvas.move`, and the dealer's hole card is flipped in place by
+toggling item states. Nothing is deleted and redrawn between actions.
+
+The renderer only calls canvas methods, so it never imports tkinter and can be
+driven by any object with the same interface (e.g. a recording stand-in).
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+from typing import Any, List, Optional, Sequence
+
+from blackjack_cards import Card, calculate_hand_score
+
+# --- Layout --------------------------------------------------------
+CARD_WIDTH = 80
+CARD_HEIGHT = 120
+DEALER_Y = 90
+DEALER_CARD_STEP = 50
+PLAYER_CARD_STEP = 30
+PLAYER_HAND_WIDTH = 300
+PLAYER_Y_OFFSET = 260           # Player cards sit this far above the bottom of the canvas
+
+# --- Card Colors ---------------------------------------------------
+COLOR_CARD_BACK = "#c0392b"
+COLOR_CARD_BACK_LINES = "#e74c3c"
+
+# =============================================================================
+# BLOCK 2: SPRITES
+# =============================================================================
+
+class CardSprite:
+    """Canvas items of one card, all sharing a unique tag so they move together."""
+    __slots__ = ("tag", "x", "y", "card", "face_up", "front", "back", "rank_text", "suit_texts")
+
+    def __init__(self, tag: str, x: float, y: float, card: Card):
+        self.tag = tag
+        self.x = x
+        self.y = y
+        self.card = card
+        self.face_up = True
+        self.front: List[int] = []
+        self.back: List[int] = []
+        self.rank_text = 0
+        self.suit_texts: List[int] = []
+
+# =============================================================================
+# BLOCK 3: RENDERER
+# =============================================================================
+
+class TableRenderer:
+    """
+    Draws the dealer's and the player's cards, the hand scores and the active
+    hand indicator, touching only the items whose state changed.
+    """
+
+    def __init__(self, canvas: Any, indicator_color: str):
+        self.canvas = canvas
+        self.indicator_color = indicator_color
+        self._dealer: List[CardSprite] = []
+        self._hands: List[List[CardSprite]] = []
+        self._scores: List[int] = []
+        self._indicator: Optional[int] = None
+        self._next_id = 0
+
+    # -------------------------------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------------------------------
+    def render(self, dealer_hand: Sequence[Card], player_hands: Sequence[Sequence[Card]],
+               active_index: int, show_indicator: bool, hide_dealer: bool,
+               width: int, height: int) -> None:
+        """
+        Brings the canvas in line with the given table state.
+
+        Args:
+            dealer_hand: The dealer's cards; the first one is the hole card.
+            player_hands: The player's hands, in table order.
+            active_index: Index of the hand the player is acting on.
+            show_indicator: Whether to show the yellow active-hand triangle.
+            hide_dealer: Whether the hole card is face down.
+            width, height: Current canvas size.
+        """
+        cx = width // 2
+
+        # Dealer Hand
+        start_x_d = cx - (len(dealer_hand) * 45)
+        positions = [(start_x_d + i * DEALER_CARD_STEP, DEALER_Y) for i in range(len(dealer_hand))]
+        self._sync_cards(self._dealer, dealer_hand, positions, hole_card=True)
+        if self._dealer:
+            self._set_face(self._dealer[0], face_up=not hide_dealer)
+
+        # Player Hand(s)
+        num_hands = len(player_hands)
+        start_x_base = cx - (num_hands * PLAYER_HAND_WIDTH / 2) + (PLAYER_HAND_WIDTH / 2)
+        player_y = height - PLAYER_Y_OFFSET
+        while len(self._hands) > num_hands:
+            self._delete_sprites(self._hands.pop())
+            self.canvas.delete(self._scores.pop())
+        while len(self._hands) < num_hands:
+            self._hands.append([])
+            self._scores.append(self.canvas.create_text(
+                0, 0, text="", fill="white", font=("Arial", 14, "bold"), tags="scores"
+            ))
+
+        created = False
+        for idx, hand in enumerate(player_hands):
+            center_x = start_x_base + (idx * PLAYER_HAND_WIDTH)
+            start_card_x = center_x - (((len(hand) - 1) * PLAYER_CARD_STEP + CARD_WIDTH) / 2)
+            positions = [(start_card_x + i * PLAYER_CARD_STEP, player_y) for i in range(len(hand))]
+            created |= self._sync_cards(self._hands[idx], hand, positions, hole_card=False)
+
+            score, _ = calculate_hand_score(hand)
+            self.canvas.itemconfigure(self._scores[idx], text=f"Score: {score}")
+            self.canvas.coords(self._scores[idx], center_x, player_y + 140)
+
+        # Active hand indicator (Yellow Triangle)
+        if show_indicator and 0 <= active_index < num_hands:
+            center_x = start_x_base + (active_index * PLAYER_HAND_WIDTH)
+            points = (center_x, player_y - 10, center_x - 15, player_y - 30, center_x + 15, player_y - 30)
+            if self._indicator is None:
+                self._indicator = self.canvas.create_polygon(*points, fill=self.indicator_color,
+                                                             tags="indicator")
+            else:
+                self.canvas.coords(self._indicator, *points)
+                self.canvas.itemconfigure(self._indicator, state="normal")
+        elif self._indicator is not None:
+            self.canvas.itemconfigure(self._indicator, state="hidden")
+
+        # Newly created cards would otherwise cover the labels
+        if created:
+            self.canvas.tag_raise("scores")
+            self.canvas.tag_raise("indicator")
+
+    def clear(self) -> None:
+        """Removes every card, score and indicator item (e.g. before a new round)."""
+        self._delete_sprites(self._dealer)
+        for hand in self._hands:
+            self._delete_sprites(hand)
+        for score in self._scores:
+            self.canvas.delete(score)
+        if self._indicator is not None:
+            self.canvas.delete(self._indicator)
+        self._dealer = []
+        self._hands = []
+        self._scores = []
+        self._indicator = None
+
+    # -------------------------------------------------------------------------
+    # RECONCILIATION
+    # -------------------------------------------------------------------------
+    def _sync_cards(self, sprites: List[CardSprite], cards: Sequence[Card],
+                    positions: Sequence[tuple], hole_card: bool) -> bool:
+        """Updates `sprites` in place to show `cards`; returns True if items were created."""
+        while len(sprites) > len(cards):
+            self._delete_sprites([sprites.pop()])
+
+        for sprite, card, (x, y) in zip(sprites, cards, positions):
+            if sprite.x != x or sprite.y != y:
+                self.canvas.move(sprite.tag, x - sprite.x, y - sprite.y)
+                sprite.x, sprite.y = x, y
+            if sprite.card is not card:
+                self._set_card(sprite, card)
+
+        created = len(sprites) < len(cards)
+        for i in range(len(sprites), len(cards)):
+            x, y = positions[i]
+            sprites.append(self._create_sprite(x, y, cards[i], with_back=hole_card and i == 0))
+        return created
+
+    def _create_sprite(self, x: float, y: float, card: Card, with_back: bool) -> CardSprite:
+        """
+        Renders a card on the canvas using vector shapes.
+        Avoids external image dependencies for portability.
+        """
+        self._next_id += 1
+        sprite = CardSprite(f"card{self._next_id}", x, y, card)
+        tags = ("cards", sprite.tag)
+        canvas = self.canvas
+
+        # Shadow effect
+        canvas.create_rectangle(x+5, y+5, x+85, y+125, fill="black", stipple="gray50", tags=tags)
+
+        # Card Front
+        color = "red" if card.is_red() else "black"
+        rank, suit = card.symbols()
+        sprite.front = [canvas.create_rectangle(x, y, x+CARD_WIDTH, y+CARD_HEIGHT, fill="white",
+                                                outline="black", width=2, tags=tags)]
+        sprite.rank_text = canvas.create_text(x+15, y+20, text=rank, fill=color,
+                                              font=("Arial", 14, "bold"), tags=tags)
+        sprite.suit_texts = [
+            canvas.create_text(x+15, y+40, text=suit, fill=color, font=("Arial", 14, "bold"), tags=tags),
+            canvas.create_text(x+40, y+60, text=suit, fill=color, font=("Arial", 36), tags=tags),
+        ]
+        sprite.front += [sprite.rank_text] + sprite.suit_texts
+
+        # Card Back (Red pattern), only needed for the dealer's hole card
+        if with_back:
+            sprite.back = [
+                canvas.create_rectangle(x, y, x+CARD_WIDTH, y+CARD_HEIGHT, fill=COLOR_CARD_BACK,
+                                        outline="white", width=2, tags=tags),
+                canvas.create_line(x, y, x+CARD_WIDTH, y+CARD_HEIGHT, fill=COLOR_CARD_BACK_LINES,
+                                   width=3, tags=tags),
+                canvas.create_line(x+CARD_WIDTH, y, x, y+CARD_HEIGHT, fill=COLOR_CARD_BACK_LINES,
+                                   width=3, tags=tags),
+            ]
+            for item in sprite.front:
+                canvas.itemconfigure(item, state="hidden")
+            sprite.face_up = False
+        return sprite
+
+    def _set_card(self, sprite: CardSprite, card: Card) -> None:
+        """Repaints a sprite's face for a different card (e.g. after a split)."""
+        color = "red" if card.is_red() else "black"
+        rank, suit = card.symbols()
+        self.canvas.itemconfigure(sprite.rank_text, text=rank, fill=color)
+        for item in sprite.suit_texts:
+            self.canvas.itemconfigure(item, text=suit, fill=color)
+        sprite.card = card
+
+    def _set_face(self, sprite: CardSprite, face_up: bool) -> None:
+        """Flips a card in place by hiding its front or back items."""
+        if sprite.face_up == face_up or not sprite.back:
+            return
+        for item in sprite.back:
+            self.canvas.itemconfigure(item, state="hidden" if face_up else "normal")
+        for item in sprite.front:
+            self.canvas.itemconfigure(item, state="normal" if face_up else "hidden")
+        sprite.face_up = face_up
+
+    def _delete_sprites(self, sprites: List[CardSprite]) -> None:
+        """Deletes the canvas items of the given sprites."""
+        for sprite in sprites:
+            self.canvas.delete(sprite.tag)
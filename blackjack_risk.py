@@ -0,0 +1,284 @@
+"""
+Bankroll risk-of-ruin analyzer for Blackjack Ultimate.
+
+Simulates many complete sessions side by side. Every session starts from the
+same bankroll and bets the same stake each round. It plays until it can no
+longer cover the stake (ruin) or reaches a target bankroll.
+
+Rounds are not dealt card by card. The distribution of one round's net result
+is measured once with the vectorized simulator, and every session draws its
+rounds from it in blocks. A cumulative sum per session then gives the bankroll
+path, so 100,000 sessions take seconds.
+
+    python blackjack_risk.py --sessions 100000 --bankroll 1000 --bet 50
+
+Requires NumPy (`pip install numpy`); the game itself does not.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError as error:  # NumPy is optional for the rest of the project
+    raise ImportError(
+        "The risk-of-ruin analyzer requires NumPy. Install it with 'pip install numpy'."
+    ) from error
+
+from blackjack_engine import STARTING_BANKROLL
+from blackjack_rules import DEFAULT_RULES, Rules, add_rule_arguments, rules_from_args
+from blackjack_vectorized import DEFAULT_BATCH_SIZE, play_batch, shuffled_decks
+
+DEFAULT_SESSIONS = 100_000
+DEFAULT_SESSION_BET = 50            # The GUI's default stake
+DEFAULT_TARGET_MULTIPLE = 2         # Default target: double the starting bankroll
+DEFAULT_MAX_ROUNDS = 100_000        # Sessions still running after this many rounds are reported unfinished
+CALIBRATION_ROUNDS = 1_000_000      # Rounds simulated to measure the per-round outcome distribution
+BLOCK_ROUNDS = 64                   # Rounds drawn per session and step (also the trajectory resolution)
+BLOCK_CELLS = 4_000_000             # Sessions x rounds drawn at once, which bounds peak memory
+TRAJECTORY_PERCENTILES = (5, 25, 50, 75, 95)
+LENGTH_PERCENTILES = (10, 25, 50, 75, 90)
+TRAJECTORY_ROWS = 12                # Checkpoints shown by format_report
+
+# Session status codes
+STATUS_ACTIVE = 0
+STATUS_RUINED = 1
+STATUS_TARGET = 2
+STATUS_UNFINISHED = 3
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class OutcomeDistribution(NamedTuple):
+    """Distribution of the net bankroll change of one round at a fixed stake."""
+    nets: "np.ndarray"              # Distinct net results, ascending
+    probabilities: "np.ndarray"
+    bet: int
+
+    @property
+    def mean(self) -> float:
+        """Expected net result of one round."""
+        return float(self.nets @ self.probabilities)
+
+    @property
+    def std(self) -> float:
+        """Standard deviation of one round's net result."""
+        return float(np.sqrt(((self.nets - self.mean) ** 2) @ self.probabilities))
+
+
+class RuinReport(NamedTuple):
+    """Outcome of every simulated session plus bankroll percentiles over time."""
+    bankroll: int
+    target: int
+    bet: int
+    statuses: "np.ndarray"          # STATUS_* per session
+    lengths: "np.ndarray"           # Rounds played per session
+    checkpoints: "np.ndarray"       # Round numbers of the trajectory samples
+    trajectories: "np.ndarray"      # (checkpoints, TRAJECTORY_PERCENTILES) bankroll percentiles
+
+    @property
+    def sessions(self) -> int:
+        return int(self.statuses.size)
+
+    @property
+    def risk_of_ruin(self) -> float:
+        """Share of sessions that went broke."""
+        return float(np.mean(self.statuses == STATUS_RUINED))
+
+    @property
+    def target_rate(self) -> float:
+        """Share of sessions that reached the target."""
+        return float(np.mean(self.statuses == STATUS_TARGET))
+
+    @property
+    def unfinished(self) -> int:
+        """Sessions that hit the round limit before ruin or target."""
+        return int(np.count_nonzero(self.statuses == STATUS_UNFINISHED))
+
+    @property
+    def ruin_standard_error(self) -> float:
+        """Binomial standard error of `risk_of_ruin`."""
+        p = self.risk_of_ruin
+        return float(np.sqrt(p * (1 - p) / self.sessions)) if self.sessions else 0.0
+
+    def length_percentiles(self, status: Optional[int] = None,
+                           q: Sequence[int] = LENGTH_PERCENTILES) -> Dict[int, float]:
+        """
+        Percentiles of session length in rounds.
+
+        Args:
+            status: Only sessions with this STATUS_* code (None = all sessions).
+            q: Percentiles to report.
+        """
+        lengths = self.lengths if status is None else self.lengths[self.statuses == status]
+        if lengths.size == 0:
+            return {}
+        return dict(zip(q, np.percentile(lengths, q).tolist()))
+
+# =============================================================================
+# BLOCK 3: SIMULATION
+# =============================================================================
+
+def measure_outcomes(bet: int = DEFAULT_SESSION_BET, rounds: int = CALIBRATION_ROUNDS,
+                     seed: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                     rules: Rules = DEFAULT_RULES) -> OutcomeDistribution:
+    """
+    Measures the per-round net distribution of basic strategy with the vectorized simulator.
+
+    Args:
+        bet: Integer stake of every round.
+        rounds: Rounds to simulate; more rounds give a more precise house edge.
+        seed: Seed for NumPy's random Generator; None draws fresh entropy.
+        batch_size: Rounds per batch, which bounds peak memory.
+        rules: Table rules the rounds are played under.
+    """
+    if bet <= 0:
+        raise ValueError("Bet must be positive.")
+    rng = np.random.default_rng(seed)
+    totals: Dict[int, int] = {}
+    remaining = rounds
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        net, _ = play_batch(shuffled_decks(rng, size, rules.num_decks), bet, rules)
+        values, counts = np.unique(net, return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            totals[value] = totals.get(value, 0) + count
+        remaining -= size
+    nets = np.array(sorted(totals), dtype=np.int64)
+    counts = np.array([totals[value] for value in nets.tolist()], dtype=np.float64)
+    return OutcomeDistribution(nets, counts / counts.sum(), bet)
+
+
+def simulate_sessions(distribution: OutcomeDistribution, bankroll: int = STARTING_BANKROLL,
+                      target: Optional[int] = None, sessions: int = DEFAULT_SESSIONS,
+                      max_rounds: int = DEFAULT_MAX_ROUNDS, seed: Optional[int] = None) -> RuinReport:
+    """
+    Plays `sessions` flat-betting sessions until ruin, target or `max_rounds`.
+
+    A session is ruined once its bankroll no longer covers the stake, as in the
+    GUI's betting check. Finished sessions keep their final bankroll in the
+    trajectory percentiles.
+
+    Args:
+        distribution: Per-round net results, from `measure_outcomes`.
+        bankroll: Starting bankroll of every session.
+        target: Bankroll at which a session stops as a winner (default: twice the bankroll).
+        sessions: Number of independent sessions.
+        max_rounds: Round limit per session.
+        seed: Seed for NumPy's random Generator; None draws fresh entropy.
+    """
+    bet = distribution.bet
+    target = bankroll * DEFAULT_TARGET_MULTIPLE if target is None else target
+    if target <= bankroll:
+        raise ValueError("The target must be above the starting bankroll.")
+    rng = np.random.default_rng(seed)
+    edges = np.cumsum(distribution.probabilities)[:-1]
+
+    balance = np.full(sessions, bankroll, dtype=np.int64)
+    statuses = np.full(sessions, STATUS_RUINED if bankroll < bet else STATUS_ACTIVE, dtype=np.int8)
+    lengths = np.zeros(sessions, dtype=np.int64)
+    checkpoints: List[int] = [0]
+    trajectories = [np.percentile(balance, TRAJECTORY_PERCENTILES)]
+
+    active = np.flatnonzero(statuses == STATUS_ACTIVE)
+    played = 0
+    while active.size and played < max_rounds:
+        block = min(BLOCK_ROUNDS, max_rounds - played)
+        chunk = max(1, BLOCK_CELLS // block)
+        for start in range(0, active.size, chunk):
+            rows = active[start:start + chunk]
+            # Inverse-CDF sampling; one comparison per outcome beats searchsorted for a handful of outcomes
+            uniform = rng.random((rows.size, block))
+            index = np.zeros(uniform.shape, dtype=np.int8)
+            for edge in edges:
+                index += uniform >= edge
+            paths = balance[rows, None] + np.cumsum(distribution.nets[index], axis=1)
+            ended = (paths < bet) | (paths >= target)
+            hit = ended.any(axis=1)
+            # Index of the first round that ended the session (or the block's last round)
+            first = np.where(hit, ended.argmax(axis=1), block - 1)
+            balance[rows] = paths[np.arange(rows.size), first]
+            done = rows[hit]
+            lengths[done] = played + first[hit] + 1
+            statuses[done] = np.where(balance[done] < bet, STATUS_RUINED, STATUS_TARGET)
+        played += block
+        active = active[statuses[active] == STATUS_ACTIVE]
+        checkpoints.append(played)
+        trajectories.append(np.percentile(balance, TRAJECTORY_PERCENTILES))
+
+    statuses[active] = STATUS_UNFINISHED
+    lengths[active] = played
+    return RuinReport(bankroll, target, bet, statuses, lengths,
+                      np.array(checkpoints), np.array(trajectories))
+
+# =============================================================================
+# BLOCK 4: REPORTING
+# =============================================================================
+
+def format_report(report: RuinReport, distribution: OutcomeDistribution) -> str:
+    """Human-readable summary: risk of ruin, session lengths and bankroll percentiles."""
+    def lengths_line(label: str, status: Optional[int]) -> str:
+        q = report.length_percentiles(status)
+        if not q:
+            return f"  {label:<8} -"
+        return f"  {label:<8}" + "".join(f"  p{p} {value:,.0f}" for p, value in q.items())
+
+    lines = [
+        f"sessions:        {report.sessions:,} (bankroll {report.bankroll:,}, bet {report.bet:,}, "
+        f"target {report.target:,})",
+        f"per round:       mean {distribution.mean:+.3f} ({distribution.mean / report.bet:+.3%} of the bet), "
+        f"sd {distribution.std:.1f}",
+        f"risk of ruin:    {report.risk_of_ruin:.2%} ± {1.96 * report.ruin_standard_error:.2%}",
+        f"target reached:  {report.target_rate:.2%}",
+        f"unfinished:      {report.unfinished:,}",
+        "session length (rounds):",
+        lengths_line("all", None),
+        lengths_line("ruined", STATUS_RUINED),
+        lengths_line("target", STATUS_TARGET),
+        "bankroll percentiles by round:",
+        f"  {'round':>8}" + "".join(f"{'p' + str(p):>9}" for p in TRAJECTORY_PERCENTILES),
+    ]
+    step = max(1, (len(report.checkpoints) - 1) // (TRAJECTORY_ROWS - 1))
+    shown = list(range(0, len(report.checkpoints), step))
+    if shown[-1] != len(report.checkpoints) - 1:
+        shown.append(len(report.checkpoints) - 1)
+    for i in shown:
+        lines.append(f"  {report.checkpoints[i]:>8,}" + "".join(f"{value:>9,.0f}" for value in report.trajectories[i]))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Estimate the risk of ruin of flat-betting sessions.")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--bankroll", type=int, default=STARTING_BANKROLL)
+    parser.add_argument("--bet", type=int, default=DEFAULT_SESSION_BET)
+    parser.add_argument("--target", type=int, help="Stop a session at this bankroll (default: 2x bankroll).")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS)
+    parser.add_argument("--calibration", type=int, default=CALIBRATION_ROUNDS,
+                        help="Rounds simulated to measure the outcome distribution.")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible runs.")
+    add_rule_arguments(parser)
+    args = parser.parse_args(argv)
+    rules = rules_from_args(args)
+
+    start = time.perf_counter()
+    distribution = measure_outcomes(args.bet, args.calibration, seed=args.seed, rules=rules)
+    calibrated = time.perf_counter()
+    report = simulate_sessions(distribution, args.bankroll, args.target, args.sessions,
+                               args.max_rounds, seed=None if args.seed is None else args.seed + 1)
+    finished = time.perf_counter()
+
+    print(f"rules:           {rules.describe()}")
+    print(format_report(report, distribution))
+    print(f"time:            {calibrated - start:.2f} s calibration, {finished - calibrated:.2f} s sessions "
+          f"({int(report.lengths.sum()):,} rounds)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""
+Table rules for Blackjack Ultimate.
+
+A `Rules` value describes one rule configuration: deck count, whether the dealer
+hits soft 17, the Blackjack payout, the split limit, doubling after splits and
+late surrender. It is immutable and hashable, and its `fingerprint` is a stable
+digest of every field, so anything derived from the rules (such as a
+precomputed strategy chart) can be cached under that key. The engine, the
+solver and the simulators all take a `Rules`; DEFAULT_RULES is the table the
+game has always dealt.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import hashlib
+import struct
+from fractions import Fraction
+from typing import List, NamedTuple
+
+from blackjack_shoe import DEFAULT_DECKS
+
+# --- Table Rules ---------------------------------------------------
+MAX_HANDS = 3                   # Maximum number of hands reachable by splitting
+DEALER_STAND_TOTAL = 17         # Dealer draws to 16 and stands on 17
+BLACKJACK_PAYOUT = 2.5          # Total returned on a Blackjack (stake + 3:2)
+
+# Packed form: decks, flags, split limit, payout in tenths of the stake
+_PACKED = struct.Struct("<BBBB")
+_FLAG_H17 = 1
+_FLAG_DAS = 2
+_FLAG_SURRENDER = 4
+
+# =============================================================================
+# BLOCK 2: RULE SET
+# =============================================================================
+
+class Rules(NamedTuple):
+    """One rule configuration of the table."""
+    num_decks: int = DEFAULT_DECKS
+    dealer_hits_soft_17: bool = False       # H17 when True, S17 otherwise
+    blackjack_payout: float = BLACKJACK_PAYOUT
+    max_hands: int = MAX_HANDS              # Hands reachable by splitting and re-splitting
+    double_after_split: bool = True
+    surrender: bool = False                 # Late surrender of the first two cards
+
+    @property
+    def fingerprint(self) -> bytes:
+        """SHA-256 digest of every field by name, stable across runs and platforms."""
+        canonical = ";".join(f"{name}={value!r}" for name, value in zip(self._fields, self))
+        return hashlib.sha256(canonical.encode("ascii")).digest()
+
+    def describe(self) -> str:
+        """Short table-card notation, e.g. "6D S17 3:2 DAS MH3"."""
+        ratio = Fraction(self.blackjack_payout - 1).limit_denominator(10)
+        parts = [f"{self.num_decks}D", "H17" if self.dealer_hits_soft_17 else "S17",
+                 f"{ratio.numerator}:{ratio.denominator}",
+                 "DAS" if self.double_after_split else "NDAS", f"MH{self.max_hands}"]
+        if self.surrender:
+            parts.append("LS")
+        return " ".join(parts)
+
+    def pack(self) -> bytes:
+        """Four-byte form stored in hand-history headers and snapshots."""
+        flags = ((_FLAG_H17 if self.dealer_hits_soft_17 else 0) |
+                 (_FLAG_DAS if self.double_after_split else 0) |
+                 (_FLAG_SURRENDER if self.surrender else 0))
+        return _PACKED.pack(self.num_decks, flags, self.max_hands, round(self.blackjack_payout * 10))
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Rules":
+        """Inverse of `pack`; all-zero bytes (files from before rules were stored) mean DEFAULT_RULES."""
+        num_decks, flags, max_hands, payout = _PACKED.unpack(bytes(data[:_PACKED.size]))
+        if num_decks == 0:
+            return DEFAULT_RULES
+        return cls(num_decks, bool(flags & _FLAG_H17), payout / 10, max_hands,
+                   bool(flags & _FLAG_DAS), bool(flags & _FLAG_SURRENDER))
+
+
+DEFAULT_RULES = Rules()
+PACKED_RULES_SIZE = _PACKED.size
+
+# =============================================================================
+# BLOCK 3: COMMAND-LINE OPTIONS
+# =============================================================================
+
+def parse_payout(text: str) -> float:
+    """Blackjack payout "3:2" / "6:5" / "1:1" as the total returned per unit staked."""
+    win, _, stake = text.partition(":")
+    try:
+        return 1 + int(win) / int(stake or 1)
+    except (ValueError, ZeroDivisionError):
+        raise argparse.ArgumentTypeError(f"Payout must look like 3:2, not {text!r}.") from None
+
+
+def add_rule_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the rule options shared by every command that plays rounds."""
+    group = parser.add_argument_group("table rules")
+    group.add_argument("--decks", type=int, help=f"Decks per shoe (default: {DEFAULT_RULES.num_decks}).")
+    group.add_argument("--h17", action="store_true", help="Dealer hits soft 17 (default: stands).")
+    group.add_argument("--payout", type=parse_payout, help="Blackjack payout such as 6:5 (default: 3:2).")
+    group.add_argument("--max-hands", type=int, help=f"Split limit (default: {DEFAULT_RULES.max_hands} hands).")
+    group.add_argument("--no-das", action="store_true", help="No doubling after a split.")
+    group.add_argument("--surrender", action="store_true", help="Allow late surrender.")
+
+
+def rules_from_args(args: argparse.Namespace) -> Rules:
+    """The Rules selected by the options of `add_rule_arguments`."""
+    return Rules(
+        num_decks=args.decks or DEFAULT_RULES.num_decks,
+        dealer_hits_soft_17=args.h17,
+        blackjack_payout=DEFAULT_RULES.blackjack_payout if args.payout is None else args.payout,
+        max_hands=args.max_hands or DEFAULT_RULES.max_hands,
+        double_after_split=not args.no_das,
+        surrender=args.surrender,
+    )
+
+
+def rule_argv(rules: Rules) -> List[str]:
+    """Command-line options that select `rules` (the inverse of `rules_from_args`)."""
+    ratio = Fraction(rules.blackjack_payout - 1).limit_denominator(10)
+    argv = ["--decks", str(rules.num_decks), "--payout", f"{ratio.numerator}:{ratio.denominator}",
+            "--max-hands", str(rules.max_hands)]
+    if rules.dealer_hits_soft_17:
+        argv.append("--h17")
+    if not rules.double_after_split:
+        argv.append("--no-das")
+    if rules.surrender:
+        argv.append("--surrender")
+    return argv
@@ -0,0 +1,635 @@
+"""
+Multi-table game server for Blackjack Ultimate.
+
+One asyncio process hosts any number of tables. Each table is a BlackjackEngine
+with its own inline shoe, so a table costs a few kilobytes and an action is a
+direct engine call. Clients talk over a local TCP socket, one JSON object per line:
+
+    -> {"id": 1, "op": "open", "bankroll": 1000}
+    <- {"id": 1, "ok": true, "state": {"table": 7, "phase": "betting", ...}}
+    -> {"id": 2, "op": "deal", "table": 7, "bet": 50}
+    <- {"id": 2, "ok": false, "error": "Insufficient funds!"}
+
+Operations: open, close, state, deal, hit, stand, split, double, surrender,
+dealer_draw, dealer_play (dealer turn plus settlement), resolve and bankroll
+(refill to the starting bankroll between rounds, like the GUI's ADD $1000). Every table
+plays the server's Rules, which the open reply carries. Every reply echoes the
+request id, so a client may pipeline requests for several tables on one
+connection. The dealer's hole card is sent as -1 until the player phase ends.
+
+`RemoteEngine` is a blocking client with the BlackjackEngine interface the GUI
+uses (`python BlackJack_final.py --connect 127.0.0.1:8765`), and `run_load`
+drives thousands of tables over a few connections to measure throughput:
+
+    python blackjack_server.py serve
+    python blackjack_server.py load --connections 8 --tables 2000 --rounds 20
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from blackjack_engine import (
+    FULL_DECK, PHASE_BETTING, PHASE_OVER, PHASE_PLAYER, SETTLED_STATUSES, STARTING_BANKROLL,
+    BlackjackEngine, Card, CardObserver, GameRuleError, Hand, RoundResult, generate_basic_strategy,
+)
+from blackjack_perf import LatencyHistogram
+from blackjack_rules import DEFAULT_RULES, Rules, add_rule_arguments, rules_from_args
+from blackjack_shoe import DEFAULT_PENETRATION, Shoe
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE_BYTES = 4096               # Longest request line accepted
+MAX_TABLES = 50_000                 # Tables open on the whole server
+MAX_TABLES_PER_CONNECTION = 10_000
+MAX_OPEN_BANKROLL = 1_000_000_000   # Largest bankroll a table may be opened with
+HIDDEN_CARD = -1                    # Wire code of the face-down hole card
+
+# Placeholder the client shows for the hole card until it is turned over
+HIDDEN_PLACEHOLDER = FULL_DECK[0]
+
+# =============================================================================
+# BLOCK 2: TABLES
+# =============================================================================
+
+class ProtocolError(Exception):
+    """Raised for malformed requests (unknown operation, bad table id, ...)."""
+
+
+def _integer_field(request: Dict[str, Any], key: str, default: Optional[int] = None,
+                   low: int = 1, high: Optional[int] = None) -> int:
+    """
+    Reads a positive integer field of a request.
+
+    JSON numbers such as 10.7 or 1e999 are rejected rather than truncated or
+    overflowed, and so are booleans.
+
+    Args:
+        low, high: Inclusive bounds of the accepted values (`high` None for no upper bound).
+    Raises:
+        ProtocolError: If the field is missing (with no default), not an integer or out of bounds.
+    """
+    value = request.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ProtocolError(f"Field {key!r} must be an integer.")
+    if value < low or (high is not None and value > high):
+        bounds = f"at least {low}" if high is None else f"between {low} and {high}"
+        raise ProtocolError(f"Field {key!r} must be {bounds}.")
+    return value
+
+
+class _SeenCards(CardObserver):
+    """Buffers the engine's card events until the next reply carries them to the client."""
+    __slots__ = ("codes", "reshuffled")
+
+    def __init__(self) -> None:
+        self.codes: List[int] = []
+        self.reshuffled = False
+
+    def reset(self, cards: Any) -> None:
+        self.codes = []
+        self.reshuffled = True
+
+    def card_seen(self, card: Card) -> None:
+        self.codes.append(card.code)
+
+
+class Table:
+    """One seat with its own engine and shoe."""
+    __slots__ = ("table_id", "engine", "events")
+
+    def __init__(self, table_id: int, bankroll: int, rng: random.Random,
+                 rules: Rules = DEFAULT_RULES, penetration: float = DEFAULT_PENETRATION):
+        self.table_id = table_id
+        self.engine = BlackjackEngine(bankroll, rng=rng, shoe=Shoe(rules.num_decks, penetration, rng=rng),
+                                      rules=rules)
+        self.events = _SeenCards()
+        self.engine.observers.append(self.events)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The table state as the player may see it, plus the card events since the last reply."""
+        engine = self.engine
+        state: Dict[str, Any] = {
+            "table": self.table_id,
+            "phase": engine.phase,
+            "active": engine.is_game_active,
+            "bankroll": engine.bankroll,
+            "base_bet": engine.base_bet,
+            "hands": [[card.code for card in hand] for hand in engine.player_hands],
+            "bets": engine.player_bets,
+            "statuses": engine.hand_statuses,
+            "index": engine.current_hand_index,
+            "dealer": [card.code for card in engine.dealer_hand],
+            "can_split": engine.can_split(),
+            "can_double": engine.can_double(),
+            "can_surrender": engine.can_surrender(),
+            "dealer_draws": engine.dealer_should_draw(),
+            "decks": engine.shoe.num_decks,
+            "seen": self.events.codes,
+        }
+        if engine.phase == PHASE_PLAYER and engine.dealer_hand:
+            state["dealer"][0] = HIDDEN_CARD
+        if engine.phase == PHASE_OVER:
+            state["dealt"] = [card.code for card in engine.dealt_cards]
+            state["actions"] = engine.actions
+        if self.events.reshuffled:
+            state["reshuffled"] = True
+            self.events.reshuffled = False
+        self.events.codes = []
+        return state
+
+# =============================================================================
+# BLOCK 3: SERVER
+# =============================================================================
+
+class GameServer:
+    """
+    Asyncio server hosting many tables in one process.
+    Tables belong to the connection that opened them and close with it.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 rules: Rules = DEFAULT_RULES, penetration: float = DEFAULT_PENETRATION,
+                 seed: Optional[int] = None, max_tables: int = MAX_TABLES):
+        self.host = host
+        self.port = port
+        self.rules = rules
+        self.penetration = penetration
+        self.max_tables = max_tables
+        self.tables: Dict[int, Table] = {}
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._next_table_id = 1
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set["asyncio.Task[None]"] = set()
+
+    # -------------------------------------------------------------------------
+    # LIFECYCLE
+    # -------------------------------------------------------------------------
+    async def start(self) -> None:
+        """Starts listening; with port 0 the chosen port is stored in `self.port`."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_LINE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops listening and drops every open connection."""
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    # -------------------------------------------------------------------------
+    # CONNECTIONS
+    # -------------------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one client connection until it disconnects."""
+        owned: Set[int] = set()
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b'{"ok": false, "error": "Request line too long."}\n')
+                    break
+                if not line:
+                    break
+                writer.write(self.handle_line(line, owned))
+                # Only wait for the socket when the client stops reading
+                if writer.transport.get_write_buffer_size() > 64 * 1024:
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            for table_id in owned:
+                self.tables.pop(table_id, None)
+            writer.close()
+
+    def handle_line(self, line: bytes, owned: Set[int]) -> bytes:
+        """Decodes one request line, runs it and encodes the reply line."""
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("Request must be a JSON object.")
+            request_id = request.get("id")
+            reply = self.dispatch(request, owned)
+        except (GameRuleError, ProtocolError) as error:
+            reply = {"ok": False, "error": str(error)}
+        except (ValueError, TypeError, KeyError, OverflowError, RecursionError) as error:
+            reply = {"ok": False, "error": f"Malformed request: {error}"}
+        reply["id"] = request_id
+        return json.dumps(reply, separators=(",", ":")).encode() + b"\n"
+
+    # -------------------------------------------------------------------------
+    # OPERATIONS
+    # -------------------------------------------------------------------------
+    def dispatch(self, request: Dict[str, Any], owned: Set[int]) -> Dict[str, Any]:
+        """
+        Runs one request against the connection's tables.
+
+        Raises:
+            GameRuleError: If the engine rejects the action.
+            ProtocolError: For unknown operations or tables.
+        """
+        op = request.get("op")
+        if op == "open":
+            if len(self.tables) >= self.max_tables or len(owned) >= MAX_TABLES_PER_CONNECTION:
+                raise ProtocolError("Table limit reached.")
+            bankroll = _integer_field(request, "bankroll", STARTING_BANKROLL, high=MAX_OPEN_BANKROLL)
+            table_id = self._next_table_id
+            self._next_table_id += 1
+            table = Table(table_id, bankroll, random.Random(self._rng.getrandbits(64)),
+                          self.rules, self.penetration)
+            self.tables[table_id] = table
+            owned.add(table_id)
+            return {"ok": True, "state": table.snapshot(), "rules": list(self.rules)}
+
+        table_id = request.get("table")
+        if table_id not in owned:
+            raise ProtocolError(f"Unknown table: {table_id!r}")
+        table = self.tables[table_id]
+        engine = table.engine
+        reply: Dict[str, Any] = {"ok": True}
+
+        if op == "close":
+            owned.discard(table_id)
+            del self.tables[table_id]
+            return reply
+        if op == "state":
+            pass
+        elif op == "deal":
+            engine.start_round(_integer_field(request, "bet"))
+        elif op == "hit":
+            engine.hit()
+        elif op == "stand":
+            engine.stand()
+        elif op == "split":
+            engine.split_pair()
+        elif op == "double":
+            engine.double_down()
+        elif op == "surrender":
+            engine.surrender()
+        elif op == "dealer_draw":
+            engine.dealer_draw()
+        elif op == "dealer_play":
+            reply["result"] = list(engine.play_dealer_turn())
+        elif op == "resolve":
+            reply["result"] = list(engine.resolve_game())
+        elif op == "bankroll":
+            # Refills (the GUI's ADD $1000) are only allowed between rounds
+            if engine.phase not in (PHASE_BETTING, PHASE_OVER):
+                raise GameRuleError("Bankroll can only be changed between rounds.")
+            engine.bankroll = STARTING_BANKROLL
+        else:
+            raise ProtocolError(f"Unknown operation: {op!r}")
+        reply["state"] = table.snapshot()
+        return reply
+
+# =============================================================================
+# BLOCK 4: CLIENTS
+# =============================================================================
+
+class RemoteEngine:
+    """
+    Blocking client for one server table with the BlackjackEngine interface the
+    GUI relies on. Card events from the server are forwarded to `observers`, so
+    a DealerOutlook keeps working unchanged.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 bankroll: int = STARTING_BANKROLL, timeout: float = 5.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+        self.shoe = None                # The shoe lives on the server
+        self.observers: List[CardObserver] = []
+
+        self.player_hands: List[Hand] = []
+        self.player_bets: List[int] = []
+        self.hand_statuses: List[str] = []
+        self.current_hand_index = 0
+        self.dealer_hand = Hand()
+        self.base_bet = 0
+        self.is_game_active = False
+        self.phase = PHASE_BETTING
+        self.dealt_cards: List[Card] = []
+        self.actions: List[str] = []
+        self._bankroll = bankroll
+        self._can_split = False
+        self._can_double = False
+        self._can_surrender = False
+        self._dealer_draws = False
+
+        reply = self._call("open", bankroll=bankroll)
+        self.table_id = reply["state"]["table"]
+        self.rules = Rules(*reply["rules"])
+
+    # -------------------------------------------------------------------------
+    # TRANSPORT
+    # -------------------------------------------------------------------------
+    def _call(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Sends one request and applies the returned state."""
+        self._next_id += 1
+        request = {"id": self._next_id, "op": op, **fields}
+        if op != "open":
+            request["table"] = self.table_id
+        self._file.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection.")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise GameRuleError(reply.get("error", "Request failed."))
+        if "state" in reply:
+            self._apply(reply["state"])
+        return reply
+
+    def _apply(self, state: Dict[str, Any]) -> None:
+        """Mirrors a server snapshot and replays its card events to the observers."""
+        if state.get("reshuffled"):
+            for observer in self.observers:
+                observer.reset(FULL_DECK * state["decks"])
+        for code in state["seen"]:
+            for observer in self.observers:
+                observer.card_seen(Card.from_code(code))
+
+        self.phase = state["phase"]
+        self.is_game_active = state["active"]
+        self._bankroll = state["bankroll"]
+        self.base_bet = state["base_bet"]
+        self.player_hands = [Hand(Card.from_code(code) for code in hand) for hand in state["hands"]]
+        self.player_bets = state["bets"]
+        self.hand_statuses = state["statuses"]
+        self.current_hand_index = state["index"]
+        self.dealer_hand = Hand(HIDDEN_PLACEHOLDER if code == HIDDEN_CARD else Card.from_code(code)
+                                for code in state["dealer"])
+        self._can_split = state["can_split"]
+        self._can_double = state["can_double"]
+        self._can_surrender = state["can_surrender"]
+        self._dealer_draws = state["dealer_draws"]
+        if "dealt" in state:
+            self.dealt_cards = [Card.from_code(code) for code in state["dealt"]]
+            self.actions = state["actions"]
+
+    def close(self) -> None:
+        """Closes the table and the connection."""
+        try:
+            self._call("close")
+        except (OSError, ConnectionError, GameRuleError):
+            pass
+        self._file.close()
+        self._sock.close()
+
+    # -------------------------------------------------------------------------
+    # ENGINE INTERFACE
+    # -------------------------------------------------------------------------
+    @property
+    def bankroll(self) -> int:
+        return self._bankroll
+
+    @bankroll.setter
+    def bankroll(self, amount: int) -> None:
+        # The server only refills a table to the starting bankroll
+        if amount != STARTING_BANKROLL:
+            raise GameRuleError(f"A server table can only be refilled to ${STARTING_BANKROLL}.")
+        self._call("bankroll")
+
+    @property
+    def current_hand(self) -> Hand:
+        return self.player_hands[self.current_hand_index]
+
+    @property
+    def dealer_upcard(self) -> Card:
+        return self.dealer_hand[1]
+
+    def can_split(self) -> bool:
+        return self._can_split
+
+    def can_double(self) -> bool:
+        return self._can_double
+
+    def can_surrender(self) -> bool:
+        return self._can_surrender
+
+    def all_hands_bust(self) -> bool:
+        return all(status == "Bust" for status in self.hand_statuses)
+
+    def all_hands_settled(self) -> bool:
+        return all(status in SETTLED_STATUSES for status in self.hand_statuses)
+
+    def dealer_should_draw(self) -> bool:
+        return self._dealer_draws
+
+    def start_round(self, bet: int) -> None:
+        self._call("deal", bet=bet)
+
+    def hit(self) -> None:
+        self._call("hit")
+
+    def stand(self) -> None:
+        self._call("stand")
+
+    def split_pair(self) -> None:
+        self._call("split")
+
+    def double_down(self) -> None:
+        self._call("double")
+
+    def surrender(self) -> None:
+        self._call("surrender")
+
+    def dealer_draw(self) -> Card:
+        self._call("dealer_draw")
+        return self.dealer_hand[-1]
+
+    def play_dealer_turn(self) -> RoundResult:
+        return RoundResult(*self._call("dealer_play")["result"])
+
+    def resolve_game(self) -> RoundResult:
+        return RoundResult(*self._call("resolve")["result"])
+
+
+class AsyncClient:
+    """Pipelining asyncio client: many tables share one connection, matched by request id."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._next_id = 0
+        self._reader_task = asyncio.ensure_future(self._read_replies())
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> "AsyncClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _read_replies(self) -> None:
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self._pending.pop(reply.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(reply)
+        for future in self._pending.values():
+            future.set_exception(ConnectionError("Server closed the connection."))
+
+    async def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Sends one request and waits for its reply."""
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        request = {"id": self._next_id, "op": op, **fields}
+        self._writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        return await future
+
+    async def close(self) -> None:
+        self._writer.close()
+        self._reader_task.cancel()
+
+# =============================================================================
+# BLOCK 5: LOAD GENERATOR
+# =============================================================================
+
+class LoadReport(NamedTuple):
+    """Outcome of `run_load`."""
+    tables: int
+    rounds: int
+    requests: int
+    errors: int
+    seconds: float
+    latency: LatencyHistogram
+
+    @property
+    def requests_per_sec(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def describe(self) -> str:
+        return (f"{self.tables} tables, {self.rounds} rounds, {self.requests} requests in "
+                f"{self.seconds:.2f} s ({self.requests_per_sec:,.0f} req/s, {self.errors} errors), "
+                f"latency p50 {self.latency.percentile(0.5) * 1000:.2f} ms, "
+                f"p99 {self.latency.percentile(0.99) * 1000:.2f} ms")
+
+
+async def _play_table(client: AsyncClient, rounds: int, bet: int,
+                      latency: LatencyHistogram, counters: Dict[str, int]) -> None:
+    """Plays `rounds` basic-strategy rounds on a fresh table."""
+    async def call(op: str, **fields: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        reply = await client.request(op, **fields)
+        latency.record(time.perf_counter() - start)
+        counters["requests"] += 1
+        if not reply["ok"]:
+            counters["errors"] += 1
+        return reply
+
+    reply = await call("open", bankroll=bet * rounds * 4)
+    table = reply["state"]["table"]
+    for _ in range(rounds):
+        state = (await call("deal", table=table, bet=bet))["state"]
+        while state["phase"] == PHASE_PLAYER:
+            hand = [Card.from_code(code) for code in state["hands"][state["index"]]]
+            upcard = Card.from_code(state["dealer"][1])
+            op = "hit" if generate_basic_strategy(hand, upcard) == "HIT" else "stand"
+            state = (await call(op, table=table))["state"]
+        await call("dealer_play", table=table)
+        counters["rounds"] += 1
+    await call("close", table=table)
+
+
+async def run_load(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, connections: int = 4,
+                   tables: int = 1000, rounds: int = 10, bet: int = 10) -> LoadReport:
+    """
+    Plays `rounds` rounds on each of `tables` concurrent tables spread over
+    `connections` pipelined connections, and measures request latency.
+    """
+    clients = [await AsyncClient.connect(host, port) for _ in range(connections)]
+    latency = LatencyHistogram()
+    counters = {"requests": 0, "errors": 0, "rounds": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(_play_table(clients[i % connections], rounds, bet, latency, counters)
+                           for i in range(tables)))
+    seconds = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return LoadReport(tables, counters["rounds"], counters["requests"], counters["errors"], seconds, latency)
+
+# =============================================================================
+# BLOCK 6: COMMAND LINE
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Blackjack Ultimate multi-table server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Host tables until interrupted.")
+    add_rule_arguments(serve)
+    serve.add_argument("--penetration", type=float, default=DEFAULT_PENETRATION)
+    serve.add_argument("--seed", type=int, help="Master seed of the table shoes.")
+
+    load = commands.add_parser("load", help="Measure throughput against a server.")
+    load.add_argument("--connections", type=int, default=4)
+    load.add_argument("--tables", type=int, default=1000)
+    load.add_argument("--rounds", type=int, default=10)
+    load.add_argument("--embedded", action="store_true",
+                      help="Start a server in this process instead of connecting to one.")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        rules = rules_from_args(args)
+        server = GameServer(args.host, args.port, rules, args.penetration, args.seed)
+        print(f"Serving {rules.describe()} tables on {args.host}:{args.port}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    async def measure() -> LoadReport:
+        server = None
+        port = args.port
+        if args.embedded:
+            server = GameServer(args.host, 0)
+            await server.start()
+            port = server.port
+        try:
+            return await run_load(args.host, port, args.connections, args.tables, args.rounds)
+        finally:
+            if server is not None:
+                await server.close()
+
+    report = asyncio.run(measure())
+    print(report.describe())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Persistent multi-deck shoe for Blackjack Ultimate.
+
+The shoe holds one shuffled order of `num_decks` decks and deals from it by
+advancing an index, so drawing is O(1) and never reallocates the list. A cut card
+placed at the configured penetration triggers a reshuffle between rounds. Shuffled
+orders can be prepared ahead of time by a background thread, so a reshuffle in
+the GUI never pauses on the shuffle itself.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import queue
+import random
+import threading
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from blackjack_cards import FULL_DECK, Card
+
+DEFAULT_DECKS = 6
+DEFAULT_PENETRATION = 0.75      # Share of the shoe dealt before the cut card comes out
+
+# =============================================================================
+# BLOCK 2: SHOE
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def _shoe_template(num_decks: int) -> Tuple[Tuple[Card, ...], Tuple[int, ...]]:
+    """Unshuffled contents and per-value counts of a shoe, shared by all shoes of that size."""
+    template = tuple(FULL_DECK) * num_decks
+    counts = [0] * 10
+    for card in template:
+        counts[card.blackjack_value - 2] += 1
+    return template, tuple(counts)
+
+
+class Shoe:
+    """
+    A multi-deck shoe with a cut card and per-value remaining counts.
+
+    `counts[v - 2]` is the number of undealt cards of blackjack value v
+    (index 8 covers all ten-value cards, index 9 the Aces).
+    """
+
+    def __init__(self, num_decks: int = DEFAULT_DECKS, penetration: float = DEFAULT_PENETRATION,
+                 rng: Optional[random.Random] = None, prefetch: int = 0,
+                 order: Optional[Sequence[Card]] = None, position: int = 0):
+        """
+        Args:
+            num_decks: Number of 52-card decks in the shoe.
+            penetration: Fraction of the shoe dealt before reshuffling (0 reshuffles every round).
+            rng: Generator used for shuffling; seed it for reproducible shoes.
+            prefetch: Number of shuffled orders a background thread keeps ready (0 = shuffle inline).
+            order: Dealing order to continue from (e.g. a restored snapshot) instead of a fresh shuffle.
+            position: Number of cards of `order` already dealt.
+        """
+        if num_decks < 1:
+            raise ValueError("A shoe needs at least one deck.")
+        if not 0.0 <= penetration < 1.0:
+            raise ValueError("Penetration must be in the range [0, 1).")
+
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else random.Random()
+        self._template, self._full_counts = _shoe_template(num_decks)
+        self.cut_index = int(len(self._template) * penetration)
+
+        self._order: List[Card] = []
+        self.position = 0
+        self.counts: List[int] = []
+        self.shuffle_count = 0
+
+        # Background pool of pre-shuffled orders
+        self._pool: Optional["queue.Queue[List[Card]]"] = None
+        self._stop = threading.Event()
+        if prefetch > 0:
+            self._pool = queue.Queue(maxsize=prefetch)
+            # The worker gets its own stream, seeded from ours, so shoes stay reproducible
+            worker_rng = random.Random(self.rng.getrandbits(64))
+            self._worker = threading.Thread(target=self._fill_pool, args=(worker_rng,),
+                                            name="shoe-shuffler", daemon=True)
+            self._worker.start()
+
+        if order is None:
+            self.shuffle()
+        else:
+            self.resume(order, position)
+
+    # -------------------------------------------------------------------------
+    # DEALING
+    # -------------------------------------------------------------------------
+    def draw(self) -> Card:
+        """Deals the next card. An exhausted shoe is reshuffled on the spot."""
+        if self.position >= len(self._order):
+            self.shuffle()
+        card = self._order[self.position]
+        self.position += 1
+        self.counts[card.blackjack_value - 2] -= 1
+        return card
+
+    @property
+    def needs_shuffle(self) -> bool:
+        """True once the cut card has been reached."""
+        return self.position >= self.cut_index
+
+    def shuffle(self) -> None:
+        """Replaces the shoe with a freshly shuffled order."""
+        if self._pool is not None:
+            self._order = self._pool.get()
+        else:
+            self._order = list(self._template)
+            self.rng.shuffle(self._order)
+        self.position = 0
+        self.counts = list(self._full_counts)
+        self.shuffle_count += 1
+
+    def resume(self, order: Sequence[Card], position: int) -> None:
+        """
+        Continues dealing from a saved order, with its first `position` cards already dealt.
+
+        Raises:
+            ValueError: If `order` is not a complete shoe of this size.
+        """
+        if len(order) != len(self._template) or not 0 <= position <= len(order):
+            raise ValueError("Saved order does not fit this shoe.")
+        self._order = list(order)
+        self.position = position
+        counts = [0] * 10
+        for card in self._order[position:]:
+            counts[card.blackjack_value - 2] += 1
+        self.counts = counts
+
+    # -------------------------------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of undealt cards."""
+        return len(self._order) - self.position
+
+    @property
+    def composition(self) -> Tuple[int, ...]:
+        """Undealt cards per blackjack value, in the solver's composition format."""
+        return tuple(self.counts)
+
+    def undealt(self) -> List[Card]:
+        """The undealt cards, in dealing order."""
+        return self._order[self.position:]
+
+    def dealing_order(self) -> List[Card]:
+        """The whole current order, dealt cards included (`position` of them)."""
+        return list(self._order)
+
+    # -------------------------------------------------------------------------
+    # BACKGROUND SHUFFLING
+    # -------------------------------------------------------------------------
+    def _fill_pool(self, worker_rng: random.Random) -> None:
+        """Keeps the pool topped up with shuffled orders until closed."""
+        while not self._stop.is_set():
+            order = list(self._template)
+            worker_rng.shuffle(order)
+            while not self._stop.is_set():
+                try:
+                    self._pool.put(order, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def close(self) -> None:
+        """Stops the background shuffler (a no-op for inline shoes)."""
+        self._stop.set()
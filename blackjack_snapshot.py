@@ -0,0 +1,486 @@
+"""
+Compact binary snapshots of a Blackjack Ultimate session.
+
+A snapshot holds the complete state of one BlackjackEngine, so play can resume
+exactly where it stopped, even in the middle of a round. It stores the
+bankroll, the bets, the player and dealer hands, the round's audit trail, the
+shoe's dealing order and position and the shuffling generator. A default
+snapshot takes about 3 KB, is written atomically (temporary file, then rename)
+and decodes in tens of microseconds.
+
+A decoded `Snapshot` is immutable, so simulators can fork any number of
+independent engines from one position. `fork_engines` reshuffles the cards the
+player has not seen (the undealt shoe and a face-down hole card) for each fork,
+so the forks sample every continuation of that position.
+
+File layout: HEADER (magic, format version, packed table rules), STATE, one
+HAND record plus its cards per player hand, the dealer's cards, the dealt
+cards, the action codes, the shoe order, and the generator state if stored.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from blackjack_cards import FULL_DECK, Card, Hand
+from blackjack_engine import (
+    PHASE_BETTING, PHASE_DEALER, PHASE_OVER, PHASE_PLAYER, BlackjackEngine, apply_action,
+)
+from blackjack_history import ACTION_CODES, ACTION_NAMES, STATUS_CODES, STATUS_NAMES
+from blackjack_rules import DEFAULT_RULES, PACKED_RULES_SIZE, Rules
+from blackjack_shoe import Shoe
+
+SNAPSHOT_MAGIC = b"BJSNAP"
+SNAPSHOT_VERSION = 1
+DEFAULT_SESSION_PATH = "blackjack_session.bjs"
+
+DEFAULT_FORKS = 10_000
+CONFIDENCE_Z = 1.96             # 95% confidence intervals
+
+PHASES = (PHASE_BETTING, PHASE_PLAYER, PHASE_DEALER, PHASE_OVER)
+MT_STATE_WORDS = 625            # Mersenne Twister state words, position included
+
+HEADER_STRUCT = struct.Struct(f"<6sH{PACKED_RULES_SIZE}s")
+# bankroll, base bet, phase, active flag, current hand, hands, dealer cards,
+# dealt cards, actions, decks, penetration, shoe position, shuffle count, generator flag
+STATE_STRUCT = struct.Struct("<qIBBBBBBBBdHIB")
+HAND_STRUCT = struct.Struct("<IBB")     # bet, status code, card count
+RNG_STRUCT = struct.Struct(f"<{MT_STATE_WORDS}IBd")     # state words, has gauss_next, gauss_next
+
+# Shuffling generator state as returned by random.Random.getstate()
+RandomState = Tuple[int, Tuple[int, ...], Optional[float]]
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class SnapshotError(Exception):
+    """Raised for malformed snapshot files and engines that cannot be snapshotted."""
+
+
+class Snapshot(NamedTuple):
+    """The complete, immutable state of one engine and its shoe."""
+    rules: Rules
+    bankroll: int
+    base_bet: int
+    phase: str
+    is_game_active: bool
+    current_hand_index: int
+    hands: Tuple[Tuple[Card, ...], ...]
+    bets: Tuple[int, ...]
+    statuses: Tuple[str, ...]
+    dealer_hand: Tuple[Card, ...]
+    dealt_cards: Tuple[Card, ...]
+    actions: Tuple[str, ...]
+    penetration: float
+    shoe_order: Tuple[Card, ...]
+    shoe_position: int
+    shuffle_count: int
+    rng_state: Optional[RandomState] = None
+
+    @property
+    def hole_card_hidden(self) -> bool:
+        """True while the dealer's hole card is dealt but still face down."""
+        return bool(self.dealer_hand) and (self.phase == PHASE_PLAYER or
+                                           (self.phase == PHASE_DEALER and _settled(self.statuses)))
+
+
+class ActionValue(NamedTuple):
+    """Simulated value of one action, in units of the base bet."""
+    action: str
+    ev: float
+    ci95: float                 # Half-width of the 95% confidence interval
+    forks: int
+
+
+def _settled(statuses: Sequence[str]) -> bool:
+    """True if every hand is bust or surrendered (the hole card is never turned over)."""
+    return all(status in ("Bust", "Surrender") for status in statuses)
+
+# =============================================================================
+# BLOCK 3: CAPTURE & ENCODING
+# =============================================================================
+
+def capture(engine: BlackjackEngine, with_rng: bool = True) -> Snapshot:
+    """
+    Copies the engine's complete state into a Snapshot.
+
+    Args:
+        engine: The engine to capture; its shoe is captured with it.
+        with_rng: Also store the shoe's generator, so later shuffles repeat exactly.
+    """
+    shoe = engine.shoe
+    return Snapshot(
+        rules=engine.rules,
+        bankroll=engine.bankroll,
+        base_bet=engine.base_bet,
+        phase=engine.phase,
+        is_game_active=engine.is_game_active,
+        current_hand_index=engine.current_hand_index,
+        hands=tuple(tuple(hand) for hand in engine.player_hands),
+        bets=tuple(engine.player_bets),
+        statuses=tuple(engine.hand_statuses),
+        dealer_hand=tuple(engine.dealer_hand),
+        dealt_cards=tuple(engine.dealt_cards),
+        actions=tuple(engine.actions),
+        penetration=shoe.penetration,
+        shoe_order=tuple(shoe.dealing_order()),
+        shoe_position=shoe.position,
+        shuffle_count=shoe.shuffle_count,
+        rng_state=shoe.rng.getstate() if with_rng else None,
+    )
+
+
+def encode_snapshot(snapshot: Snapshot) -> bytes:
+    """
+    Packs a snapshot into its binary form.
+
+    Raises:
+        SnapshotError: If a count does not fit its field.
+    """
+    rng_state = snapshot.rng_state
+    try:
+        parts = [
+            HEADER_STRUCT.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, snapshot.rules.pack()),
+            STATE_STRUCT.pack(
+                snapshot.bankroll, snapshot.base_bet, PHASES.index(snapshot.phase), snapshot.is_game_active,
+                snapshot.current_hand_index, len(snapshot.hands), len(snapshot.dealer_hand),
+                len(snapshot.dealt_cards), len(snapshot.actions), len(snapshot.shoe_order) // len(FULL_DECK),
+                snapshot.penetration, snapshot.shoe_position, snapshot.shuffle_count, rng_state is not None,
+            ),
+        ]
+        for hand, bet, status in zip(snapshot.hands, snapshot.bets, snapshot.statuses):
+            parts.append(HAND_STRUCT.pack(bet, STATUS_CODES[status], len(hand)))
+            parts.append(bytes(card.code for card in hand))
+        parts.append(bytes(card.code for card in snapshot.dealer_hand))
+        parts.append(bytes(card.code for card in snapshot.dealt_cards))
+        parts.append(b"".join(ACTION_CODES[action] for action in snapshot.actions))
+        parts.append(bytes(card.code for card in snapshot.shoe_order))
+        if rng_state is not None:
+            _, words, gauss_next = rng_state
+            parts.append(RNG_STRUCT.pack(*words, gauss_next is not None, gauss_next or 0.0))
+    except (struct.error, ValueError) as error:
+        raise SnapshotError(f"State does not fit a snapshot: {error}") from None
+    return b"".join(parts)
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    """
+    Unpacks the binary form written by `encode_snapshot`.
+
+    Raises:
+        SnapshotError: If the data is not a complete snapshot of this format.
+    """
+    try:
+        magic, version, packed_rules = HEADER_STRUCT.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Not a Blackjack snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}.")
+        (bankroll, base_bet, phase, active, index, num_hands, num_dealer, num_dealt, num_actions,
+         num_decks, penetration, position, shuffle_count, has_rng) = STATE_STRUCT.unpack_from(data, HEADER_STRUCT.size)
+        offset = HEADER_STRUCT.size + STATE_STRUCT.size
+
+        def cards(count: int) -> Tuple[Card, ...]:
+            nonlocal offset
+            codes = data[offset:offset + count]
+            if len(codes) != count:
+                raise SnapshotError("Truncated snapshot.")
+            offset += count
+            return tuple(FULL_DECK[code] for code in codes)
+
+        hands, bets, statuses = [], [], []
+        for _ in range(num_hands):
+            bet, status, num_cards = HAND_STRUCT.unpack_from(data, offset)
+            offset += HAND_STRUCT.size
+            hands.append(cards(num_cards))
+            bets.append(bet)
+            statuses.append(STATUS_NAMES[status])
+        dealer_hand = cards(num_dealer)
+        dealt_cards = cards(num_dealt)
+        actions = tuple(ACTION_NAMES[code] for code in data[offset:offset + num_actions])
+        offset += num_actions
+        shoe_order = cards(num_decks * len(FULL_DECK))
+
+        rng_state = None
+        if has_rng:
+            *words, has_gauss, gauss_next = RNG_STRUCT.unpack_from(data, offset)
+            rng_state = (random.Random.VERSION, tuple(words), gauss_next if has_gauss else None)
+
+        phase = PHASES[phase]
+        # A round in play needs the hand in focus and both dealer cards
+        if phase in (PHASE_PLAYER, PHASE_DEALER) and not (index < num_hands and num_dealer >= 2):
+            raise SnapshotError("Inconsistent round in snapshot.")
+        return Snapshot(
+            Rules.unpack(packed_rules), bankroll, base_bet, phase, bool(active), index,
+            tuple(hands), tuple(bets), tuple(statuses), dealer_hand, dealt_cards, actions,
+            penetration, shoe_order, position, shuffle_count, rng_state,
+        )
+    except (struct.error, IndexError, KeyError) as error:
+        raise SnapshotError(f"Malformed snapshot: {error}") from None
+
+# =============================================================================
+# BLOCK 4: FILES
+# =============================================================================
+
+def session_path(rules: Rules = DEFAULT_RULES) -> str:
+    """Autosave file of the session played under `rules`: DEFAULT_SESSION_PATH for the default table."""
+    if rules == DEFAULT_RULES:
+        return DEFAULT_SESSION_PATH
+    stem, extension = os.path.splitext(DEFAULT_SESSION_PATH)
+    return f"{stem}-{rules.fingerprint.hex()[:8]}{extension}"
+
+
+def save_snapshot(engine: BlackjackEngine, path: str = DEFAULT_SESSION_PATH) -> str:
+    """
+    Writes a snapshot of `engine` atomically (temporary file, then rename), so a
+    crash mid-write leaves the previous snapshot intact.
+
+    Returns:
+        The path written.
+    """
+    data = encode_snapshot(capture(engine))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".session-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def load_snapshot(path: str = DEFAULT_SESSION_PATH) -> Snapshot:
+    """
+    Reads and decodes a snapshot file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        SnapshotError: If it is not a valid snapshot.
+    """
+    with open(path, "rb") as f:
+        return decode_snapshot(f.read())
+
+# =============================================================================
+# BLOCK 5: RESTORE & FORK
+# =============================================================================
+
+def restore_engine(snapshot: Snapshot, rng: Optional[random.Random] = None, prefetch: int = 0) -> BlackjackEngine:
+    """
+    Rebuilds the engine and its shoe exactly as captured.
+
+    Observers are not part of a snapshot: attach them to the returned engine and
+    `reset` them with `unseen_cards(engine)`.
+
+    Args:
+        snapshot: The state to resume.
+        rng: Generator for later shuffles. Defaults to the stored generator state
+            (or a fresh generator if none was stored).
+        prefetch: Background-shuffled orders kept ready by the shoe (see Shoe).
+
+    Raises:
+        SnapshotError: If the stored shoe or generator state cannot be restored.
+    """
+    if rng is None:
+        rng = random.Random()
+        if snapshot.rng_state is not None:
+            try:
+                rng.setstate(snapshot.rng_state)
+            except (ValueError, TypeError) as error:
+                raise SnapshotError(f"Unusable generator state: {error}") from None
+    return _build_engine(snapshot, snapshot.shoe_order, snapshot.dealer_hand, rng, prefetch)
+
+
+def fork_engines(snapshot: Snapshot, count: int, seed: Optional[int] = None,
+                 reshuffle: bool = True) -> Iterator[BlackjackEngine]:
+    """
+    Yields `count` independent engines continuing from one snapshot.
+
+    Args:
+        snapshot: The position to fork from.
+        count: Number of engines to yield.
+        seed: Master seed; the same seed yields the same forks.
+        reshuffle: Reshuffle the cards the player has not seen (the undealt shoe and
+            a face-down hole card) for every fork. Without it all forks deal the
+            captured order and differ only after the next shuffle.
+    """
+    master = random.Random(seed)
+    position = snapshot.shoe_position
+    dealt, undealt = snapshot.shoe_order[:position], snapshot.shoe_order[position:]
+    hole_hidden = reshuffle and snapshot.hole_card_hidden
+
+    for _ in range(count):
+        rng = random.Random(master.getrandbits(64))
+        order, dealer_hand = snapshot.shoe_order, snapshot.dealer_hand
+        if reshuffle:
+            hidden = list(undealt)
+            if hole_hidden:
+                hidden.append(dealer_hand[0])
+            rng.shuffle(hidden)
+            if hole_hidden:
+                dealer_hand = (hidden.pop(),) + dealer_hand[1:]
+            order = dealt + tuple(hidden)
+        yield _build_engine(snapshot, order, dealer_hand, rng, 0)
+
+
+def _build_engine(snapshot: Snapshot, order: Sequence[Card], dealer_hand: Sequence[Card],
+                  rng: random.Random, prefetch: int) -> BlackjackEngine:
+    """Engine in the snapshot's state, dealing from `order` with `dealer_hand` on the table."""
+    try:
+        shoe = Shoe(len(order) // len(FULL_DECK), snapshot.penetration, rng=rng, prefetch=prefetch,
+                    order=order, position=snapshot.shoe_position)
+    except ValueError as error:
+        raise SnapshotError(f"Unusable shoe: {error}") from None
+    shoe.shuffle_count = snapshot.shuffle_count
+
+    engine = BlackjackEngine(bankroll=snapshot.bankroll, rng=rng, shoe=shoe, rules=snapshot.rules)
+    engine.base_bet = snapshot.base_bet
+    engine.phase = snapshot.phase
+    engine.is_game_active = snapshot.is_game_active
+    engine.current_hand_index = snapshot.current_hand_index
+    engine.player_hands = [Hand(hand) for hand in snapshot.hands]
+    engine.player_bets = list(snapshot.bets)
+    engine.hand_statuses = list(snapshot.statuses)
+    engine.dealer_hand = Hand(dealer_hand)
+    engine.dealt_cards = list(snapshot.dealt_cards)
+    if dealer_hand and dealer_hand[0] is not snapshot.dealer_hand[0]:
+        engine.dealt_cards[2] = dealer_hand[0]      # The hole card is the third card dealt
+    engine.actions = list(snapshot.actions)
+    # Observers attached after the restore start from unseen_cards, not from this shuffle
+    engine._reported_shuffle = shoe.shuffle_count
+    return engine
+
+
+def unseen_cards(engine: BlackjackEngine) -> List[Card]:
+    """
+    Cards the player has not seen: the undealt shoe plus the hole card while it
+    has never been turned over. Use it to `reset` observers of a restored engine.
+    """
+    cards = engine.shoe.undealt()
+    if engine.dealer_hand and (engine.phase == PHASE_PLAYER or engine.all_hands_settled()):
+        cards.append(engine.dealer_hand[0])
+    return cards
+
+# =============================================================================
+# BLOCK 6: CONTINUATION VALUES
+# =============================================================================
+
+def legal_actions(engine: BlackjackEngine) -> List[str]:
+    """Actions the player may take in the engine's current state."""
+    if engine.phase != PHASE_PLAYER:
+        return []
+    actions = ["HIT", "STAND"]
+    if engine.can_double():
+        actions.append("DOUBLE")
+    if engine.can_split():
+        actions.append("SPLIT")
+    if engine.can_surrender():
+        actions.append("SURRENDER")
+    return actions
+
+
+def fork_action_values(snapshot: Snapshot, forks: int = DEFAULT_FORKS, seed: int = 0,
+                       policy: Optional[Callable[[BlackjackEngine], str]] = None) -> List[ActionValue]:
+    """
+    Values every legal action at a mid-round snapshot by playing it out on forks.
+
+    Values are the net of the whole round per base bet. Every action is played
+    on the same reshuffled forks (same seed), so the differences between actions
+    carry far less noise than the values themselves. After the action, the rest
+    of the round follows `policy` (basic strategy by default).
+
+    Raises:
+        SnapshotError: If the snapshot is not waiting for a player decision.
+    """
+    actions = legal_actions(restore_engine(snapshot))
+    if not actions:
+        raise SnapshotError("The snapshot is not waiting for a player decision.")
+    unit = snapshot.base_bet or 1
+    # Net of the whole round: the bankroll before any of its stakes were taken
+    opening = snapshot.bankroll + sum(snapshot.bets)
+    values = []
+    for action in actions:
+        total = total_sq = 0.0
+        for engine in fork_engines(snapshot, forks, seed):
+            apply_action(engine, action)
+            engine.play_player_turn(policy)
+            engine.play_dealer_turn()
+            net = (engine.bankroll - opening) / unit
+            total += net
+            total_sq += net * net
+        mean = total / forks
+        variance = max(total_sq / forks - mean * mean, 0.0)
+        values.append(ActionValue(action, mean, CONFIDENCE_Z * math.sqrt(variance / forks), forks))
+    return values
+
+# =============================================================================
+# BLOCK 7: COMMAND LINE
+# =============================================================================
+
+def _card_text(cards: Sequence[Card]) -> str:
+    """Cards as rank and suit symbols, e.g. "A♠ 10♥"."""
+    return " ".join("".join(card.symbols()) for card in cards)
+
+
+def describe(snapshot: Snapshot) -> List[str]:
+    """Human-readable summary of a snapshot, one line per item."""
+    lines = [f"rules {snapshot.rules.describe()}, bankroll {snapshot.bankroll}, base bet {snapshot.base_bet}, "
+             f"phase {snapshot.phase}",
+             f"shoe {len(snapshot.shoe_order) - snapshot.shoe_position} of {len(snapshot.shoe_order)} cards "
+             f"left (shuffle #{snapshot.shuffle_count})"]
+    if snapshot.dealer_hand:
+        shown = snapshot.dealer_hand[1:] if snapshot.hole_card_hidden else snapshot.dealer_hand
+        lines.append("dealer " + _card_text(shown) + (" + hole card" if snapshot.hole_card_hidden else ""))
+    for i, (hand, bet, status) in enumerate(zip(snapshot.hands, snapshot.bets, snapshot.statuses)):
+        marker = "*" if snapshot.phase == PHASE_PLAYER and i == snapshot.current_hand_index else " "
+        lines.append(f"{marker}hand {i + 1}: {_card_text(hand)}  bet {bet}  {status}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect a saved Blackjack session and value its continuations.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_SESSION_PATH, help="Snapshot file to read.")
+    parser.add_argument("--forks", type=int, default=0,
+                        help=f"Value each legal action on this many forks (e.g. {DEFAULT_FORKS}).")
+    parser.add_argument("--policy", default="basic", help="Policy for the rest of the round (see tournament).")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed of the forks.")
+    args = parser.parse_args(argv)
+
+    try:
+        snapshot = load_snapshot(args.path)
+    except (OSError, SnapshotError) as error:
+        print(f"Cannot read {args.path}: {error}", file=sys.stderr)
+        return 1
+    for line in describe(snapshot):
+        print(line)
+
+    if args.forks > 0:
+        from blackjack_tournament import resolve_policy
+        try:
+            policy = resolve_policy(args.policy, snapshot.rules)
+            values = fork_action_values(snapshot, args.forks, args.seed, policy)
+        except (ValueError, SnapshotError) as error:
+            print(error, file=sys.stderr)
+            return 1
+        best = max(values, key=lambda value: value.ev)
+        for value in values:
+            print(f"{value.action:<10}{value.ev:+.4f} ± {value.ci95:.4f} bets"
+                  f"{'   <- best' if value is best else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""
+Expected-value decision solver for Blackjack Ultimate.
+
+Computes the EV of STAND, HIT, DOUBLE, SPLIT and SURRENDER for the current hand
+against the dealer upcard under the table's Rules (dealer stands on or hits soft
+17, auto-stand on 21, split limit, doubling after splits, late surrender in a
+game without a dealer peek). Cards are drawn in proportion to the remaining shoe
+composition at decision time. Results are memoized by
+(player total, soft, upcard, composition, dealer rule) in bounded LRU caches, so
+repeated advice for a known position is a dictionary lookup, and `house_edge`
+reuses them to enumerate every opening deal of a full shoe exactly.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from blackjack_engine import (
+    DEALER_STAND_TOTAL, FULL_DECK, BlackjackEngine, Card, CardObserver, Hand,
+)
+from blackjack_rules import DEFAULT_RULES, Rules
+from blackjack_strategy import hand_state
+
+SOLVER_CACHE_SIZE = 65536
+
+# Remaining cards per blackjack value: index 0 is a 2, index 8 a ten-value, index 9 an Ace
+Composition = Tuple[int, ...]
+CARD_VALUES = tuple(range(2, 12))
+# Dealer final totals, in the order of the probabilities returned by dealer_outcomes
+DEALER_TOTALS = (17, 18, 19, 20, 21)
+BUST_OUTCOME = (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+STAND_OUTCOMES = tuple(tuple(1.0 if i == j else 0.0 for j in range(6)) for i in range(5))
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class Advice(NamedTuple):
+    """Best action with the EV (in units of the current hand's bet) of each option."""
+    action: str
+    stand: float
+    hit: float
+    split: Optional[float]                  # None when the hand cannot be split
+    double: Optional[float] = None          # None when the hand cannot be doubled
+    surrender: Optional[float] = None       # None when surrender is not allowed
+
+    @property
+    def ev(self) -> float:
+        """EV of the recommended action."""
+        return {"STAND": self.stand, "HIT": self.hit, "SPLIT": self.split,
+                "DOUBLE": self.double, "SURRENDER": self.surrender}[self.action]
+
+
+def composition_of(cards: Iterable[Card]) -> Composition:
+    """Counts cards per blackjack value."""
+    counts = [0] * len(CARD_VALUES)
+    for card in cards:
+        counts[card.blackjack_value - 2] += 1
+    return tuple(counts)
+
+
+FULL_DECK_COMPOSITION = composition_of(FULL_DECK)
+
+
+def remaining_composition(seen: Iterable[Card], decks: int = 1) -> Composition:
+    """Composition of `decks` full decks minus the cards already seen."""
+    counts = [count * decks for count in FULL_DECK_COMPOSITION]
+    for card in seen:
+        counts[card.blackjack_value - 2] -= 1
+    return tuple(max(count, 0) for count in counts)
+
+# =============================================================================
+# BLOCK 3: EXPECTED VALUE RECURSIONS
+# =============================================================================
+
+def add_card(total: int, soft: bool, value: int) -> Tuple[int, bool]:
+    """Adds one card to a (total, soft) state; soft means an Ace counts as 11."""
+    if value == 11:
+        if total + 11 <= 21:
+            return total + 11, True
+        value = 1
+    total += value
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+
+def _draw_odds(composition: Composition) -> Tuple[Tuple[int, float], ...]:
+    """(value, probability) of every card value still in the shoe."""
+    size = sum(composition)
+    return tuple((value, count / size)
+                 for value, count in zip(CARD_VALUES, composition) if count)
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def dealer_table(composition: Composition, hits_soft_17: bool = False) -> Dict[int, Tuple[float, ...]]:
+    """
+    Final-total probabilities (17, 18, 19, 20, 21, bust) for every dealer upcard.
+    One pass shares the dealer's intermediate states between all ten upcards.
+    """
+    odds = _draw_odds(composition)
+    memo: Dict[Tuple[int, bool], Tuple[float, ...]] = {}
+
+    def final_from(total: int, soft: bool) -> Tuple[float, ...]:
+        if total > 21:
+            return BUST_OUTCOME
+        if total >= DEALER_STAND_TOTAL and not (hits_soft_17 and soft and total == DEALER_STAND_TOTAL):
+            return STAND_OUTCOMES[total - 17]
+        key = (total, soft)
+        cached = memo.get(key)
+        if cached is None:
+            p17 = p18 = p19 = p20 = p21 = bust = 0.0
+            for value, p in odds:
+                q = final_from(*add_card(total, soft, value))
+                p17 += p * q[0]
+                p18 += p * q[1]
+                p19 += p * q[2]
+                p20 += p * q[3]
+                p21 += p * q[4]
+                bust += p * q[5]
+            cached = memo[key] = (p17, p18, p19, p20, p21, bust)
+        return cached
+
+    return {upcard: final_from(upcard, upcard == 11) for upcard in CARD_VALUES}
+
+
+def dealer_outcomes(upcard: int, composition: Composition, hits_soft_17: bool = False) -> Tuple[float, ...]:
+    """
+    Probabilities of the dealer finishing on 17, 18, 19, 20, 21 or busting.
+
+    Args:
+        upcard: Blackjack value of the dealer's visible card (Ace = 11).
+        composition: Remaining shoe composition (the hole card is still unseen).
+        hits_soft_17: Whether the dealer draws on soft 17.
+    """
+    return dealer_table(composition, hits_soft_17)[upcard]
+
+
+def dealer_blackjack_probability(upcard: int, composition: Composition) -> float:
+    """Probability that the hole card completes a dealer Blackjack."""
+    if upcard not in (10, 11):
+        return 0.0
+    return composition[9 if upcard == 10 else 8] / sum(composition)
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def stand_ev(total: int, upcard: int, composition: Composition, hits_soft_17: bool = False) -> float:
+    """EV of standing on `total` against the dealer upcard."""
+    if total > 21:
+        return -1.0
+    outcomes = dealer_outcomes(upcard, composition, hits_soft_17)
+    ev = outcomes[5]
+    for dealer_total, p in zip(DEALER_TOTALS, outcomes):
+        if total > dealer_total:
+            ev += p
+        elif total < dealer_total:
+            ev -= p
+    return ev
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def hit_ev(total: int, soft: bool, upcard: int, composition: Composition, hits_soft_17: bool = False) -> float:
+    """EV of taking one card and then playing on optimally."""
+    ev = 0.0
+    for value, p in _draw_odds(composition):
+        ev += p * best_ev(*add_card(total, soft, value), upcard, composition, hits_soft_17)
+    return ev
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def best_ev(total: int, soft: bool, upcard: int, composition: Composition, hits_soft_17: bool = False) -> float:
+    """EV of the best of STAND/HIT; busts lose and 21 stands automatically."""
+    if total > 21:
+        return -1.0
+    if total == 21:
+        return stand_ev(total, upcard, composition, hits_soft_17)
+    return max(stand_ev(total, upcard, composition, hits_soft_17),
+               hit_ev(total, soft, upcard, composition, hits_soft_17))
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def double_ev(total: int, soft: bool, upcard: int, composition: Composition, hits_soft_17: bool = False) -> float:
+    """EV (in units of the original bet) of doubling: twice the stake, exactly one more card."""
+    ev = 0.0
+    for value, p in _draw_odds(composition):
+        ev += p * stand_ev(add_card(total, soft, value)[0], upcard, composition, hits_soft_17)
+    return 2 * ev
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def _pending_split_hands_ev(value: int, pending: int, splits_left: int, upcard: int,
+                            composition: Composition, hits_soft_17: bool = False,
+                            double_after_split: bool = False) -> float:
+    """
+    Total EV of playing `pending` single-card hands of `value` in order.
+    A hand that is dealt a matching card may be split again while `splits_left` > 0,
+    and any two-card hand may be doubled when `double_after_split`.
+    """
+    if pending == 0:
+        return 0.0
+    first_total, first_soft = add_card(0, False, value)
+    rest = _pending_split_hands_ev(value, pending - 1, splits_left, upcard, composition,
+                                   hits_soft_17, double_after_split)
+    ev = 0.0
+    for drawn, p in _draw_odds(composition):
+        total, soft = add_card(first_total, first_soft, drawn)
+        hand = best_ev(total, soft, upcard, composition, hits_soft_17)
+        if double_after_split and total < 21:
+            hand = max(hand, double_ev(total, soft, upcard, composition, hits_soft_17))
+        play = hand + rest
+        if drawn == value and splits_left > 0:
+            play = max(play, _pending_split_hands_ev(value, pending + 1, splits_left - 1, upcard,
+                                                     composition, hits_soft_17, double_after_split))
+        ev += p * play
+    return ev
+
+
+def split_ev(value: int, upcard: int, composition: Composition, hands_in_play: int = 1,
+             rules: Rules = DEFAULT_RULES) -> float:
+    """Total EV (both hands) of splitting a pair of `value` with `hands_in_play` hands on the table."""
+    splits_left = rules.max_hands - hands_in_play - 1
+    return _pending_split_hands_ev(value, 2, splits_left, upcard, composition,
+                                   rules.dealer_hits_soft_17, rules.double_after_split)
+
+
+def surrender_ev(upcard: int, composition: Composition) -> float:
+    """EV of late surrender: half the bet back, unless the dealer turns over a Blackjack."""
+    return -0.5 - 0.5 * dealer_blackjack_probability(upcard, composition)
+
+# =============================================================================
+# BLOCK 4: ADVISOR
+# =============================================================================
+
+def solve_hand(hand: Hand, upcard: Card, composition: Composition,
+               can_split: bool = False, hands_in_play: int = 1, rules: Rules = DEFAULT_RULES,
+               can_double: bool = False, can_surrender: bool = False) -> Advice:
+    """
+    Computes the EV of every legal action for `hand` and picks the best one.
+
+    Args:
+        hand: The player's hand currently in play.
+        upcard: The dealer's visible card.
+        composition: Remaining shoe composition as seen by the player.
+        can_split: Whether SPLIT is a legal action for this hand.
+        hands_in_play: Number of player hands already on the table.
+        rules: Table rules (dealer soft 17, split limit, doubling after splits).
+        can_double: Whether DOUBLE is a legal action for this hand.
+        can_surrender: Whether SURRENDER is a legal action for this hand.
+    """
+    total, soft = hand_state(hand)
+    dealer_value = upcard.blackjack_value
+    h17 = rules.dealer_hits_soft_17
+    stand = stand_ev(total, dealer_value, composition, h17)
+    hit = hit_ev(total, soft, dealer_value, composition, h17) if total < 21 else -1.0
+    split = double = surrender = None
+    if can_split:
+        split = split_ev(hand[0].blackjack_value, dealer_value, composition, hands_in_play, rules)
+    if can_double and total < 21:
+        double = double_ev(total, soft, dealer_value, composition, h17)
+    if can_surrender:
+        surrender = surrender_ev(dealer_value, composition)
+
+    action, best = ("HIT", hit) if hit > stand else ("STAND", stand)
+    for option, ev in (("DOUBLE", double), ("SPLIT", split), ("SURRENDER", surrender)):
+        if ev is not None and ev > best:
+            action, best = option, ev
+    return Advice(action, stand, hit, split, double, surrender)
+
+
+def advise(engine: BlackjackEngine, composition: Optional[Composition] = None) -> Advice:
+    """
+    Best action for the engine's current hand.
+
+    Args:
+        engine: Engine in the player phase.
+        composition: Unseen cards as known to the player. Defaults to the shoe's
+            undealt cards plus the dealer's face-down hole card.
+    """
+    if composition is None:
+        counts = list(engine.shoe.composition)
+        counts[engine.dealer_hand[0].blackjack_value - 2] += 1
+        composition = tuple(counts)
+    return solve_hand(engine.current_hand, engine.dealer_upcard, composition,
+                      can_split=engine.can_split(), hands_in_play=len(engine.player_hands),
+                      rules=engine.rules, can_double=engine.can_double(),
+                      can_surrender=engine.can_surrender())
+
+
+def house_edge(rules: Rules = DEFAULT_RULES) -> float:
+    """
+    Exact house edge of perfect composition-dependent play off the top of a full shoe.
+
+    Enumerates every opening deal (two player cards and the dealer upcard, with
+    card removal) and plays each with its best action under `rules`; the
+    recursions share the solver's memoized EVs, so a rule set takes well under a
+    second. Fixed-composition play after the deal, as in `solve_hand`.
+
+    Returns:
+        The house edge as a fraction of the initial bet (positive favours the house).
+    """
+    shoe = tuple(count * rules.num_decks for count in FULL_DECK_COMPOSITION)
+    size = sum(shoe)
+    h17 = rules.dealer_hits_soft_17
+    can_split = rules.max_hands > 1
+    player_ev = 0.0
+    for i, first in enumerate(CARD_VALUES):
+        for j in range(i, len(CARD_VALUES)):
+            second = CARD_VALUES[j]
+            counts = list(shoe)
+            p_hand = counts[i] / size
+            counts[i] -= 1
+            p_hand *= counts[j] / (size - 1) * (1 if i == j else 2)
+            counts[j] -= 1
+            total, soft = add_card(*add_card(0, False, first), second)
+            for k, upcard in enumerate(CARD_VALUES):
+                if not counts[k]:
+                    continue
+                p_deal = p_hand * counts[k] / (size - 2)
+                counts[k] -= 1
+                composition = tuple(counts)
+                counts[k] += 1
+                if total == 21:
+                    ev = (rules.blackjack_payout - 1) * (1 - dealer_blackjack_probability(upcard, composition))
+                else:
+                    ev = max(best_ev(total, soft, upcard, composition, h17),
+                             double_ev(total, soft, upcard, composition, h17))
+                    if i == j and can_split:
+                        ev = max(ev, split_ev(first, upcard, composition, 1, rules))
+                    if rules.surrender:
+                        ev = max(ev, surrender_ev(upcard, composition))
+                player_ev += p_deal * ev
+    return -player_ev
+
+
+# =============================================================================
+# BLOCK 5: LIVE DEALER ODDS
+# =============================================================================
+
+class DealerOutlook(CardObserver):
+    """
+    Dealer final-total distribution for every upcard, kept in step with the shoe.
+
+    Attach it to `BlackjackEngine.observers`: each visible card is an O(1) count
+    update, and the table for all ten upcards is rebuilt in one shared pass
+    (memoized per composition) the next time it is read.
+    """
+
+    def __init__(self, composition: Composition = FULL_DECK_COMPOSITION, rules: Rules = DEFAULT_RULES):
+        """
+        Args:
+            composition: Unseen cards to start from.
+            rules: Table rules; the dealer's play on soft 17 changes every table.
+        """
+        self._counts = list(composition)
+        self._hits_soft_17 = rules.dealer_hits_soft_17
+        self._table: Optional[Dict[int, Tuple[float, ...]]] = None
+
+    def reset(self, cards: Iterable[Card]) -> None:
+        """Starts over from the contents of a freshly shuffled deck."""
+        self._counts = list(composition_of(cards))
+        self._table = None
+
+    def card_seen(self, card: Card) -> None:
+        """Removes a dealt card from the unseen composition."""
+        index = card.blackjack_value - 2
+        if self._counts[index] > 0:
+            self._counts[index] -= 1
+            self._table = None
+
+    @property
+    def composition(self) -> Composition:
+        """Composition of the cards not seen yet (including the hole card)."""
+        return tuple(self._counts)
+
+    @property
+    def table(self) -> Dict[int, Tuple[float, ...]]:
+        """Upcard value -> probabilities of finishing on 17, 18, 19, 20, 21 or busting."""
+        if self._table is None:
+            self._table = dealer_table(self.composition, self._hits_soft_17)
+        return self._table
+
+    def outcomes(self, upcard: int) -> Tuple[float, ...]:
+        """Final-total probabilities for one upcard value (Ace = 11)."""
+        return self.table[upcard]
+
+    def bust_probability(self, upcard: int) -> float:
+        """Probability that the dealer busts showing `upcard`."""
+        return self.table[upcard][5]
+
+    def bust_probabilities(self) -> Dict[int, float]:
+        """Bust probability for every upcard value."""
+        return {upcard: odds[5] for upcard, odds in self.table.items()}
+
+
+def clear_cache() -> None:
+    """Drops every memoized result (e.g. to bound memory between long sessions)."""
+    for cached in (dealer_table, stand_ev, hit_ev, best_ev, double_ev, _pending_split_hands_ev):
+        cached.cache_clear()
@@ -0,0 +1,186 @@
+"""
+Rolling session statistics for Blackjack Ultimate.
+
+`SessionStats.record` takes each resolved round and updates every figure in
+O(1): hands played, win/loss/push/Blackjack counts, the net result, the
+largest upswing and drawdown of the running net, and how often PRO ADVICE was
+followed compared with the return of rounds that followed or ignored it. Rates
+over the last `window` rounds come from a ring buffer. The buffer adds the new
+round and drops the one falling out of the window, so memory stays fixed
+however long the session runs. Nothing is ever rescanned.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+from array import array
+from typing import List
+
+from blackjack_engine import BlackjackEngine, RoundResult
+
+ROLLING_WINDOW = 100            # Rounds covered by the rolling rates
+
+# Outcome flags of one round in the ring buffer
+_WIN = 1
+_LOSS = 2
+_BLACKJACK = 4
+
+# =============================================================================
+# BLOCK 2: SESSION STATISTICS
+# =============================================================================
+
+class SessionStats:
+    """Session totals and rolling rates, each updated in O(1) per round."""
+    __slots__ = ("window", "hands", "wins", "losses", "blackjacks", "net", "wagered",
+                 "peak", "trough", "max_runup", "max_drawdown",
+                 "decisions", "decisions_followed", "_round_deviated",
+                 "followed_net", "followed_wagered", "deviated_net", "deviated_wagered",
+                 "_outcomes", "_nets", "_next", "_filled",
+                 "recent_wins", "recent_losses", "recent_blackjacks", "recent_net")
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        """
+        Args:
+            window: Number of most recent rounds covered by the rolling rates.
+        """
+        if window < 1:
+            raise ValueError("The rolling window needs at least one round.")
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        """Starts a new session."""
+        self.hands = self.wins = self.losses = self.blackjacks = 0
+        self.net = self.wagered = 0
+        # Running extremes of the net, for the largest swings
+        self.peak = self.trough = 0
+        self.max_runup = self.max_drawdown = 0
+
+        self.decisions = self.decisions_followed = 0
+        self._round_deviated = False
+        self.followed_net = self.followed_wagered = 0
+        self.deviated_net = self.deviated_wagered = 0
+
+        # Ring buffer of the last `window` rounds: outcome flags and nets
+        self._outcomes = bytearray(self.window)
+        self._nets = array("q", bytes(8 * self.window))
+        self._next = 0
+        self._filled = 0
+        self.recent_wins = self.recent_losses = self.recent_blackjacks = 0
+        self.recent_net = 0
+
+    # -------------------------------------------------------------------------
+    # RECORDING
+    # -------------------------------------------------------------------------
+    def note_decision(self, followed: bool) -> None:
+        """Records one player decision of the current round and whether it matched the advice."""
+        self.decisions += 1
+        if followed:
+            self.decisions_followed += 1
+        else:
+            self._round_deviated = True
+
+    def record(self, engine: BlackjackEngine, result: RoundResult, by_player: bool = True) -> None:
+        """
+        Adds a round just settled by `engine.resolve_game`.
+
+        Args:
+            by_player: False for rounds played by autoplay. They count in the
+                totals and rates but not in the advice comparison.
+        """
+        net = result.net
+        flags = ((_WIN if net > 0 else _LOSS if net < 0 else 0) |
+                 (_BLACKJACK if "Blackjack" in engine.hand_statuses else 0))
+
+        # Session totals
+        self.hands += 1
+        self.wins += flags & _WIN
+        self.losses += (flags & _LOSS) >> 1
+        self.blackjacks += (flags & _BLACKJACK) >> 2
+        self.net += net
+        self.wagered += result.total_wagered
+        if self.net > self.peak:
+            self.peak = self.net
+        if self.net < self.trough:
+            self.trough = self.net
+        self.max_runup = max(self.max_runup, self.net - self.trough)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.net)
+
+        # Rounds where any decision went against the advice are scored apart
+        if by_player:
+            if self._round_deviated:
+                self.deviated_net += net
+                self.deviated_wagered += result.total_wagered
+            else:
+                self.followed_net += net
+                self.followed_wagered += result.total_wagered
+        self._round_deviated = False
+
+        # Ring buffer: the oldest round leaves the window as the new one enters it
+        slot = self._next
+        if self._filled == self.window:
+            self._drop(self._outcomes[slot], self._nets[slot])
+        else:
+            self._filled += 1
+        self._outcomes[slot] = flags
+        self._nets[slot] = net
+        self.recent_wins += flags & _WIN
+        self.recent_losses += (flags & _LOSS) >> 1
+        self.recent_blackjacks += (flags & _BLACKJACK) >> 2
+        self.recent_net += net
+        self._next = (slot + 1) % self.window
+
+    def _drop(self, flags: int, net: int) -> None:
+        """Removes a round that fell out of the rolling window."""
+        self.recent_wins -= flags & _WIN
+        self.recent_losses -= (flags & _LOSS) >> 1
+        self.recent_blackjacks -= (flags & _BLACKJACK) >> 2
+        self.recent_net -= net
+
+    # -------------------------------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------------------------------
+    @property
+    def pushes(self) -> int:
+        """Rounds that neither won nor lost money."""
+        return self.hands - self.wins - self.losses
+
+    @property
+    def recent_hands(self) -> int:
+        """Rounds currently in the rolling window."""
+        return self._filled
+
+    @property
+    def follow_rate(self) -> float:
+        """Share of decisions that matched the advice."""
+        return self.decisions_followed / self.decisions if self.decisions else 0.0
+
+    @property
+    def followed_return(self) -> float:
+        """Net per unit staked in rounds that followed the advice throughout."""
+        return self.followed_net / self.followed_wagered if self.followed_wagered else 0.0
+
+    @property
+    def deviated_return(self) -> float:
+        """Net per unit staked in rounds with at least one decision against the advice."""
+        return self.deviated_net / self.deviated_wagered if self.deviated_wagered else 0.0
+
+    def format_lines(self) -> List[str]:
+        """The statistics as short text lines, for on-screen display."""
+        if not self.hands:
+            return ["SESSION: no hands yet"]
+
+        def rates(hands: int, wins: int, losses: int, blackjacks: int) -> str:
+            return (f"W {wins / hands:4.0%}  L {losses / hands:4.0%}  "
+                    f"P {(hands - wins - losses) / hands:4.0%}  BJ {blackjacks / hands:4.1%}")
+
+        lines = [f"SESSION {self.hands} hands  net {self.net:+d}",
+                 rates(self.hands, self.wins, self.losses, self.blackjacks),
+                 f"last {self.recent_hands}: net {self.recent_net:+d}",
+                 rates(self.recent_hands, self.recent_wins, self.recent_losses, self.recent_blackjacks),
+                 f"swings: up +{self.max_runup}  down -{self.max_drawdown}"]
+        if self.decisions:
+            lines.append(f"advice followed {self.follow_rate:.0%} of {self.decisions} decisions")
+            lines.append(f"return followed {self.followed_return:+.1%}"
+                         + (f"  ignored {self.deviated_return:+.1%}" if self.deviated_wagered else ""))
+        return lines
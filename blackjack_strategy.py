@@ -0,0 +1,367 @@
+"""
+Strategy charts for Blackjack Ultimate.
+
+A StrategyChart is a dense table of one-letter actions (H = hit, S = stand,
+P = split, D/X = double else hit/stand, R/Q = surrender else hit/stand) indexed
+by hand state and dealer upcard, so a strategy decision is a single lookup. `BASIC_CHART` is the hand-written basic strategy the engine has
+always played. `generate_chart` derives a complete exact-EV chart for a rule set
+with the solver, and `get_chart` keeps those charts in an on-disk cache keyed by
+the rules' fingerprint: the cache loads lazily on first use, and a missing or
+stale file is rebuilt on a background thread while `get_chart` returns None.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import os
+import struct
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from blackjack_cards import Card, Hand
+from blackjack_rules import DEFAULT_RULES, Rules
+
+CHART_MAGIC = b"BJSC"
+CHART_VERSION = 2                   # Bump when the layout or the generator changes; old files get rebuilt
+CACHE_DIR_ENV_VAR = "BLACKJACK_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blackjack_ultimate")
+
+# Chart layout: one row per hand state, one column per dealer upcard value (Ace = 11)
+UPCARD_VALUES = tuple(range(2, 12))
+HARD_TOTALS = tuple(range(2, 22))
+SOFT_TOTALS = tuple(range(11, 22))
+PAIR_VALUES = tuple(range(2, 12))
+SOFT_ROW = len(HARD_TOTALS)
+PAIR_ROW = SOFT_ROW + len(SOFT_TOTALS)
+CHART_SIZE = (PAIR_ROW + len(PAIR_VALUES)) * len(UPCARD_VALUES)
+
+ACTION_LETTERS = {"HIT": "H", "STAND": "S", "SPLIT": "P", "DOUBLE": "D", "SURRENDER": "R"}
+DOUBLE_OR_STAND = "X"               # Double if allowed, otherwise stand
+SURRENDER_OR_STAND = "Q"            # Surrender if allowed, otherwise stand
+NO_SPLIT = "-"                      # Pair rows: play the pair by its total
+# Letter -> (action when allowed, fallback when doubling/surrender is not allowed)
+_ACTIONS_BY_CODE = {
+    ord("H"): ("HIT", "HIT"), ord("S"): ("STAND", "STAND"),
+    ord("D"): ("DOUBLE", "HIT"), ord(DOUBLE_OR_STAND): ("DOUBLE", "STAND"),
+    ord("R"): ("SURRENDER", "HIT"), ord(SURRENDER_OR_STAND): ("SURRENDER", "STAND"),
+}
+_DOUBLE_CODES = frozenset(ord(letter) for letter in ("D", DOUBLE_OR_STAND))
+_SURRENDER_CODES = frozenset(ord(letter) for letter in ("R", SURRENDER_OR_STAND))
+TOTAL_LETTERS = frozenset(chr(code) for code in _ACTIONS_BY_CODE)
+_SPLIT_CODE = ord(ACTION_LETTERS["SPLIT"])
+_VALID_CODES = frozenset(_ACTIONS_BY_CODE) | {_SPLIT_CODE, ord(NO_SPLIT)}
+
+# Cache file: magic, chart version, rules fingerprint, then CHART_SIZE action letters
+_HEADER = struct.Struct("<4sH32s")
+
+# =============================================================================
+# BLOCK 2: CHART
+# =============================================================================
+
+def hand_state(hand: Hand) -> Tuple[int, bool]:
+    """(total, soft) of a Hand, where soft means an Ace is currently counted as 11."""
+    soft = hand.ace_count > 0 and hand.hard_total + 10 <= 21
+    return (hand.hard_total + 10 if soft else hand.hard_total), soft
+
+
+class StrategyChart:
+    """
+    A complete strategy chart stored as CHART_SIZE ASCII letters.
+    Hard rows come first, then soft rows, then pair rows (P or NO_SPLIT).
+    """
+    __slots__ = ("cells",)
+
+    def __init__(self, cells: bytes):
+        if len(cells) != CHART_SIZE or not set(cells) <= _VALID_CODES:
+            raise ValueError("Not a complete strategy chart.")
+        self.cells = bytes(cells)
+
+    @classmethod
+    def from_rows(cls, hard: Sequence[str], soft: Sequence[str], pairs: Sequence[str]) -> "StrategyChart":
+        """
+        Builds a chart from rows of one letter per upcard (2..10, A).
+
+        Args:
+            hard: One row per hard total in HARD_TOTALS.
+            soft: One row per soft total in SOFT_TOTALS.
+            pairs: One row per pair value in PAIR_VALUES.
+        """
+        if (len(hard), len(soft), len(pairs)) != (len(HARD_TOTALS), len(SOFT_TOTALS), len(PAIR_VALUES)):
+            raise ValueError("Wrong number of chart rows.")
+        return cls("".join((*hard, *soft, *pairs)).encode("ascii"))
+
+    def lookup(self, total: int, soft: bool, upcard_value: int, pair_value: Optional[int] = None,
+               can_double: bool = False, can_surrender: bool = False) -> str:
+        """
+        Chart action for a hand state.
+
+        Args:
+            total: Hand total (clamped to the chart's rows).
+            soft: Whether the total counts an Ace as 11.
+            upcard_value: Blackjack value of the dealer's upcard (2-11).
+            pair_value: Card value when the hand is a splittable pair, else None.
+            can_double: Whether doubling is allowed (D/X cells fall back otherwise).
+            can_surrender: Whether surrender is allowed (R/Q cells fall back otherwise).
+        Returns:
+            "HIT", "STAND", "SPLIT", "DOUBLE" or "SURRENDER".
+        """
+        code = self._code(total, soft, upcard_value, pair_value)
+        if code == _SPLIT_CODE:
+            return "SPLIT"
+        allowed, fallback = _ACTIONS_BY_CODE[code]
+        if code in _DOUBLE_CODES:
+            return allowed if can_double else fallback
+        if code in _SURRENDER_CODES:
+            return allowed if can_surrender else fallback
+        return allowed
+
+    def letter(self, hand: Hand, upcard: Card, can_split: bool = False) -> str:
+        """Chart letter for `hand` against `upcard` (P for a pair split when `can_split`)."""
+        total, soft = hand_state(hand)
+        return chr(self._code(total, soft, upcard.blackjack_value, hand[0].blackjack_value if can_split else None))
+
+    def _code(self, total: int, soft: bool, upcard_value: int, pair_value: Optional[int]) -> int:
+        """Cell byte for a hand state: the pair cell when it splits, otherwise the total's cell."""
+        column = upcard_value - 2
+        width = len(UPCARD_VALUES)
+        if pair_value is not None and self.cells[(PAIR_ROW + pair_value - 2) * width + column] == _SPLIT_CODE:
+            return _SPLIT_CODE
+        if soft:
+            row = SOFT_ROW + min(max(total, 11), 21) - 11
+        else:
+            row = min(max(total, 2), 21) - 2
+        return self.cells[row * width + column]
+
+    def action(self, hand: Hand, upcard: Card, can_split: bool = False,
+               can_double: bool = False, can_surrender: bool = False) -> str:
+        """Chart action for `hand` against `upcard`; SPLIT, DOUBLE and SURRENDER only when allowed."""
+        total, soft = hand_state(hand)
+        return self.lookup(total, soft, upcard.blackjack_value, hand[0].blackjack_value if can_split else None,
+                           can_double, can_surrender)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, StrategyChart) and self.cells == other.cells
+
+    def __hash__(self) -> int:
+        return hash(self.cells)
+
+
+class ChartPolicy:
+    """Engine policy playing a chart; picklable, so it can be sent to simulation workers."""
+    __slots__ = ("chart",)
+
+    def __init__(self, chart: StrategyChart):
+        self.chart = chart
+
+    def __call__(self, engine) -> str:
+        return self.chart.action(engine.current_hand, engine.dealer_upcard, engine.can_split(),
+                                 engine.can_double(), engine.can_surrender())
+
+
+# The engine's historical basic strategy, which never doubles, splits or surrenders
+# (columns: dealer 2 3 4 5 6 7 8 9 10 A)
+BASIC_CHART = StrategyChart.from_rows(
+    hard=(["HHHHHHHHHH"] * 10           # 2-11: always hit
+          + ["HHSSSHHHHH"]              # 12: stand against 4-6
+          + ["SSSSSHHHHH"] * 4          # 13-16: stand against 2-6
+          + ["SSSSSSSSSS"] * 5),        # 17-21
+    soft=(["HHHHHHHHHH"] * 7            # Soft 11-17
+          + ["SSSSSSSHHH"]              # Soft 18: stand against 2-8
+          + ["SSSSSSSSSS"] * 3),        # Soft 19-21
+    pairs=[NO_SPLIT * len(UPCARD_VALUES)] * len(PAIR_VALUES),
+)
+
+
+def read_chart_csv(text: str, base: StrategyChart = BASIC_CHART) -> StrategyChart:
+    """
+    Chart from the CSV written by `blackjack_cli.py strategy --format csv`.
+
+    Each row names a hand ("Hard 16", "Soft 18", "Pair 8", "Pair A") followed by
+    one letter per upcard 2..A. States the file leaves out keep `base`'s action,
+    and pair rows split on P and otherwise play the pair by its total.
+    """
+    cells = bytearray(base.cells)
+    width = len(UPCARD_VALUES)
+    for line in text.splitlines()[1:]:
+        if not line.strip():
+            continue
+        label, *letters = [field.strip().upper() for field in line.split(",")]
+        kind, _, value = label.partition(" ")
+        number = 11 if value == "A" else int(value)
+        if len(letters) != width:
+            raise ValueError(f"Chart row {label!r} needs {width} actions.")
+        if kind == "PAIR" and number in PAIR_VALUES:
+            row = PAIR_ROW + number - 2
+            letters = [letter if letter == ACTION_LETTERS["SPLIT"] else NO_SPLIT for letter in letters]
+        elif kind in ("HARD", "SOFT") and number in (SOFT_TOTALS if kind == "SOFT" else HARD_TOTALS):
+            row = SOFT_ROW + number - 11 if kind == "SOFT" else number - 2
+            if not set(letters) <= TOTAL_LETTERS:
+                raise ValueError(f"Chart row {label!r} may only hold {', '.join(sorted(TOTAL_LETTERS))}.")
+        else:
+            raise ValueError(f"Unknown chart row {label!r}.")
+        cells[row * width:(row + 1) * width] = "".join(letters).encode("ascii")
+    return StrategyChart(bytes(cells))
+
+# =============================================================================
+# BLOCK 3: GENERATOR
+# =============================================================================
+
+def _card(value: int) -> Card:
+    """A card of blackjack value `value` (10 = a ten, 11 = an Ace)."""
+    return Card(14 if value == 11 else value, "S")
+
+
+def sample_hand(total: int, soft: bool) -> List[Card]:
+    """A hand with the given total (2-21 hard, 11-21 soft), e.g. 10+6 for hard 16."""
+    if soft:
+        if total <= 12:
+            return [Card(14, "S")] * (total - 10)       # A alone, or A+A
+        return [Card(14, "S"), Card(total - 11 if total < 21 else 13, "H")]
+    if total == 21:
+        return [Card(10, "S"), Card(6, "H"), Card(5, "D")]
+    if total >= 12:
+        return [Card(10, "S"), Card(total - 10, "H")]
+    if total <= 3:
+        return [Card(total, "S")]                       # A single split card
+    return [Card(2, "S"), Card(total - 2, "H")]
+
+
+def generate_chart(rules: Rules = DEFAULT_RULES) -> StrategyChart:
+    """
+    Exact-EV chart for a full shoe under `rules`.
+    Every cell is solved with the sample hand and the upcard removed from the shoe.
+    Two-card totals may double or surrender (when the rules offer it); the cell
+    then records whether hitting or standing is the fallback (D/X, R/Q).
+    """
+    # Imported here: the solver imports the engine, which imports this module
+    from blackjack_solver import FULL_DECK_COMPOSITION, solve_hand
+
+    shoe = tuple(count * rules.num_decks for count in FULL_DECK_COMPOSITION)
+
+    fallback_letters = {("DOUBLE", "HIT"): "D", ("DOUBLE", "STAND"): DOUBLE_OR_STAND,
+                        ("SURRENDER", "HIT"): "R", ("SURRENDER", "STAND"): SURRENDER_OR_STAND}
+
+    def solve(cards: List[Card], upcard_value: int, can_split: bool = False) -> str:
+        upcard = _card(upcard_value)
+        counts = list(shoe)
+        for card in (*cards, upcard):
+            counts[card.blackjack_value - 2] -= 1
+        two_cards = len(cards) == 2
+        advice = solve_hand(Hand(cards), upcard, tuple(counts), can_split=can_split, rules=rules,
+                            can_double=two_cards, can_surrender=two_cards and rules.surrender)
+        if advice.action in ("DOUBLE", "SURRENDER"):
+            return fallback_letters[advice.action, "HIT" if advice.hit > advice.stand else "STAND"]
+        return ACTION_LETTERS[advice.action]
+
+    hard = ["".join(solve(sample_hand(total, False), up) for up in UPCARD_VALUES)
+            for total in HARD_TOTALS]
+    soft = ["".join(solve(sample_hand(total, True), up) for up in UPCARD_VALUES)
+            for total in SOFT_TOTALS]
+    split = ACTION_LETTERS["SPLIT"]
+    pairs = ["".join(split if solve([_card(value)] * 2, up, can_split=True) == split else NO_SPLIT
+                     for up in UPCARD_VALUES)
+             for value in PAIR_VALUES]
+    return StrategyChart.from_rows(hard, soft, pairs)
+
+# =============================================================================
+# BLOCK 4: DISK CACHE
+# =============================================================================
+
+_charts: Dict[Rules, StrategyChart] = {}
+_builders: Dict[Rules, threading.Thread] = {}
+_lock = threading.Lock()
+
+
+def chart_path(rules: Rules = DEFAULT_RULES) -> str:
+    """Cache file of the chart for `rules` (directory overridable via BLACKJACK_CACHE_DIR)."""
+    directory = os.environ.get(CACHE_DIR_ENV_VAR) or DEFAULT_CACHE_DIR
+    return os.path.join(directory, f"strategy-{rules.fingerprint.hex()[:16]}.chart")
+
+
+def save_chart(chart: StrategyChart, rules: Rules = DEFAULT_RULES, path: Optional[str] = None) -> str:
+    """
+    Writes `chart` to the cache atomically (temporary file, then rename).
+
+    Returns:
+        The path written.
+    """
+    path = path or chart_path(rules)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".strategy-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(CHART_MAGIC, CHART_VERSION, rules.fingerprint))
+            f.write(chart.cells)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def load_chart(rules: Rules = DEFAULT_RULES, path: Optional[str] = None) -> Optional[StrategyChart]:
+    """
+    Cached chart for `rules`, or None when the file is missing or stale
+    (another chart version, other rules, or a truncated or corrupt file).
+    """
+    try:
+        with open(path or chart_path(rules), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) != _HEADER.size + CHART_SIZE:
+        return None
+    magic, version, fingerprint = _HEADER.unpack_from(data)
+    if magic != CHART_MAGIC or version != CHART_VERSION or fingerprint != rules.fingerprint:
+        return None
+    try:
+        return StrategyChart(data[_HEADER.size:])
+    except ValueError:
+        return None
+
+
+def _build_and_store(rules: Rules) -> None:
+    """Background job: generates the chart, publishes it, then writes the cache file."""
+    chart = generate_chart(rules)
+    with _lock:
+        _charts[rules] = chart
+        del _builders[rules]
+    try:
+        save_chart(chart, rules)
+    except OSError:
+        pass                        # Unwritable cache: the chart is still served from memory
+
+
+def get_chart(rules: Rules = DEFAULT_RULES, block: bool = False) -> Optional[StrategyChart]:
+    """
+    The exact chart for `rules`, loaded from the disk cache on first use.
+
+    A missing or stale cache is rebuilt on a daemon thread (one per rule set);
+    until it finishes this returns None, so callers on the UI thread never wait.
+
+    Args:
+        rules: Rule configuration the chart is solved for.
+        block: Wait for a rebuild instead of returning None.
+    """
+    chart = _charts.get(rules)
+    if chart is not None:
+        return chart
+    with _lock:
+        if rules not in _charts and rules not in _builders:
+            chart = load_chart(rules)
+            if chart is not None:
+                _charts[rules] = chart
+            else:
+                builder = threading.Thread(target=_build_and_store, args=(rules,),
+                                           name="strategy-chart", daemon=True)
+                _builders[rules] = builder
+                builder.start()
+        builder = _builders.get(rules)
+    if block and builder is not None:
+        builder.join()
+    return _charts.get(rules)
@@ -0,0 +1,372 @@
+"""
+Strategy tournament for Blackjack Ultimate.
+
+Plays several decision policies on the same pre-generated cards (common random
+numbers). The deals are generated once into a shared-memory block that every
+worker process maps. Round r starts from the same cards for every policy, so
+the difference between two policies is measured on identical deals. That
+difference has a far smaller variance than two independent simulations.
+
+Besides the EV of each policy with a confidence interval, the report breaks the
+EV difference to the baseline (the first policy) down by chart cell: each round
+is charged to the hand state and dealer upcard where the two first disagreed.
+
+    python blackjack_tournament.py --rounds 200000 basic exact never-bust mimic-dealer
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from blackjack_engine import (
+    DEALER_STAND_TOTAL, FULL_DECK, PHASE_PLAYER, BlackjackEngine, Card, apply_action, basic_strategy_policy,
+)
+from blackjack_parallel import DEFAULT_BET, Policy, split_rounds
+from blackjack_rules import DEFAULT_RULES, Rules, add_rule_arguments, rules_from_args
+from blackjack_shoe import DEFAULT_DECKS, Shoe
+from blackjack_strategy import ChartPolicy, get_chart, hand_state, read_chart_csv
+
+DEFAULT_ROUNDS = 200_000
+DEFAULT_POLICIES = ("basic", "exact", "never-bust", "mimic-dealer")
+ROUND_CARDS = 16                # Cards reserved per round; longer rounds continue into the next round's cards
+CONFIDENCE_Z = 1.96             # 95% confidence intervals
+TOP_CELLS = 8                   # Divergence cells listed per policy
+
+# A chart cell where two policies can disagree: (hand label, dealer upcard value)
+Cell = Tuple[str, int]
+
+# =============================================================================
+# BLOCK 2: POLICIES
+# =============================================================================
+
+def never_bust_policy(engine: BlackjackEngine) -> str:
+    """Hits only while one more card cannot bust the hand; never splits."""
+    total, soft = hand_state(engine.current_hand)
+    return "HIT" if total <= 11 or (soft and total < 18) else "STAND"
+
+
+def mimic_dealer_policy(engine: BlackjackEngine) -> str:
+    """Plays like the dealer: hits below DEALER_STAND_TOTAL, never splits."""
+    total, _ = hand_state(engine.current_hand)
+    return "HIT" if total < DEALER_STAND_TOTAL else "STAND"
+
+
+BUILTIN_POLICIES: Dict[str, Policy] = {
+    "basic": basic_strategy_policy,
+    "never-bust": never_bust_policy,
+    "mimic-dealer": mimic_dealer_policy,
+}
+
+
+def resolve_policy(spec: str, rules: Rules = DEFAULT_RULES) -> Policy:
+    """
+    Turns a command-line policy name into a picklable policy.
+
+    Args:
+        spec: A BUILTIN_POLICIES name, "exact" (the cached exact-EV chart) or the
+            path of a chart CSV written by `blackjack_cli.py strategy --format csv`.
+        rules: Rules the exact chart is solved for.
+    """
+    if spec in BUILTIN_POLICIES:
+        return BUILTIN_POLICIES[spec]
+    if spec == "exact":
+        chart = get_chart(rules, block=True)
+        if chart is None:
+            raise ValueError("The exact strategy chart could not be built.")
+        return ChartPolicy(chart)
+    if os.path.isfile(spec):
+        with open(spec) as f:
+            return ChartPolicy(read_chart_csv(f.read()))
+    raise ValueError(f"Unknown policy {spec!r}: use {', '.join([*BUILTIN_POLICIES, 'exact'])} "
+                     "or a chart CSV file.")
+
+# =============================================================================
+# BLOCK 3: SHARED DEALS
+# =============================================================================
+
+def generate_deals(buffer: memoryview, n_rounds: int, seed: int, num_decks: int = DEFAULT_DECKS) -> None:
+    """
+    Fills `buffer` with ROUND_CARDS card codes per round.
+    Consecutive rounds come from the same shuffled shoe, as at a real table.
+    """
+    rng = random.Random(seed)
+    codes = [card.code for card in FULL_DECK] * num_decks
+    rounds_per_shoe = len(codes) // ROUND_CARDS
+    for first in range(0, n_rounds, rounds_per_shoe):
+        rng.shuffle(codes)
+        count = min(rounds_per_shoe, n_rounds - first)
+        buffer[first * ROUND_CARDS:(first + count) * ROUND_CARDS] = bytes(codes[:count * ROUND_CARDS])
+
+
+class DealtShoe(Shoe):
+    """A shoe that deals the pre-generated cards of one round at a time."""
+
+    def __init__(self, deals: memoryview, num_decks: int = DEFAULT_DECKS):
+        super().__init__(num_decks, 0.0)
+        self._deals = deals
+        self._rounds = len(deals) // ROUND_CARDS
+        self._next_round = 0
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return False
+
+    def load_round(self, index: int) -> None:
+        """Makes round `index`'s cards the next ones dealt."""
+        start = index * ROUND_CARDS
+        self._order = [FULL_DECK[code] for code in self._deals[start:start + ROUND_CARDS]]
+        self._next_round = index + 1
+        self.position = 0
+        self.counts = list(self._full_counts)
+
+    def release(self) -> None:
+        """Drops the reference to the shared block so the mapping can be closed."""
+        self._deals = None
+
+    def draw(self) -> Card:
+        if self.position >= len(self._order):
+            # A long round continues with the next round's cards, identically for every policy
+            start = (self._next_round % self._rounds) * ROUND_CARDS
+            self._order.extend(FULL_DECK[code] for code in self._deals[start:start + ROUND_CARDS])
+            self._next_round += 1
+        return super().draw()
+
+# =============================================================================
+# BLOCK 4: TOURNAMENT
+# =============================================================================
+
+class TournamentStats:
+    """
+    Mergeable per-policy sums over the same rounds.
+    Policy 0 is the baseline every other policy is compared with, round by round.
+    """
+
+    def __init__(self, n_policies: int) -> None:
+        self.rounds = 0
+        self.net = [0] * n_policies
+        self.net_sq = [0] * n_policies
+        self.diff = [0] * n_policies        # Sum of (policy net - baseline net) per round
+        self.diff_sq = [0] * n_policies
+        self.divergent = [0] * n_policies   # Rounds where the policy left the baseline's play
+        # (policy, cell of the first disagreement) -> [rounds, diff, diff_sq]
+        self.cells: Dict[Tuple[int, Cell], List[int]] = {}
+
+    def record(self, nets: Sequence[int], first_cells: Sequence[Optional[Cell]]) -> None:
+        """Adds one round: every policy's net and where it first left the baseline."""
+        self.rounds += 1
+        baseline = nets[0]
+        for p, (net, cell) in enumerate(zip(nets, first_cells)):
+            self.net[p] += net
+            self.net_sq[p] += net * net
+            if cell is None:
+                continue
+            diff = net - baseline
+            self.diff[p] += diff
+            self.diff_sq[p] += diff * diff
+            self.divergent[p] += 1
+            entry = self.cells.setdefault((p, cell), [0, 0, 0])
+            entry[0] += 1
+            entry[1] += diff
+            entry[2] += diff * diff
+
+    def merge(self, other: "TournamentStats") -> "TournamentStats":
+        """Adds another worker's sums into this one."""
+        self.rounds += other.rounds
+        for name in ("net", "net_sq", "diff", "diff_sq", "divergent"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            for p, value in enumerate(theirs):
+                mine[p] += value
+        for key, (rounds, diff, diff_sq) in other.cells.items():
+            entry = self.cells.setdefault(key, [0, 0, 0])
+            entry[0] += rounds
+            entry[1] += diff
+            entry[2] += diff_sq
+        return self
+
+
+def decision_cell(engine: BlackjackEngine) -> Cell:
+    """Chart cell of the engine's current decision."""
+    hand = engine.current_hand
+    upcard = engine.dealer_upcard.blackjack_value
+    if engine.can_split():
+        value = hand[0].blackjack_value
+        return f"Pair {'A' if value == 11 else value}", upcard
+    total, soft = hand_state(hand)
+    return f"{'Soft' if soft else 'Hard'} {total}", upcard
+
+
+def play_tournament_rounds(deals_name: str, start: int, stop: int, policies: Sequence[Policy],
+                           bet: int = DEFAULT_BET, rules: Rules = DEFAULT_RULES) -> TournamentStats:
+    """
+    Plays rounds [start, stop) of the shared deals once per policy.
+    Runs inside a worker process; every policy must be picklable.
+    """
+    deals = shared_memory.SharedMemory(name=deals_name)
+    # Enough money for every round to be split to the hand limit and every hand doubled
+    stake = bet * 2 * rules.max_hands
+    try:
+        engines = [BlackjackEngine(bankroll=stake, shoe=DealtShoe(deals.buf, rules.num_decks), rules=rules)
+                   for _ in policies]
+        baseline = policies[0]
+        stats = TournamentStats(len(policies))
+        for index in range(start, stop):
+            nets = []
+            first_cells: List[Optional[Cell]] = []
+            for p, (policy, engine) in enumerate(zip(policies, engines)):
+                engine.shoe.load_round(index)
+                engine.bankroll = stake
+                engine.start_round(bet)
+                cell = None
+                while engine.phase == PHASE_PLAYER:
+                    action = policy(engine)
+                    if p and cell is None and action != baseline(engine):
+                        cell = decision_cell(engine)
+                    apply_action(engine, action)
+                nets.append(engine.play_dealer_turn().net)
+                first_cells.append(cell)
+            stats.record(nets, first_cells)
+        for engine in engines:
+            engine.shoe.release()
+        return stats
+    finally:
+        deals.close()
+
+
+def run_tournament(policies: Sequence[Policy], n_rounds: int = DEFAULT_ROUNDS, seed: Optional[int] = None,
+                   workers: Optional[int] = None, bet: int = DEFAULT_BET,
+                   rules: Rules = DEFAULT_RULES) -> TournamentStats:
+    """
+    Plays every policy on the same `n_rounds` deals.
+
+    Args:
+        policies: Decision functions; the first one is the baseline.
+        n_rounds: Rounds per policy.
+        seed: Seed of the deals; None picks a random one.
+        workers: Number of processes (defaults to all cores).
+        bet: Stake of every round.
+        rules: Table rules, including the decks per generated shoe.
+    Returns:
+        The merged TournamentStats (identical for the same seed, whatever the worker count).
+    """
+    if not policies:
+        raise ValueError("A tournament needs at least one policy.")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_rounds))
+    deals = shared_memory.SharedMemory(create=True, size=max(1, n_rounds) * ROUND_CARDS)
+    try:
+        generate_deals(deals.buf, n_rounds, seed, rules.num_decks)
+        bounds = [0]
+        for chunk in split_rounds(n_rounds, workers):
+            bounds.append(bounds[-1] + chunk)
+        if workers == 1:
+            return play_tournament_rounds(deals.name, 0, n_rounds, policies, bet, rules)
+        total = TournamentStats(len(policies))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for stats in pool.map(play_tournament_rounds, [deals.name] * workers, bounds[:-1], bounds[1:],
+                                  [policies] * workers, [bet] * workers, [rules] * workers):
+                total.merge(stats)
+        return total
+    finally:
+        deals.close()
+        deals.unlink()
+
+# =============================================================================
+# BLOCK 5: REPORTING
+# =============================================================================
+
+class PolicyReport(NamedTuple):
+    """EV of one policy and its paired difference to the baseline, in units of the bet."""
+    name: str
+    ev: float
+    ev_ci: float                    # Half-width of the confidence interval
+    diff: float
+    diff_ci: float
+    divergent_share: float          # Share of rounds where the policy left the baseline's play
+    variance_reduction: float       # Rounds saved by pairing: Var(a) + Var(b) over Var(a - b)
+
+
+def _mean_ci(total: int, total_sq: int, n: int, bet: int) -> Tuple[float, float, float]:
+    """(mean, confidence half-width, variance) of a sum over n rounds, in units of the bet."""
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    mean = total / n
+    variance = max(total_sq / n - mean * mean, 0.0) * (n / (n - 1) if n > 1 else 1.0)
+    return mean / bet, CONFIDENCE_Z * math.sqrt(variance / n) / bet, variance
+
+
+def summarize(stats: TournamentStats, names: Sequence[str], bet: int = DEFAULT_BET) -> List[PolicyReport]:
+    """One PolicyReport per policy, in submission order."""
+    n = stats.rounds
+    _, _, base_variance = _mean_ci(stats.net[0], stats.net_sq[0], n, bet)
+    reports = []
+    for p, name in enumerate(names):
+        ev, ev_ci, variance = _mean_ci(stats.net[p], stats.net_sq[p], n, bet)
+        diff, diff_ci, diff_variance = _mean_ci(stats.diff[p], stats.diff_sq[p], n, bet)
+        reduction = (variance + base_variance) / diff_variance if diff_variance else math.inf
+        reports.append(PolicyReport(name, ev, ev_ci, diff, diff_ci,
+                                    stats.divergent[p] / n if n else 0.0, reduction))
+    return reports
+
+
+def format_report(stats: TournamentStats, names: Sequence[str], bet: int = DEFAULT_BET) -> str:
+    """EV table plus, per policy, the cells that account for most of its difference to the baseline."""
+    reports = summarize(stats, names, bet)
+    lines = [f"{stats.rounds:,} rounds per policy on identical deals; EV per initial bet, "
+             f"±{CONFIDENCE_Z} standard errors; baseline: {names[0]}",
+             f"  {'policy':<16}{'EV':>18}{'vs baseline':>20}{'diverges':>10}{'pairing gain':>14}"]
+    for report in reports:
+        gain = "-" if math.isinf(report.variance_reduction) else f"{report.variance_reduction:,.1f}x"
+        lines.append(f"  {report.name:<16}{report.ev:>+10.4f} ±{report.ev_ci:.4f}"
+                     f"{report.diff:>+12.4f} ±{report.diff_ci:.4f}{report.divergent_share:>10.1%}{gain:>14}")
+
+    for p, name in enumerate(names[1:], start=1):
+        cells = sorted(((cell, entry) for (q, cell), entry in stats.cells.items() if q == p),
+                       key=lambda item: -abs(item[1][1]))
+        if not cells:
+            continue
+        lines.append(f"where {name} differs from {names[0]} (first disagreement per round):")
+        for (label, upcard), (rounds, diff, diff_sq) in cells[:TOP_CELLS]:
+            mean, ci, _ = _mean_ci(diff, diff_sq, rounds, bet)
+            contribution = diff / (stats.rounds * bet)
+            lines.append(f"  {label:>8} vs {'A' if upcard == 11 else upcard:<3}{rounds:>9,} rounds  "
+                         f"{mean:+.3f} ±{ci:.3f} per round  ->  {contribution:+.4f} of the EV gap")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare strategies on common random numbers.")
+    parser.add_argument("policies", nargs="*", default=list(DEFAULT_POLICIES),
+                        help=f"Policies to compare, baseline first (default: {' '.join(DEFAULT_POLICIES)}). "
+                             "Names: basic, exact, never-bust, mimic-dealer, or a chart CSV path.")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--seed", type=int, help="Seed of the shared deals.")
+    parser.add_argument("--workers", type=int, help="Processes (defaults to all cores).")
+    parser.add_argument("--bet", type=int, default=DEFAULT_BET)
+    add_rule_arguments(parser)
+    args = parser.parse_args(argv)
+    rules = rules_from_args(args)
+
+    try:
+        policies = [resolve_policy(spec, rules) for spec in args.policies]
+    except ValueError as error:
+        parser.error(str(error))
+    start = time.perf_counter()
+    stats = run_tournament(policies, args.rounds, args.seed, args.workers, args.bet, rules)
+    elapsed = time.perf_counter() - start
+    print(f"rules: {rules.describe()}")
+    print(format_report(stats, args.policies, args.bet))
+    print(f"time: {elapsed:.2f} s ({stats.rounds * len(policies) / elapsed:,.0f} policy-rounds/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,257 @@
+"""
+Vectorized Monte Carlo simulator for Blackjack Ultimate.
+
+Plays whole batches of rounds at once with NumPy: every row of an int8 matrix is
+one shuffled shoe, and hand totals, soft flags, strategy decisions and payouts are
+computed column-wise. It reproduces `BlackjackEngine.play_round` with the default
+basic strategy policy (which never splits, doubles or surrenders) and the
+`resolve_game` payout table, under the dealer rule and payout of a `Rules`.
+
+Requires NumPy (`pip install numpy`); the game itself does not.
+"""
+
+# =============================================================================
+# BLOCK 1: IMPORTS & CONFIGURATION
+# =============================================================================
+import math
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as error:  # NumPy is optional for the rest of the project
+    raise ImportError(
+        "The vectorized simulator requires NumPy. Install it with 'pip install numpy'."
+    ) from error
+
+from blackjack_engine import DEALER_STAND_TOTAL, FULL_DECK
+from blackjack_rules import DEFAULT_RULES, Rules
+
+# Blackjack values of a full 52-card deck (Ace = 11), matching Card.get_blackjack_value
+DECK_VALUES = np.array([card.get_blackjack_value() for card in FULL_DECK], dtype=np.int8)
+DEFAULT_BATCH_SIZE = 250_000
+DEFAULT_BET = 10                # Even stake: odd stakes lose the half unit of a 3:2 payout
+# A round never uses more than 39 cards (player hard total <= 21 + one busting
+# card, dealer hard total <= 16 + one card), so 52 shuffled cards cover any shoe
+ROUND_CARDS = 52
+
+# Outcome codes, one per simulated round
+OUTCOME_LOSS = 0
+OUTCOME_PUSH = 1
+OUTCOME_WIN = 2
+OUTCOME_BLACKJACK = 3
+OUTCOME_BUST = 4
+
+# =============================================================================
+# BLOCK 2: DATA MODELS
+# =============================================================================
+
+class BatchResult(NamedTuple):
+    """Aggregated statistics of a simulation; partial results combine with `merge`."""
+    rounds: int
+    net: int            # Sum of bankroll changes
+    net_sq: int         # Sum of squared bankroll changes (for the standard error)
+    wins: int
+    losses: int
+    pushes: int
+    blackjacks: int
+    busts: int
+    bet: int
+
+    @property
+    def house_edge(self) -> float:
+        """Expected loss per unit wagered on the initial hand."""
+        return -self.net / (self.rounds * self.bet) if self.rounds else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of the house edge estimate."""
+        if self.rounds < 2:
+            return 0.0
+        mean = self.net / self.rounds
+        variance = (self.net_sq - self.rounds * mean * mean) / (self.rounds - 1)
+        return math.sqrt(max(variance, 0.0) / self.rounds) / self.bet
+
+    def merge(self, other: "BatchResult") -> "BatchResult":
+        """Combines two results produced with the same bet."""
+        if self.bet != other.bet:
+            raise ValueError("Cannot merge results simulated with different bets.")
+        return BatchResult(*(a + b for a, b in zip(self[:-1], other[:-1])), bet=self.bet)
+
+# =============================================================================
+# BLOCK 3: VECTORIZED RULES
+# =============================================================================
+
+def shuffled_decks(rng: "np.random.Generator", n: int, num_decks: int = 1) -> "np.ndarray":
+    """
+    Returns an (n, 52) int8 matrix, each row the top ROUND_CARDS cards of an
+    independently shuffled shoe of `num_decks` decks.
+    """
+    shoes = np.tile(DECK_VALUES, (n, num_decks))
+    if num_decks == 1:
+        return rng.permuted(shoes, axis=1)
+    # Partial Fisher-Yates: only the cards a round can reach are shuffled into place
+    size = shoes.shape[1]
+    rows = np.arange(n)
+    for position in range(ROUND_CARDS):
+        picks = position + (rng.random(n) * (size - position)).astype(np.intp)
+        picked = shoes[rows, picks]
+        shoes[rows, picks] = shoes[:, position]
+        shoes[:, position] = picked
+    return shoes[:, :ROUND_CARDS]
+
+
+def hand_scores(hard: "np.ndarray", aces: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Column-wise equivalent of `calculate_hand_score`.
+
+    Args:
+        hard: Hand totals with every Ace counted as 1.
+        aces: Number of Aces in each hand.
+    Returns:
+        Tuple(total_score, is_soft_hand) arrays.
+    """
+    raw = hard + 10 * aces
+    # Aces drop from 11 to 1 one at a time, only as far as needed to reach 21
+    reductions = np.minimum(aces, np.maximum(raw - 12, 0) // 10)
+    total = raw - 10 * reductions
+    is_soft = (aces > 0) & (raw <= 21)
+    return total, is_soft
+
+
+def basic_strategy_hits(total: "np.ndarray", is_soft: "np.ndarray", upcard: "np.ndarray") -> "np.ndarray":
+    """Column-wise `generate_basic_strategy`: True where the advice is HIT."""
+    dealer_low = (upcard >= 2) & (upcard <= 6)
+    soft_hit = (total <= 17) | ((total == 18) & ~((upcard >= 2) & (upcard <= 8)))
+    hard_hit = ((total <= 11) |
+                ((total == 12) & ~((upcard >= 4) & (upcard <= 6))) |
+                ((total >= 13) & (total <= 16) & ~dealer_low))
+    return np.where(is_soft, soft_hit, hard_hit)
+
+
+def play_batch(decks: "np.ndarray", bet: int = DEFAULT_BET,
+               rules: Rules = DEFAULT_RULES) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Plays one round per shoe with basic strategy and settles it.
+
+    Args:
+        decks: (n, 52) matrix of card values from `shuffled_decks`.
+        bet: Integer stake of every round. Like resolve_game, a 3:2 payout on an
+            odd stake is truncated to whole dollars.
+        rules: Table rules; the dealer's soft-17 rule and the Blackjack payout apply.
+    Returns:
+        Tuple(net bankroll change per round, outcome code per round).
+    """
+    n = decks.shape[0]
+    rows = np.arange(n)
+    cards = decks.astype(np.int16)
+
+    def add_card(hard, aces, values):
+        is_ace = values == 11
+        return hard + np.where(is_ace, 1, values), aces + is_ace
+
+    # Deal order: two player cards, dealer hole card, dealer upcard
+    p_hard, p_aces = add_card(np.zeros(n, np.int16), np.zeros(n, np.int16), cards[:, 0])
+    p_hard, p_aces = add_card(p_hard, p_aces, cards[:, 1])
+    d_hard, d_aces = add_card(np.zeros(n, np.int16), np.zeros(n, np.int16), cards[:, 2])
+    upcard = cards[:, 3]
+    d_hard, d_aces = add_card(d_hard, d_aces, upcard)
+    next_card = np.full(n, 4, dtype=np.int16)
+
+    p_total, p_soft = hand_scores(p_hard, p_aces)
+    natural = p_total == 21
+
+    # Player turn: keep hitting the rows whose advice is HIT (auto-stand on 21)
+    active = ~natural
+    while True:
+        hitting = active & basic_strategy_hits(p_total, p_soft, upcard)
+        if not hitting.any():
+            break
+        idx = rows[hitting]
+        p_hard[idx], p_aces[idx] = add_card(p_hard[idx], p_aces[idx], cards[idx, next_card[idx]])
+        next_card[idx] += 1
+        p_total, p_soft = hand_scores(p_hard, p_aces)
+        active = hitting & (p_total < 21)
+    bust = p_total > 21
+
+    # Dealer turn: draw to 16, stand on 17 (or hit soft 17), skipped when the player busted
+    d_total, _ = hand_scores(d_hard, d_aces)
+    d_count = np.full(n, 2, dtype=np.int16)
+    while True:
+        drawing = ~bust & (d_total < DEALER_STAND_TOTAL)
+        if rules.dealer_hits_soft_17:
+            # A true soft 17: an Ace still counted as 11
+            drawing |= ~bust & (d_total == DEALER_STAND_TOTAL) & (d_aces > 0) & (d_hard + 10 <= 21)
+        if not drawing.any():
+            break
+        idx = rows[drawing]
+        d_hard[idx], d_aces[idx] = add_card(d_hard[idx], d_aces[idx], cards[idx, next_card[idx]])
+        next_card[idx] += 1
+        d_count[idx] += 1
+        d_total, _ = hand_scores(d_hard, d_aces)
+
+    # Payout table of resolve_game (total returned, stake included)
+    dealer_blackjack = (d_total == 21) & (d_count == 2)
+    payout = np.select(
+        [bust,
+         natural & dealer_blackjack,
+         natural,
+         (d_total > 21) | (p_total > d_total),
+         p_total == d_total],
+        [0, bet, int(bet * rules.blackjack_payout), 2 * bet, bet],
+        default=0,
+    ).astype(np.int64)
+    outcome = np.select(
+        [bust,
+         natural & ~dealer_blackjack,
+         payout > bet,
+         payout == bet],
+        [OUTCOME_BUST, OUTCOME_BLACKJACK, OUTCOME_WIN, OUTCOME_PUSH],
+        default=OUTCOME_LOSS,
+    ).astype(np.int8)
+    return payout - bet, outcome
+
+
+def summarize(net: "np.ndarray", outcome: "np.ndarray", bet: int) -> BatchResult:
+    """Reduces per-round arrays from `play_batch` to a BatchResult."""
+    counts = np.bincount(outcome, minlength=5)
+    return BatchResult(
+        rounds=int(net.size),
+        net=int(net.sum()),
+        net_sq=int((net * net).sum()),
+        wins=int(counts[OUTCOME_WIN] + counts[OUTCOME_BLACKJACK]),
+        losses=int(counts[OUTCOME_LOSS] + counts[OUTCOME_BUST]),
+        pushes=int(counts[OUTCOME_PUSH]),
+        blackjacks=int(counts[OUTCOME_BLACKJACK]),
+        busts=int(counts[OUTCOME_BUST]),
+        bet=bet,
+    )
+
+# =============================================================================
+# BLOCK 4: SIMULATION DRIVER
+# =============================================================================
+
+def simulate_basic_strategy(n_rounds: int, bet: int = DEFAULT_BET, seed: Optional[int] = None,
+                            batch_size: int = DEFAULT_BATCH_SIZE, rules: Rules = DEFAULT_RULES) -> BatchResult:
+    """
+    Simulates `n_rounds` independent rounds (fresh shoe each round) in batches.
+
+    Args:
+        n_rounds: Total number of rounds to play.
+        bet: Integer stake of every round.
+        seed: Seed for NumPy's random Generator; None draws fresh entropy.
+        batch_size: Rounds per batch, which bounds peak memory.
+        rules: Table rules, including the decks in each fresh shoe.
+    Returns:
+        The merged BatchResult of all batches.
+    """
+    if bet <= 0:
+        raise ValueError("Bet must be positive.")
+    rng = np.random.default_rng(seed)
+    result = BatchResult(0, 0, 0, 0, 0, 0, 0, 0, bet)
+    remaining = n_rounds
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        net, outcome = play_batch(shuffled_decks(rng, size, rules.num_decks), bet, rules)
+        result = result.merge(summarize(net, outcome, bet))
+        remaining -= size
+    return result